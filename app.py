@@ -1,24 +1,42 @@
 from flask import Flask
 from application.database import db
 from application.config import localdevelopmentConfig
-from flask_security import Security, SQLAlchemyUserDatastore, hash_password
+from flask_security import Security, SQLAlchemyUserDatastore
 from application.models import User, Role
 from mailer import mail
 from caching import cache
+from application.commands import register_commands
+from application.metrics import init_metrics
+from application.engine_profile import init_engine_profile
+from application.read_routing import init_read_routing
+from application.serializers import init_json_provider
 
-app = None
+# Importing this module has no side effects: the app is built by create_app(),
+# and the schema / default accounts are created by `flask --app app init-db`.
+# `app` and `celery_app` are still importable (gunicorn app:app,
+# celery -A app.celery_app); they are built on first access, once per process.
 
 def create_celery(app):
     from celery import Celery
     celery = Celery(app.import_name)
     import celery_config
     celery.config_from_object(celery_config)
+    celery.flask_app = app      # the app FlaskTask runs tasks in
+    celery.set_default()        # shared_task tasks bind to this app
     return celery
 
 def create_app():
     app = Flask(__name__)
     app.config.from_object(localdevelopmentConfig)
-    db.init_app(app)
+    # any setting can be overridden with a FLASK_ prefixed environment variable,
+    # e.g. FLASK_SQLALCHEMY_DATABASE_URI
+    app.config.from_prefixed_env()
+    
+    # orjson-backed JSON responses when orjson is installed
+    init_json_provider(app)
+    
+    # SQLAlchemy engine with the DATABASE_PROFILE pool sizes and SQLite pragmas
+    init_engine_profile(app)
     
     # Initializing the cache
     cache.init_app(app)
@@ -30,37 +48,39 @@ def create_app():
     datastore = SQLAlchemyUserDatastore(db, User, Role)
     app.security = Security(app, datastore)
     
-  
-    celery = create_celery(app)
+    # Per-endpoint latency / SQL metrics (/api/admin/metrics)
+    init_metrics(app)
+    
+    # Reads of @read_replica routes go to the replica / SQLite snapshot
+    init_read_routing(app)
+    
+    # CLI commands (flask --app app <command>)
+    register_commands(app)
     
- 
-    app.app_context().push()
+    # Routes and Celery tasks
+    from application.routes import main
+    app.register_blueprint(main)
     
-    return app, celery
+    app.extensions["celery"] = create_celery(app)
+    
+    return app
 
-app, celery_app = create_app()
 
-with app.app_context():
-    db.create_all()
-    app.security.datastore.find_or_create_role(name="admin", description="This is an admin.")
-    app.security.datastore.find_or_create_role(name="user", description="This is a user.")
-    db.session.commit()
+_instances = {}
 
-    if not app.security.datastore.find_user(email="admin@quizmaster.com"):
-        app.security.datastore.create_user(
-            email="admin@quizmaster.com",
-            password=hash_password("admin123"),
-            roles=["admin"])
-    
-    if not app.security.datastore.find_user(email="user@quizmaster.com"):
-        app.security.datastore.create_user(
-            email="user@quizmaster.com",
-            password=hash_password("user123"),
-            roles=["user"])
-    
-    db.session.commit()
+def __getattr__(name):
+    # module level `app` / `celery_app`, created lazily so importing stays cheap
+    if name in ("app", "celery_app"):
+        if "app" not in _instances:
+            _instances["app"] = create_app()
+            _instances["celery_app"] = _instances["app"].extensions["celery"]
+        return _instances[name]
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
 
-from application.routes import *
 
 if __name__ == "__main__":
-    app.run(debug=True)
\ No newline at end of file
+    from application.commands import init_database
+    app = create_app()
+    with app.app_context():
+        init_database()
+    app.run(debug=True)
@@ -0,0 +1,129 @@
+import click
+from flask import current_app
+from flask.cli import with_appcontext
+from flask_security import hash_password
+from application.database import db
+from application.rollups import rebuild_score_rollups
+from application.migrations import run_migrations
+from application import score_queue, read_routing, question_import, quiz_snapshots, leaderboard
+from caching import bump_tags
+from redis import RedisError
+
+
+def init_database():
+    """Create the schema, apply pending migrations and make sure the roles and default accounts exist."""
+    db.create_all(bind_key=None)  # the primary; the replica bind is read-only
+    applied = run_migrations()
+
+    datastore = current_app.security.datastore
+    datastore.find_or_create_role(name="admin", description="This is an admin.")
+    datastore.find_or_create_role(name="user", description="This is a user.")
+    db.session.commit()
+
+    if not datastore.find_user(email="admin@quizmaster.com"):
+        datastore.create_user(
+            email="admin@quizmaster.com",
+            password=hash_password("admin123"),
+            roles=["admin"])
+
+    if not datastore.find_user(email="user@quizmaster.com"):
+        datastore.create_user(
+            email="user@quizmaster.com",
+            password=hash_password("user123"),
+            roles=["user"])
+
+    db.session.commit()
+    return applied
+
+
+@click.command("init-db")
+@with_appcontext
+def init_db_command():
+    """Create the database with its roles and default accounts (safe to run again)."""
+    applied = init_database()
+    click.echo(f"Database ready. Applied: {', '.join(applied)}" if applied else "Database ready.")
+
+
+@click.command("rebuild-score-rollups")
+@with_appcontext
+def rebuild_score_rollups_command():
+    """Backfill the per-subject and per-quiz score rollups from the Score table."""
+    quizzes, subjects = rebuild_score_rollups()
+    db.session.commit()
+    click.echo(f"Rebuilt score rollups for {subjects} subject(s) and {quizzes} quiz(zes).")
+
+
+@click.command("upgrade-db")
+@with_appcontext
+def upgrade_db_command():
+    """Create missing tables and apply pending schema migrations."""
+    db.create_all(bind_key=None)
+    applied = run_migrations()
+    click.echo(f"Applied: {', '.join(applied)}" if applied else "Database is up to date.")
+
+
+@click.command("flush-score-queue")
+@with_appcontext
+def flush_score_queue_command():
+    """Write every buffered quiz submission to the database now."""
+    written = score_queue.drain()
+    click.echo(f"Stored {written} buffered submission(s).")
+
+
+@click.command("refresh-read-snapshot")
+@with_appcontext
+def refresh_read_snapshot_command():
+    """Copy the SQLite database into the read snapshot (SQLITE_SNAPSHOT_PATH) now."""
+    if read_routing.refresh_snapshot(current_app):
+        click.echo(f"Snapshot written to {read_routing.snapshot_path(current_app)}.")
+    else:
+        click.echo("No SQLite snapshot configured (SQLITE_SNAPSHOT_PATH).")
+
+
+@click.command("import-questions")
+@click.argument("path", type=click.Path(exists=True, dir_okay=False))
+@click.option("--quiz-id", type=int, help="Quiz for rows that do not name one.")
+@click.option("--skip-invalid", is_flag=True, help="Import the valid rows even if some are invalid.")
+@click.option("--batch-size", type=int, default=question_import.BATCH_SIZE, show_default=True)
+@with_appcontext
+def import_questions_command(path, quiz_id, skip_invalid, batch_size):
+    """Bulk import questions from a CSV, XLSX or JSON file."""
+    try:
+        with open(path, "rb") as handle:
+            rows = question_import.read_rows(handle, question_import.format_of(path))
+            report = question_import.import_questions(rows, quiz_id, skip_invalid, batch_size)
+    except question_import.ImportFormatError as e:
+        db.session.rollback()
+        raise click.ClickException(str(e))
+
+    for error in report["errors"]:
+        click.echo(f"row {error['row']}: {'; '.join(error['errors'])}", err=True)
+    if report["invalid"] and not skip_invalid:
+        db.session.rollback()
+        raise click.ClickException(f"Nothing imported: {report['invalid']} invalid row(s) of {report['rows']}.")
+
+    db.session.commit()
+    bump_tags("question")
+    quiz_snapshots.publish_versions(*report["quiz_ids"])
+    click.echo(f"Imported {report['imported']} of {report['rows']} row(s) into {len(report['quiz_ids'])} quiz(zes).")
+
+
+@click.command("rebuild-leaderboards")
+@with_appcontext
+def rebuild_leaderboards_command():
+    """Rebuild the Redis leaderboards (global, per subject, per quiz) from the Score table."""
+    try:
+        written = leaderboard.rebuild()
+    except RedisError as e:
+        raise click.ClickException(f"Redis unavailable: {e}")
+    click.echo(f"Rebuilt the leaderboards from {written} best score(s).")
+
+
+def register_commands(app):
+    app.cli.add_command(init_db_command)
+    app.cli.add_command(rebuild_score_rollups_command)
+    app.cli.add_command(upgrade_db_command)
+    app.cli.add_command(flush_score_queue_command)
+    app.cli.add_command(refresh_read_snapshot_command)
+    app.cli.add_command(import_questions_command)
+    app.cli.add_command(rebuild_leaderboards_command)
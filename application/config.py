@@ -5,6 +5,21 @@ class Config():
 class localdevelopmentConfig(Config):
     # here is the configuration for db 
     SQLALCHEMY_DATABASE_URI = "sqlite:///quizmasterdb.sqlite3"
+
+    # Database engine profile (application/engine_profile.py)
+    DATABASE_PROFILE = "concurrent" # "concurrent" (WAL, pool sizing) or "default" (SQLite / SQLAlchemy defaults)
+    SQLITE_BUSY_TIMEOUT_MS = 5000   # how long a connection waits for a write lock before "database is locked"
+    SQLITE_MMAP_SIZE = 268435456    # bytes of the database file read through mmap (256 MB)
+    DB_POOL_SIZE = 10               # connections kept open per process
+    DB_MAX_OVERFLOW = 20            # extra connections allowed under load
+    DB_POOL_TIMEOUT = 30            # seconds to wait for a free connection
+    DB_POOL_RECYCLE = 1800          # server databases: reconnect connections older than this (seconds)
+
+    # Read routing for @read_replica routes (application/read_routing.py)
+    READ_REPLICA_URI = None         # e.g. a PostgreSQL streaming replica
+    SQLITE_SNAPSHOT_PATH = None     # e.g. "quizmasterdb-snapshot.sqlite3" (instance folder), refreshed by Celery beat
+    SQLITE_SNAPSHOT_MAX_AGE = 300   # seconds; an older (or missing) snapshot is not used
+    READ_PRIMARY_AFTER_WRITE = 30   # seconds a user's reads stay on the primary after they wrote something
     DEBUG = True 
 
     #Configuration for security 
@@ -29,4 +44,17 @@ class localdevelopmentConfig(Config):
     MAIL_USE_SSL = False
     MAIL_USERNAME = ''
     MAIL_PASSWORD = ''
-    MAIL_DEFAULT_SENDER = 'admin@quizmaster.com'
\ No newline at end of file
+    MAIL_DEFAULT_SENDER = 'admin@quizmaster.com'
+
+    # Bulk mail (Celery reminder fan-out)
+    REMINDER_CHUNK_SIZE = 500       # users per reminder subtask
+    # Max reminder messages per second for ALL workers together, not per worker or chunk:
+    # the send slots are shared through Redis. Set it to the mail provider's limit (0 = no limit).
+    MAIL_SEND_RATE_LIMIT = 0
+    MAIL_SEND_MAX_RETRIES = 3       # retries per message before it is counted as failed
+    MAIL_SEND_RETRY_BACKOFF = 2     # seconds before the first retry, doubled on every retry
+
+    # Write-behind quiz submissions (application/score_queue.py)
+    SCORE_WRITE_BEHIND = False      # buffer quiz submissions in Redis, written in batches by Celery
+    SCORE_QUEUE_BATCH_SIZE = 500    # submissions per bulk insert
+    SCORE_QUEUE_CLAIM_IDLE_MS = 60000  # unacknowledged entries older than this are taken over
@@ -1,2 +1,3 @@
 from flask_sqlalchemy import SQLAlchemy
-db = SQLAlchemy()
+from application.read_routing import RoutingSession
+db = SQLAlchemy(session_options={"class_": RoutingSession})
@@ -0,0 +1,88 @@
+from sqlalchemy import event
+from sqlalchemy.engine import make_url
+from application.database import db
+from application.read_routing import REPLICA, replica_bind
+
+# Database engine profile.
+#
+# With SQLite's defaults (rollback journal, full fsync on every commit) a quiz
+# submission locks the whole file, readers wait behind it and concurrent writers
+# soon fail with "database is locked". The "concurrent" profile switches every
+# connection to WAL (readers never block the writer), fsyncs only at
+# checkpoints (synchronous=NORMAL, still safe in WAL mode), waits for a busy lock
+# instead of failing, enforces the ON DELETE CASCADE foreign keys and reads the
+# file through mmap. It also sizes the connection pool for SQLite and for a
+# server database such as PostgreSQL. "default" leaves everything as it was.
+
+PROFILES = ("concurrent", "default")
+
+
+def _is_sqlite_memory(url):
+    return url.database in (None, "", ":memory:") or url.query.get("mode") == "memory"
+
+
+def engine_options(config):
+    """SQLALCHEMY_ENGINE_OPTIONS for the configured profile; explicit options win."""
+    options = {}
+    url = make_url(config["SQLALCHEMY_DATABASE_URI"])
+    if config["DATABASE_PROFILE"] == "concurrent":
+        if url.get_backend_name() == "sqlite":
+            # in-memory databases live in a single connection (StaticPool), nothing to size
+            if not _is_sqlite_memory(url):
+                options = {
+                    "pool_size": config["DB_POOL_SIZE"],
+                    "max_overflow": config["DB_MAX_OVERFLOW"],
+                    "pool_timeout": config["DB_POOL_TIMEOUT"],
+                }
+        else:
+            options = {
+                "pool_size": config["DB_POOL_SIZE"],
+                "max_overflow": config["DB_MAX_OVERFLOW"],
+                "pool_timeout": config["DB_POOL_TIMEOUT"],
+                "pool_recycle": config["DB_POOL_RECYCLE"],  # before the server drops idle connections
+                "pool_pre_ping": True,                      # survive a database restart
+            }
+    options.update(config.get("SQLALCHEMY_ENGINE_OPTIONS", {}))
+    return options
+
+
+def sqlite_pragmas(config):
+    """(pragma, value) pairs run on every new SQLite connection."""
+    if config["DATABASE_PROFILE"] != "concurrent":
+        return []
+    return [
+        ("journal_mode", "WAL"),
+        ("synchronous", "NORMAL"),
+        ("busy_timeout", int(config["SQLITE_BUSY_TIMEOUT_MS"])),
+        ("foreign_keys", "ON"),
+        ("mmap_size", int(config["SQLITE_MMAP_SIZE"])),
+    ]
+
+
+def _on_connect(pragmas):
+    def set_pragmas(dbapi_connection, connection_record):
+        cursor = dbapi_connection.cursor()
+        for name, value in pragmas:
+            cursor.execute(f"PRAGMA {name}={value}")
+        cursor.close()
+    return set_pragmas
+
+
+def init_engine_profile(app):
+    """Wrap db.init_app: pool options and binds go in before the engines exist, pragmas after."""
+    if app.config["DATABASE_PROFILE"] not in PROFILES:
+        raise ValueError(f"DATABASE_PROFILE must be one of {PROFILES}, not {app.config['DATABASE_PROFILE']!r}")
+    app.config["SQLALCHEMY_ENGINE_OPTIONS"] = engine_options(app.config)
+    # read replica / SQLite snapshot for @read_replica routes (application/read_routing.py)
+    replica = replica_bind(app)
+    if replica is not None:
+        app.config["SQLALCHEMY_BINDS"] = {REPLICA: replica, **(app.config.get("SQLALCHEMY_BINDS") or {})}
+    db.init_app(app)
+
+    pragmas = sqlite_pragmas(app.config)
+    if pragmas:
+        with app.app_context():
+            # the primary only: the SQLite snapshot is opened read-only
+            engine = db.engines[None]
+            if engine.dialect.name == "sqlite":
+                event.listen(engine, "connect", _on_connect(pragmas))
@@ -0,0 +1,274 @@
+from flask import current_app
+from redis import RedisError
+from sqlalchemy import func
+from application.database import db
+from application.models import Chapter, Quiz, Score, Subject
+from caching import get_redis
+
+# Leaderboards as Redis sorted sets, in the Redis that CACHE_REDIS_* points at.
+#
+# A user's standing on a quiz is their best score on it; on a subject board and
+# on the global board it is the sum of those bests (the old "top performers"
+# table). The attempt route and the write-behind drain fold each new score in
+# with one atomic script after commit, so a rank is one ZREVRANK instead of a
+# grouped scan of the Score table.
+#
+# Deleting or moving quizzes, chapters, subjects or users rebuilds the boards of
+# the subjects involved from the database (refresh_subjects); the global board
+# is always the union of the subject boards. rebuild() redoes everything and is
+# run nightly to repair any drift. Until the first rebuild, or while Redis is
+# down, readers compute the same boards from the Score table.
+
+GLOBAL_KEY = "leaderboard:global"
+SUBJECT_KEY = "leaderboard:subject:{subject_id}"
+QUIZ_KEY = "leaderboard:quiz:{quiz_id}"
+BUILT_KEY = "leaderboard:built"
+ZADD_CHUNK = 1000
+
+# Keep the best score per quiz and add the improvement to the subject and global boards.
+_RECORD_SCRIPT = """
+local best = redis.call('ZSCORE', KEYS[1], ARGV[1])
+local score = tonumber(ARGV[2])
+if best and tonumber(best) >= score then
+    return 0
+end
+local gain = score - (tonumber(best) or 0)
+redis.call('ZADD', KEYS[1], score, ARGV[1])
+redis.call('ZINCRBY', KEYS[2], gain, ARGV[1])
+redis.call('ZINCRBY', KEYS[3], gain, ARGV[1])
+return 1
+"""
+
+
+def board_key(subject_id=None, quiz_id=None):
+    if quiz_id is not None:
+        return QUIZ_KEY.format(quiz_id=quiz_id)
+    if subject_id is not None:
+        return SUBJECT_KEY.format(subject_id=subject_id)
+    return GLOBAL_KEY
+
+
+def _redis_call(action, fallback=None):
+    try:
+        return action(get_redis())
+    except RedisError as e:
+        current_app.logger.warning(f"Leaderboard unavailable: {str(e)}")
+        return fallback
+
+
+def _number(score):
+    score = float(score)
+    return int(score) if score.is_integer() else score
+
+
+# ---------------------------------------------------------------- writes
+
+def record_scores(entries):
+    """
+    Fold committed scores, given as (quiz_id, subject_id, user_id, total_scored),
+    into the boards. Call after commit; a Redis outage is only logged.
+    """
+    entries = [entry for entry in entries if entry[3] is not None]
+    if not entries:
+        return
+
+    def write(client):
+        script = client.register_script(_RECORD_SCRIPT)
+        pipe = client.pipeline(transaction=False)
+        for quiz_id, subject_id, user_id, total_scored in entries:
+            script(
+                keys=[board_key(quiz_id=quiz_id), board_key(subject_id=subject_id), GLOBAL_KEY],
+                args=[user_id, total_scored],
+                client=pipe
+            )
+        pipe.execute()
+
+    _redis_call(write)
+
+
+def record_score(quiz_id, subject_id, user_id, total_scored):
+    record_scores([(quiz_id, subject_id, user_id, total_scored)])
+
+
+def _best_scores(subject_ids=None):
+    """(user id, quiz id, subject id, best score) per user and quiz, from the Score table."""
+    query = (
+        db.session.query(Score.user_id, Score.quiz_id, Chapter.subject_id, func.max(Score.total_scored))
+        .join(Quiz, Quiz.id == Score.quiz_id)
+        .join(Chapter, Chapter.id == Quiz.chapter_id)
+        .filter(Score.total_scored.isnot(None))
+        .group_by(Score.user_id, Score.quiz_id, Chapter.subject_id)
+    )
+    if subject_ids is not None:
+        query = query.filter(Chapter.subject_id.in_(subject_ids))
+    return query.all()
+
+
+def _write_boards(client, subject_ids, quiz_ids, stale_keys=()):
+    """
+    Replace the boards of these subjects and quizzes with the database's numbers,
+    then redo the global board, in one MULTI. Returns the entries written.
+    """
+    boards = {}
+    rows = _best_scores(subject_ids)
+    for user_id, quiz_id, subject_id, best in rows:
+        for key in (board_key(quiz_id=quiz_id), board_key(subject_id=subject_id)):
+            board = boards.setdefault(key, {})
+            board[user_id] = board.get(user_id, 0) + best
+
+    pipe = client.pipeline(transaction=True)
+    stale = set(stale_keys)
+    stale.update(board_key(subject_id=subject_id) for subject_id in subject_ids)
+    stale.update(board_key(quiz_id=quiz_id) for quiz_id in quiz_ids)
+    if stale:
+        pipe.delete(*stale)
+    for key, board in boards.items():
+        members = list(board.items())
+        for start in range(0, len(members), ZADD_CHUNK):
+            pipe.zadd(key, dict(members[start:start + ZADD_CHUNK]))
+
+    subject_keys = [board_key(subject_id=subject_id) for subject_id, in db.session.query(Subject.id)]
+    if subject_keys:
+        pipe.zunionstore(GLOBAL_KEY, subject_keys)
+    else:
+        pipe.delete(GLOBAL_KEY)
+    pipe.execute()
+    return len(rows)
+
+
+def refresh_subjects(*subject_ids, dropped_quiz_ids=()):
+    """
+    Rebuild the boards of these subjects (and so the global board) after a commit
+    that deleted or moved scores. dropped_quiz_ids are deleted quizzes whose
+    boards must go too. Skipped until the boards have been built once.
+    """
+    subject_ids = [subject_id for subject_id in set(subject_ids) if subject_id is not None]
+    if not subject_ids and not dropped_quiz_ids:
+        return
+
+    def write(client):
+        if not client.exists(BUILT_KEY):
+            return  # rebuild() will do it all
+        quiz_ids = set(dropped_quiz_ids)
+        if subject_ids:
+            quiz_ids.update(
+                quiz_id for quiz_id, in db.session.query(Quiz.id)
+                .join(Chapter, Chapter.id == Quiz.chapter_id)
+                .filter(Chapter.subject_id.in_(subject_ids))
+            )
+        _write_boards(client, subject_ids, quiz_ids)
+
+    _redis_call(write)
+
+
+def rebuild():
+    """Rebuild every board from the Score table (raises RedisError). Returns the entries written."""
+    client = get_redis()
+    stale = list(client.scan_iter(match="leaderboard:*", count=1000))
+    subject_ids = [subject_id for subject_id, in db.session.query(Subject.id)]
+    written = _write_boards(client, subject_ids, (), stale_keys=stale)
+    client.set(BUILT_KEY, 1)
+    return written
+
+
+# ---------------------------------------------------------------- reads
+
+def _board_from_db(subject_id=None, quiz_id=None):
+    """The whole board as [(user id, score)], best first, from the Score table."""
+    best = (
+        db.session.query(
+            Score.user_id.label("user_id"),
+            func.max(Score.total_scored).label("score")
+        )
+        .filter(Score.total_scored.isnot(None))
+        .group_by(Score.user_id, Score.quiz_id)
+    )
+    if quiz_id is not None:
+        best = best.filter(Score.quiz_id == quiz_id)
+    elif subject_id is not None:
+        best = (
+            best.join(Quiz, Quiz.id == Score.quiz_id)
+            .join(Chapter, Chapter.id == Quiz.chapter_id)
+            .filter(Chapter.subject_id == subject_id)
+        )
+    best = best.subquery()
+    rows = (
+        db.session.query(best.c.user_id, func.sum(best.c.score))
+        .group_by(best.c.user_id)
+        .all()
+    )
+    # same order as ZREVRANGE: score, then member (as a string), both descending
+    return sorted(rows, key=lambda row: (row[1], str(row[0])), reverse=True)
+
+
+def top(limit, subject_id=None, quiz_id=None):
+    """The first `limit` entries of a board as [(rank, user id, score)]."""
+    key = board_key(subject_id, quiz_id)
+
+    def read(client):
+        pipe = client.pipeline(transaction=False)
+        pipe.exists(BUILT_KEY)
+        pipe.zrevrange(key, 0, limit - 1, withscores=True)
+        built, entries = pipe.execute()
+        if not built:
+            return None
+        return [(rank, int(member), _number(score)) for rank, (member, score) in enumerate(entries, start=1)]
+
+    entries = _redis_call(read) if limit > 0 else []
+    if entries is None:
+        board = _board_from_db(subject_id, quiz_id)[:limit]
+        entries = [(rank, user_id, score) for rank, (user_id, score) in enumerate(board, start=1)]
+    return entries
+
+
+def standing(user_id, neighbors=2, subject_id=None, quiz_id=None):
+    """
+    A user's place on a board: {"rank", "score", "total", "neighbors"}, where
+    neighbors are the (rank, user id, score) entries up to `neighbors` places
+    above and below, the user included. rank and score are None when the user
+    is not on the board.
+    """
+    key = board_key(subject_id, quiz_id)
+
+    def read(client):
+        pipe = client.pipeline(transaction=False)
+        pipe.exists(BUILT_KEY)
+        pipe.zrevrank(key, user_id)
+        pipe.zscore(key, user_id)
+        pipe.zcard(key)
+        built, rank, score, total = pipe.execute()
+        if not built:
+            return None
+        entries = []
+        if rank is not None:
+            start = max(rank - neighbors, 0)
+            around = client.zrevrange(key, start, rank + neighbors, withscores=True)
+            entries = [
+                (place, int(member), _number(value))
+                for place, (member, value) in enumerate(around, start=start + 1)
+            ]
+        return {
+            "rank": rank + 1 if rank is not None else None,
+            "score": _number(score) if score is not None else None,
+            "total": total,
+            "neighbors": entries,
+        }
+
+    result = _redis_call(read)
+    if result is not None:
+        return result
+
+    board = _board_from_db(subject_id, quiz_id)
+    index = next((index for index, (member, _) in enumerate(board) if member == user_id), None)
+    if index is None:
+        return {"rank": None, "score": None, "total": len(board), "neighbors": []}
+    start = max(index - neighbors, 0)
+    return {
+        "rank": index + 1,
+        "score": board[index][1],
+        "total": len(board),
+        "neighbors": [
+            (place, member, score)
+            for place, (member, score) in enumerate(board[start:index + neighbors + 1], start=start + 1)
+        ],
+    }
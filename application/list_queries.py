@@ -0,0 +1,163 @@
+from itertools import groupby
+from operator import itemgetter
+from sqlalchemy import func, select
+from application.database import db
+from application.models import Chapter, Question, Quiz, Role, Score, Subject, User, UserRoles
+from application.pagination import Listing, ListField, column_field, flag
+from application.serializers import ChapterRow, QuestionRow, QuizCount, QuizDetail, UserRow, format_date, format_datetime, format_time
+
+# The list endpoints, as keyset-paginated listings (application/pagination.py).
+#
+# Model.query.all() built a full ORM object per row, with its change tracking,
+# and kept all of them in the session's identity map until the request ended.
+# A listing selects only the columns of the fields a response shows and turns
+# each plain row straight into its serializer row type (or a dict of the
+# ?fields= asked for), so no model instance is ever created. Use them only where
+# nothing is modified.
+
+
+def _columns(*columns):
+    return {column.key: column_field(column) for column in columns}
+
+
+SUBJECTS = Listing(
+    name="subjects",
+    key=(Subject.id,),
+    fields=_columns(Subject.id, Subject.name, Subject.description),
+)
+
+CHAPTERS = Listing(
+    name="chapters",
+    key=(Chapter.id,),
+    fields=_columns(Chapter.id, Chapter.name, Chapter.description, Chapter.subject_id),
+    row_type=ChapterRow,
+    filters={"subject_id": (int, lambda value: Chapter.subject_id == value)},
+)
+
+QUIZZES = Listing(
+    name="quizzes",
+    key=(Quiz.id,),
+    fields={
+        **_columns(Quiz.id, Quiz.chapter_id),
+        "date_of_quiz": column_field(Quiz.date_of_quiz, format_date),
+        "start_time": column_field(Quiz.start_time, format_time),
+        "time_duration": column_field(Quiz.time_duration, format_time),
+        "remarks": column_field(Quiz.remarks),
+        "created_at": column_field(Quiz.created_at, format_datetime),
+    },
+    row_type=QuizDetail,
+    filters={"chapter_id": (int, lambda value: Quiz.chapter_id == value)},
+)
+
+QUESTIONS = Listing(
+    name="questions",
+    key=(Question.id,),
+    fields=_columns(
+        Question.id, Question.quiz_id, Question.question_statement,
+        Question.option1, Question.option2, Question.option3, Question.option4,
+        Question.correct_option
+    ),
+    row_type=QuestionRow,
+    filters={"quiz_id": (int, lambda value: Question.quiz_id == value)},
+)
+
+
+# The admin dashboard tree, one level per request: each node with the counts
+# of what is below it, read by correlated subqueries in the same statement.
+
+TREE_SUBJECTS = Listing(
+    name="subjects",
+    key=(Subject.id,),
+    fields={
+        **_columns(Subject.id, Subject.name, Subject.description),
+        "chapter_count": column_field(
+            select(func.count(Chapter.id)).where(Chapter.subject_id == Subject.id).scalar_subquery()
+        ),
+        "quiz_count": column_field(
+            select(func.count(Quiz.id))
+            .join(Chapter, Quiz.chapter_id == Chapter.id)
+            .where(Chapter.subject_id == Subject.id)
+            .scalar_subquery()
+        ),
+    },
+)
+
+TREE_CHAPTERS = Listing(
+    name="chapters",
+    key=(Chapter.id,),
+    fields={
+        **_columns(Chapter.id, Chapter.name, Chapter.description, Chapter.subject_id),
+        "quiz_count": column_field(
+            select(func.count(Quiz.id)).where(Quiz.chapter_id == Chapter.id).scalar_subquery()
+        ),
+        "question_count": column_field(
+            select(func.coalesce(func.sum(Quiz.question_count), 0))
+            .where(Quiz.chapter_id == Chapter.id)
+            .scalar_subquery()
+        ),
+    },
+)
+
+TREE_QUIZZES = Listing(
+    name="quizzes",
+    key=(Quiz.id,),
+    fields={
+        **_columns(Quiz.id, Quiz.chapter_id),
+        "date_of_quiz": column_field(Quiz.date_of_quiz, format_date),
+        "start_time": column_field(Quiz.start_time, format_time),
+        "time_duration": column_field(Quiz.time_duration, format_time),
+        "remarks": column_field(Quiz.remarks),
+        "question_count": column_field(Quiz.question_count),
+    },
+    row_type=QuizCount,
+)
+
+
+def _role_names(user_ids):
+    """{user id: [role names]} of these users (every user for None), in one query."""
+    statement = (
+        select(UserRoles.user_id, Role.name)
+        .join(Role, Role.id == UserRoles.role_id)
+        .order_by(UserRoles.user_id, UserRoles.id)
+    )
+    if user_ids is not None:
+        statement = statement.where(UserRoles.user_id.in_(user_ids))
+    rows = db.session.execute(statement)
+    return {user_id: [name for _, name in pairs] for user_id, pairs in groupby(rows, key=itemgetter(0))}
+
+
+def _has_role(name):
+    return User.id.in_(select(UserRoles.user_id).join(Role, Role.id == UserRoles.role_id).where(Role.name == name))
+
+
+USERS = Listing(
+    name="users",
+    key=(User.id,),
+    fields=_columns(User.id, User.email, User.full_name, User.qualification, User.dob, User.active),
+    row_type=UserRow,
+    filters={
+        "active": (flag, lambda value: User.active == value),
+        "role": (str, _has_role),
+    },
+    related={"roles": _role_names},
+)
+
+
+def _percentage(total_scored, question_count):
+    # 1 point per question
+    return round((total_scored or 0) / question_count * 100, 2) if question_count else 0
+
+
+# the logged-in user's attempts, most recent first (read_page() gets Score.user_id == ...)
+SCORES = Listing(
+    name="scores",
+    key=(Score.time_stamp_of_attempt, Score.id),
+    descending=True,
+    fields={
+        **_columns(Score.id, Score.quiz_id, Score.total_scored),
+        "score_percentage": ListField((Score.total_scored, Quiz.question_count), _percentage),
+        "time_stamp_of_attempt": column_field(Score.time_stamp_of_attempt, lambda value: format_datetime(value) or 'N/A'),
+    },
+    joins=((Quiz, Quiz.id == Score.quiz_id),),
+    filters={"quiz_id": (int, lambda value: Score.quiz_id == value)},
+)
@@ -0,0 +1,183 @@
+import threading
+import time
+from flask import current_app, g, has_request_context, request
+from redis import RedisError
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+from caching import get_redis
+
+# Per-endpoint request metrics.
+#
+# Every request records its latency, the number of SQL statements it ran and
+# the time spent in them (cursor execute hooks). Each process adds these into a
+# local registry and moves the deltas into one Redis hash every FLUSH_INTERVAL
+# seconds, so /api/admin/metrics shows the sum over all workers. Responses also
+# carry a Server-Timing header with the same numbers for the browser dev tools.
+
+METRICS_KEY = "metrics:requests"
+FLUSH_INTERVAL = 10  # seconds
+BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+
+class _Registry:
+    """Counters not yet moved to Redis, as {(endpoint, method): {field: value}}."""
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.pending = {}
+        self.last_flush = time.monotonic()
+
+    def observe(self, endpoint, method, seconds, statements, db_seconds):
+        with self.lock:
+            series = self.pending.setdefault((endpoint, method), {})
+            series["count"] = series.get("count", 0) + 1
+            series["sum"] = series.get("sum", 0.0) + seconds
+            series["sql_statements"] = series.get("sql_statements", 0) + statements
+            series["db_seconds"] = series.get("db_seconds", 0.0) + db_seconds
+            for bound in BUCKETS:
+                if seconds <= bound:
+                    field = f"bucket:{bound}"
+                    series[field] = series.get(field, 0) + 1
+
+    def take(self):
+        with self.lock:
+            pending, self.pending = self.pending, {}
+            self.last_flush = time.monotonic()
+        return pending
+
+    def give_back(self, pending):
+        """Put deltas that could not be flushed back, to be sent with the next flush."""
+        with self.lock:
+            for key, fields in pending.items():
+                series = self.pending.setdefault(key, {})
+                for field, value in fields.items():
+                    series[field] = series.get(field, 0) + value
+
+    def unflushed(self):
+        with self.lock:
+            return {key: dict(fields) for key, fields in self.pending.items()}
+
+    def due(self):
+        return time.monotonic() - self.last_flush >= FLUSH_INTERVAL
+
+
+_registry = _Registry()
+
+
+def flush():
+    """Move this process's counters into the shared Redis hash."""
+    pending = _registry.take()
+    if not pending:
+        return
+    try:
+        pipe = get_redis().pipeline(transaction=False)
+        for (endpoint, method), fields in pending.items():
+            for field, value in fields.items():
+                name = f"{endpoint}|{method}|{field}"
+                if isinstance(value, float):
+                    pipe.hincrbyfloat(METRICS_KEY, name, value)
+                else:
+                    pipe.hincrby(METRICS_KEY, name, value)
+        pipe.execute()
+    except RedisError as e:
+        current_app.logger.warning(f"Could not flush request metrics: {str(e)}")
+        _registry.give_back(pending)
+
+
+def _collect():
+    """Totals of every series, from Redis plus whatever could not be flushed."""
+    flush()
+    totals = {}
+    try:
+        shared = get_redis().hgetall(METRICS_KEY)
+    except RedisError as e:
+        current_app.logger.warning(f"Could not read request metrics: {str(e)}")
+        shared = {}
+    for name, value in shared.items():
+        endpoint, method, field = name.decode().split("|", 2)
+        totals.setdefault((endpoint, method), {})[field] = float(value)
+    for key, fields in _registry.unflushed().items():
+        series = totals.setdefault(key, {})
+        for field, value in fields.items():
+            series[field] = series.get(field, 0) + value
+    return totals
+
+
+def _number(value):
+    return repr(int(value)) if float(value).is_integer() else repr(float(value))
+
+
+def render_prometheus():
+    """All series in the Prometheus text exposition format."""
+    totals = _collect()
+    lines = [
+        "# HELP quizmaster_request_duration_seconds Request latency per endpoint.",
+        "# TYPE quizmaster_request_duration_seconds histogram",
+    ]
+    for (endpoint, method), fields in sorted(totals.items()):
+        labels = f'endpoint="{endpoint}",method="{method}"'
+        for bound in BUCKETS:
+            lines.append(
+                f'quizmaster_request_duration_seconds_bucket{{{labels},le="{bound}"}} '
+                f'{_number(fields.get(f"bucket:{bound}", 0))}'
+            )
+        lines.append(f'quizmaster_request_duration_seconds_bucket{{{labels},le="+Inf"}} {_number(fields.get("count", 0))}')
+        lines.append(f'quizmaster_request_duration_seconds_sum{{{labels}}} {_number(fields.get("sum", 0))}')
+        lines.append(f'quizmaster_request_duration_seconds_count{{{labels}}} {_number(fields.get("count", 0))}')
+
+    for metric, field, help_text in (
+        ("quizmaster_request_sql_statements_total", "sql_statements", "SQL statements run by requests per endpoint."),
+        ("quizmaster_request_db_seconds_total", "db_seconds", "Time spent in SQL statements per endpoint."),
+    ):
+        lines.append(f"# HELP {metric} {help_text}")
+        lines.append(f"# TYPE {metric} counter")
+        for (endpoint, method), fields in sorted(totals.items()):
+            lines.append(f'{metric}{{endpoint="{endpoint}",method="{method}"}} {_number(fields.get(field, 0))}')
+    return "\n".join(lines) + "\n"
+
+
+# The start time is kept on the statement's execution context, which is
+# dropped with it when the statement fails; nothing is left on the pooled
+# connection for a later statement to pick up.
+
+@event.listens_for(Engine, "before_cursor_execute")
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    if context is not None and has_request_context() and "metrics_sql_count" in g:
+        context.metrics_started = time.perf_counter()
+
+
+@event.listens_for(Engine, "after_cursor_execute")
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    started = getattr(context, "metrics_started", None)
+    if started is None or not has_request_context() or "metrics_sql_count" not in g:
+        return
+    g.metrics_sql_count += 1
+    g.metrics_db_seconds += time.perf_counter() - started
+
+
+def _start_request():
+    g.metrics_started = time.perf_counter()
+    g.metrics_sql_count = 0
+    g.metrics_db_seconds = 0.0
+
+
+def _finish_request(response):
+    if "metrics_started" not in g:
+        return response
+    seconds = time.perf_counter() - g.metrics_started
+    endpoint = request.endpoint or "unmatched"
+    _registry.observe(endpoint, request.method, seconds, g.metrics_sql_count, g.metrics_db_seconds)
+
+    # streamed responses are still running; this is the time to the first byte
+    response.headers["Server-Timing"] = (
+        f"app;dur={seconds * 1000:.1f}, "
+        f'db;dur={g.metrics_db_seconds * 1000:.1f};desc="{g.metrics_sql_count} queries"'
+    )
+    if _registry.due():
+        flush()
+    return response
+
+
+def init_metrics(app):
+    app.before_request(_start_request)
+    app.after_request(_finish_request)
@@ -0,0 +1,99 @@
+from sqlalchemy import bindparam, inspect, text
+from application.database import db
+from application.models import Quiz
+from application.search import ensure_search_index
+
+# db.create_all() only creates missing tables, it never changes existing ones.
+# Each step below upgrades an older database in place and is safe to run again.
+
+
+def _columns(table):
+    return {column["name"] for column in inspect(db.engine).get_columns(table)}
+
+
+def add_quiz_question_count():
+    """Quiz.question_count, backfilled from the Question table."""
+    if "question_count" in _columns("quiz"):
+        return False
+    db.session.execute(text("ALTER TABLE quiz ADD COLUMN question_count INTEGER NOT NULL DEFAULT 0"))
+    db.session.execute(text(
+        "UPDATE quiz SET question_count = "
+        "(SELECT COUNT(*) FROM question WHERE question.quiz_id = quiz.id)"
+    ))
+    return True
+
+
+def add_quiz_version():
+    """Quiz.version, the key of the cached quiz snapshots."""
+    if "version" in _columns("quiz"):
+        return False
+    db.session.execute(text("ALTER TABLE quiz ADD COLUMN version INTEGER NOT NULL DEFAULT 1"))
+    return True
+
+
+def add_score_submission_key():
+    """Score.submission_key, the idempotency key of write-behind submissions."""
+    if "submission_key" in _columns("score"):
+        return False
+    db.session.execute(text("ALTER TABLE score ADD COLUMN submission_key VARCHAR(64)"))
+    db.session.execute(text(
+        "CREATE UNIQUE INDEX IF NOT EXISTS ix_score_submission_key ON score (submission_key)"
+    ))
+    return True
+
+
+def add_quiz_schedule():
+    """Quiz.starts_at / Quiz.ends_at with their indexes, backfilled from the date, start time and duration."""
+    if "starts_at" in _columns("quiz"):
+        return False
+    db.session.execute(text("ALTER TABLE quiz ADD COLUMN starts_at DATETIME"))
+    db.session.execute(text("ALTER TABLE quiz ADD COLUMN ends_at DATETIME"))
+    db.session.execute(text("CREATE INDEX IF NOT EXISTS ix_quiz_starts_at ON quiz (starts_at)"))
+    db.session.execute(text("CREATE INDEX IF NOT EXISTS ix_quiz_ends_at ON quiz (ends_at)"))
+
+    rows = db.session.query(Quiz.id, Quiz.date_of_quiz, Quiz.start_time, Quiz.time_duration).all()
+    schedules = []
+    for quiz_id, date_of_quiz, start_time, time_duration in rows:
+        starts_at, ends_at = Quiz.schedule_for(date_of_quiz, start_time, time_duration)
+        schedules.append({"quiz_id": quiz_id, "starts_at": starts_at, "ends_at": ends_at})
+    if schedules:
+        quiz = Quiz.__table__
+        db.session.execute(
+            quiz.update()
+            .where(quiz.c.id == bindparam("quiz_id"))
+            .values(starts_at=bindparam("starts_at"), ends_at=bindparam("ends_at")),
+            schedules
+        )
+    return True
+
+
+def add_score_user_index():
+    """Index of a user's scores by attempt time, for the per-user summary and score list."""
+    if "ix_score_user_id_time_stamp" in {index["name"] for index in inspect(db.engine).get_indexes("score")}:
+        return False
+    db.session.execute(text(
+        "CREATE INDEX IF NOT EXISTS ix_score_user_id_time_stamp ON score (user_id, time_stamp_of_attempt)"
+    ))
+    return True
+
+
+def create_quiz_search_index():
+    """FTS5 quiz search table and its sync triggers (SQLite only), filled from existing quizzes."""
+    return ensure_search_index()
+
+
+MIGRATIONS = [
+    add_quiz_question_count,
+    create_quiz_search_index,
+    add_quiz_version,
+    add_score_submission_key,
+    add_quiz_schedule,
+    add_score_user_index,
+]
+
+
+def run_migrations():
+    """Apply every pending step and return the names of the ones that ran."""
+    applied = [migration.__name__ for migration in MIGRATIONS if migration()]
+    db.session.commit()
+    return applied
@@ -2,7 +2,7 @@
 from flask_sqlalchemy import SQLAlchemy  
 from flask_security import UserMixin , RoleMixin
 from .database import db 
-from datetime import datetime
+from datetime import datetime, timedelta
 
 
 
@@ -16,7 +16,7 @@ class User(db.Model, UserMixin): #user(Table name )
     dob = db.Column(db.String(255))
     fs_uniquifier = db.Column(db.String,unique = True, nullable=False)# Encrypted version of email and password --> Token  .
     active = db.Column(db.Boolean, nullable=False)
-    roles = db.relationship('Role', backref='users', secondary='user_roles',cascade="all")
+    roles = db.relationship('Role', backref='users', secondary='user_roles')  # no delete cascade: roles are shared
 
 
 class Role(db.Model,RoleMixin): # role (Table name )
@@ -34,6 +34,7 @@ class Subject(db.Model):
     name = db.Column(db.String(100), unique=True, nullable=False)
     description = db.Column(db.Text)
     chapters = db.relationship('Chapter', backref='subject', lazy=True,cascade="all, delete-orphan")
+    score_rollup = db.relationship('SubjectScoreRollup', uselist=False, lazy=True, cascade="all, delete-orphan")
 
 class Chapter(db.Model):
     id = db.Column(db.Integer, primary_key=True)
@@ -50,10 +51,47 @@ class Quiz(db.Model):
     time_duration = db.Column(db.Time(5))  # Format  is HH:MM
     remarks = db.Column(db.Text)
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
+    question_count = db.Column(db.Integer, nullable=False, default=0, server_default="0")  # kept in sync by the question routes
+    version = db.Column(db.Integer, nullable=False, default=1, server_default="1")  # bumped on every quiz/question edit
+    # date_of_quiz + start_time and starts_at + time_duration, kept by refresh_schedule()
+    starts_at = db.Column(db.DateTime, index=True)
+    ends_at = db.Column(db.DateTime, index=True)
 
     questions = db.relationship('Question', backref='quiz', lazy=True,cascade="all, delete-orphan")
 
     scores = db.relationship('Score', backref='quiz', lazy=True,cascade="all, delete-orphan")
+    score_rollup = db.relationship('QuizScoreRollup', uselist=False, lazy=True, cascade="all, delete-orphan")
+
+    @staticmethod
+    def schedule_for(date_of_quiz, start_time, time_duration):
+        """
+        (starts_at, ends_at) of a quiz. A quiz without a start time starts at midnight
+        of its day; one without a duration has no end.
+        """
+        if date_of_quiz is None:
+            return None, None
+        starts_at = datetime.combine(date_of_quiz.date(), start_time or datetime.min.time())
+        ends_at = None
+        if time_duration is not None:
+            ends_at = starts_at + timedelta(hours=time_duration.hour, minutes=time_duration.minute)
+        return starts_at, ends_at
+
+    def refresh_schedule(self):
+        """Call after changing date_of_quiz, start_time or time_duration."""
+        self.starts_at, self.ends_at = Quiz.schedule_for(self.date_of_quiz, self.start_time, self.time_duration)
+
+    # Each of these is a range condition on one indexed column.
+    @staticmethod
+    def upcoming(now):
+        return Quiz.starts_at > now
+
+    @staticmethod
+    def live(now):
+        return (Quiz.starts_at <= now) & (Quiz.ends_at > now)
+
+    @staticmethod
+    def closed(now):
+        return Quiz.ends_at <= now
 
 class Question(db.Model):
     id = db.Column(db.Integer, primary_key=True)
@@ -71,5 +109,27 @@ class Score(db.Model):
     user_id = db.Column(db.Integer, db.ForeignKey('user.id', ondelete="CASCADE"), nullable=False)
     time_stamp_of_attempt = db.Column(db.DateTime, default=datetime.utcnow)  # Timestamp of the quiz attempt
     total_scored = db.Column(db.Integer)
+    # idempotency key of buffered submissions (application/score_queue.py), NULL otherwise
+    submission_key = db.Column(db.String(64), unique=True, index=True)
     # Relationship to access user details .....
     user = db.relationship('User', backref=db.backref('scores', lazy=True))
+
+    # a user's attempts by date: the user summary, score list and export
+    __table_args__ = (db.Index("ix_score_user_id_time_stamp", "user_id", "time_stamp_of_attempt"),)
+
+
+# Rollups are maintained on every score submission (see application/rollups.py)
+# so the summary charts never have to aggregate the whole Score table.
+class SubjectScoreRollup(db.Model):
+    subject_id = db.Column(db.Integer, db.ForeignKey('subject.id', ondelete="CASCADE"), primary_key=True)
+    attempts = db.Column(db.Integer, nullable=False, default=0)
+    max_score = db.Column(db.Integer)
+    score_sum = db.Column(db.Integer, nullable=False, default=0)
+    score_count = db.Column(db.Integer, nullable=False, default=0)  # attempts with a non-null score
+
+class QuizScoreRollup(db.Model):
+    quiz_id = db.Column(db.Integer, db.ForeignKey('quiz.id', ondelete="CASCADE"), primary_key=True)
+    attempts = db.Column(db.Integer, nullable=False, default=0)
+    max_score = db.Column(db.Integer)
+    score_sum = db.Column(db.Integer, nullable=False, default=0)
+    score_count = db.Column(db.Integer, nullable=False, default=0)
@@ -0,0 +1,187 @@
+import smtplib
+import time
+from flask import current_app
+from markupsafe import Markup
+from redis import RedisError
+from sqlalchemy import func
+from application.database import db
+from application.models import User
+from caching import get_redis
+from mailer import mail
+
+
+ADMIN_EMAIL = 'admin@quizmaster.com'
+
+# Errors after which the SMTP session is dropped and opened again before retrying
+CONNECTION_ERRORS = (smtplib.SMTPException, OSError)
+
+
+# Send slots are handed out by one Redis key shared by every worker, so
+# MAIL_SEND_RATE_LIMIT holds for all reminder chunks together however many run
+# at once. The script reserves the next free slot, at least `interval` after the
+# previous one, by Redis' own clock, and returns how long to wait for it.
+THROTTLE_KEY = "mail:send_slot"
+
+_RESERVE_SLOT_SCRIPT = """
+local time = redis.call('TIME')
+local now = tonumber(time[1]) * 1000000 + tonumber(time[2])
+local slot = math.max(tonumber(redis.call('GET', KEYS[1]) or '0'), now)
+local interval = tonumber(ARGV[1])
+redis.call('SET', KEYS[1], slot + interval, 'PX', math.floor((slot + interval - now) / 1000) + 1000)
+return slot - now
+"""
+
+
+class SendThrottle:
+    """
+    Keeps all senders together under MAIL_SEND_RATE_LIMIT messages per second.
+    While Redis is unreachable it only paces its own session.
+    """
+
+    def __init__(self, rate_limit, key=THROTTLE_KEY):
+        self.interval = 1.0 / rate_limit if rate_limit else 0.0
+        self.key = key
+        self.next_slot = 0.0
+        self.shared = True
+
+    def wait(self):
+        if not self.interval:
+            return
+        delay = self._shared_delay() if self.shared else None
+        if delay is None:
+            delay = self._local_delay()
+        if delay > 0:
+            time.sleep(delay)
+
+    def _shared_delay(self):
+        try:
+            script = get_redis().register_script(_RESERVE_SLOT_SCRIPT)
+            return script(keys=[self.key], args=[round(self.interval * 1000000)]) / 1000000
+        except RedisError as e:
+            current_app.logger.warning(f"Shared mail send rate unavailable, pacing this session only: {str(e)}")
+            self.shared = False
+            return None
+
+    def _local_delay(self):
+        now = time.monotonic()
+        slot = max(now, self.next_slot)
+        self.next_slot = slot + self.interval
+        return slot - now
+
+
+def _reconnect(conn):
+    if conn.host is None:
+        return
+    try:
+        conn.host.quit()
+    except Exception:
+        pass
+    conn.host = conn.configure_host()
+
+
+def send_with_retry(conn, msg, throttle=None):
+    """
+    Send one message over an open mail.connect() session.
+    Retries with exponential backoff and returns True when the message went out.
+    """
+    max_retries = current_app.config.get("MAIL_SEND_MAX_RETRIES", 3)
+    backoff = current_app.config.get("MAIL_SEND_RETRY_BACKOFF", 2)
+
+    for attempt in range(max_retries + 1):
+        if throttle:
+            throttle.wait()
+        try:
+            conn.send(msg)
+            return True
+        except Exception as e:
+            if attempt == max_retries:
+                current_app.logger.error(f"Failed to send email to {', '.join(msg.recipients)}: {str(e)}")
+                return False
+            current_app.logger.warning(
+                f"Retrying email to {', '.join(msg.recipients)} (attempt {attempt + 1}): {str(e)}"
+            )
+            time.sleep(backoff * (2 ** attempt))
+            if isinstance(e, CONNECTION_ERRORS):
+                try:
+                    _reconnect(conn)
+                except Exception as reconnect_error:
+                    current_app.logger.error(f"Could not reconnect to the mail server: {str(reconnect_error)}")
+    return False
+
+
+def open_session():
+    """Open one SMTP session (a mail.connect() connection) to be reused for many messages."""
+    return mail.connect().__enter__()
+
+
+def close_quietly(conn):
+    """Leave a mail.connect() session without failing on an already dropped connection."""
+    try:
+        conn.__exit__(None, None, None)
+    except Exception:
+        pass
+
+
+def plan_user_chunks(chunk_size):
+    """
+    Split the active users into keyset ranges of about chunk_size users.
+    Returns [(after_id, upto_id), ...]; the last range is open ended (upto_id is None).
+    Only the boundary ids are read, never the users themselves.
+    """
+    numbered = (
+        db.select(User.id, func.row_number().over(order_by=User.id).label("position"))
+        .where(User.active == True)
+        .subquery()
+    )
+    boundaries = db.session.execute(
+        db.select(numbered.c.id)
+        .where(numbered.c.position % chunk_size == 0)
+        .order_by(numbered.c.id)
+    ).scalars().all()
+
+    chunks = []
+    after_id = 0
+    for upto_id in boundaries:
+        chunks.append((after_id, upto_id))
+        after_id = upto_id
+    chunks.append((after_id, None))
+    return chunks
+
+
+def iter_active_users(after_id, upto_id=None, page_size=200):
+    """
+    Stream (id, email, full_name) of active users with id in (after_id, upto_id],
+    one keyset page at a time so a chunk never holds all of its users in memory.
+    """
+    while True:
+        page = db.session.query(User.id, User.email, User.full_name).filter(
+            User.active == True,
+            User.id > after_id
+        )
+        if upto_id is not None:
+            page = page.filter(User.id <= upto_id)
+        rows = page.order_by(User.id).limit(page_size).all()
+        if not rows:
+            return
+        yield from rows
+        after_id = rows[-1][0]
+
+
+def monthly_report_renderer(jinja_env, quizzes, month_label):
+    """
+    Render the quiz table shared by every monthly report once, and return a
+    function that renders the full email for one recipient around it.
+    quizzes are (quiz_id, subject_name, chapter_name, created_at) rows.
+    """
+    quiz_table = Markup(jinja_env.get_template("email/monthly_quiz_table.html").render(quizzes=quizzes))
+    page = jinja_env.get_template("email/monthly_report.html")
+
+    def render(user_name):
+        return page.render(
+            user_name=user_name,
+            month_label=month_label,
+            quiz_count=len(quizzes),
+            quiz_table=quiz_table
+        )
+
+    return render
@@ -0,0 +1,261 @@
+import base64
+import binascii
+import json
+from dataclasses import dataclass, field
+from datetime import datetime
+from operator import itemgetter
+from sqlalchemy import and_, false, func, or_, select
+from application.database import db
+
+# Keyset pagination for the list routes.
+#
+# A list route declares a Listing: its fields (each made of one or more
+# columns), its sort key and the filters it accepts. read_page() turns the
+# query string into one page of it:
+#
+#   ?limit=50              page size (DEFAULT_LIMIT, at most MAX_LIMIT)
+#   ?after=<cursor>        the page after the one that returned this "next" cursor
+#   ?fields=id,name        only these fields (the default is all of them)
+#   ?count=1               also the total number of rows matching the filters
+#   ?quiz_id=3 ...         the listing's own filters
+#
+# The cursor holds the sort key of the last row, so the next page is a
+# "WHERE key > last key ORDER BY key LIMIT n" range scan. It does not slow down
+# on later pages the way OFFSET does, and rows added or deleted meanwhile do not
+# shift it. Only the columns of the requested fields are selected.
+
+DEFAULT_LIMIT = 50
+MAX_LIMIT = 500
+YIELD_PER = 1000
+
+
+class PageArgumentError(ValueError):
+    """A bad list query string (unknown field or filter value, damaged cursor): answered with a 400."""
+
+
+@dataclass(frozen=True)
+class ListField:
+    """A field of a listing: its columns, and build(*values) when it is not just the one column's value."""
+    columns: tuple
+    build: object = None
+
+
+def column_field(column, build=None):
+    return ListField((column,), build)
+
+
+def flag(value):
+    """A filter value meaning true or false (1/0, true/false, yes/no)."""
+    lowered = value.strip().lower()
+    if lowered in ("1", "true", "yes"):
+        return True
+    if lowered in ("0", "false", "no"):
+        return False
+    raise ValueError(value)
+
+
+@dataclass(frozen=True)
+class Listing:
+    """
+    A paginated list. name is the response key. key is the sort key (unique,
+    e.g. (Model.id,) or (Model.created_at, Model.id)), descending or not.
+    filters maps a query argument to (convert, clause): clause(convert(value))
+    is added to the WHERE. Full rows are row_type(*fields) when given, dicts
+    otherwise. related maps a field to loader(key ids or None for all) ->
+    {id: value}, for values read by a second query instead of a column.
+    """
+    name: str
+    key: tuple
+    fields: dict
+    row_type: type = None
+    descending: bool = False
+    joins: tuple = ()
+    filters: dict = field(default_factory=dict)
+    related: dict = field(default_factory=dict)
+
+    def field_names(self):
+        return list(self.fields) + list(self.related)
+
+
+# ---------------------------------------------------------------- cursors
+
+def encode_cursor(values):
+    raw = json.dumps([value.isoformat() if isinstance(value, datetime) else value for value in values])
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip("=")
+
+
+def decode_cursor(listing, cursor):
+    try:
+        values = json.loads(base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)))
+        if not isinstance(values, list) or len(values) != len(listing.key):
+            raise ValueError(cursor)
+        return [
+            None if value is None
+            else datetime.fromisoformat(value) if column.type.python_type is datetime
+            else column.type.python_type(value)
+            for column, value in zip(listing.key, values)
+        ]
+    except (ValueError, TypeError, binascii.Error):
+        raise PageArgumentError("Invalid 'after' cursor")
+
+
+def _nullable(column):
+    return getattr(getattr(column, "expression", column), "nullable", True)
+
+
+def _order_by(listing):
+    order = []
+    for column in listing.key:
+        ordered = column.desc() if listing.descending else column.asc()
+        # NULLs last in both directions, as _after() expects (and as SQLite sorts them descending)
+        order.append(ordered.nulls_last() if _nullable(column) else ordered)
+    return order
+
+
+def _after(listing, values):
+    """WHERE clause of the rows sorting after the key values `values`."""
+    clauses, equal = [], []
+    for column, value in zip(listing.key, values):
+        if value is not None:
+            beyond = column < value if listing.descending else column > value
+            if _nullable(column):
+                beyond = or_(beyond, column.is_(None))
+            clauses.append(and_(*equal, beyond))
+        # nothing sorts after a NULL but other NULLs, which the next key column orders
+        equal.append(column.is_(None) if value is None else column == value)
+    return or_(false(), *clauses)
+
+
+# ---------------------------------------------------------------- reading
+
+def _statement(listing, field_names, where):
+    """(select of the key and the fields' columns, {field: getter of its value from a row})."""
+    expressions, positions = [], {}
+
+    def position(column):
+        if id(column) not in positions:
+            positions[id(column)] = len(expressions)
+            expressions.append(column)
+        return positions[id(column)]
+
+    for column in listing.key:
+        position(column)
+    getters = {}
+    for name in field_names:
+        if name in listing.related:
+            continue
+        spec = listing.fields[name]
+        indexes = [position(column) for column in spec.columns]
+        if spec.build is None:
+            getters[name] = itemgetter(indexes[0])
+        else:
+            getters[name] = lambda row, build=spec.build, indexes=indexes: build(*(row[i] for i in indexes))
+
+    statement = select(*expressions)
+    for target, onclause in listing.joins:
+        statement = statement.join(target, onclause)
+    return statement.where(*where), getters
+
+
+def fetch(listing, field_names=None, where=(), after=None, limit=None):
+    """
+    Rows of a listing in key order, after the key values `after`, at most
+    `limit` of them (all of them without). field_names=None gives full rows
+    (row_type), a list of names gives dicts of those fields.
+    Returns (rows, key values of the last row when more rows follow, else None).
+    """
+    full = field_names is None
+    field_names = listing.field_names() if full else field_names
+    statement, getters = _statement(listing, field_names, where)
+    if after is not None:
+        statement = statement.where(_after(listing, after))
+    statement = statement.order_by(*_order_by(listing))
+    if limit is not None:
+        # one extra row tells whether there is a next page
+        statement = statement.limit(limit + 1)
+
+    result = db.session.execute(statement.execution_options(yield_per=YIELD_PER))
+    if limit is None:
+        source, ids = result, None
+    else:
+        source = result.all()
+        ids = [row[0] for row in source]
+    for name in field_names:
+        if name in listing.related:
+            # row[0] is the first key column, the id the loader's values are keyed by
+            values = listing.related[name](ids)
+            getters[name] = lambda row, values=values: values.get(row[0], [])
+    getters = [getters[name] for name in field_names]
+
+    if full and listing.row_type is not None:
+        row_type = listing.row_type
+        rows = [row_type(*[get(row) for get in getters]) for row in source]
+    else:
+        rows = [{name: get(row) for name, get in zip(field_names, getters)} for row in source]
+
+    if limit is None or len(rows) <= limit:
+        return rows, None
+    return rows[:limit], tuple(source[limit - 1][:len(listing.key)])
+
+
+def count(listing, where=()):
+    statement, _ = _statement(listing, [], where)
+    return db.session.execute(select(func.count()).select_from(statement.subquery())).scalar()
+
+
+def _field_names(listing, value):
+    if not value:
+        return None
+    names = [name.strip() for name in value.split(",") if name.strip()]
+    unknown = [name for name in names if name not in listing.fields and name not in listing.related]
+    if unknown:
+        raise PageArgumentError(
+            f"Unknown field(s) {', '.join(unknown)}; choose from {', '.join(listing.field_names())}"
+        )
+    return list(dict.fromkeys(names))
+
+
+def _filters(listing, args):
+    clauses = []
+    for name, (convert, clause) in listing.filters.items():
+        value = args.get(name)
+        if value is None or value == "":
+            continue
+        try:
+            clauses.append(clause(convert(value)))
+        except ValueError:
+            raise PageArgumentError(f"Invalid value for '{name}': {value}")
+    return clauses
+
+
+def page_bounds(listing, args):
+    """(limit, key values to start after or None) from ?limit= and ?after=. Raises PageArgumentError."""
+    limit = min(max(args.get("limit", DEFAULT_LIMIT, type=int), 1), MAX_LIMIT)
+    after = decode_cursor(listing, args["after"]) if args.get("after") else None
+    return limit, after
+
+
+def read_page(listing, args, *where):
+    """
+    One page of a listing from a request's query string (args), as a response
+    payload: {listing.name: rows, "next": cursor or None, "limit": n} and
+    "total" when ?count= asks for it. where: extra clauses, e.g. the current
+    user's rows only. Raises PageArgumentError.
+    """
+    limit, after = page_bounds(listing, args)
+    field_names = _field_names(listing, args.get("fields"))
+    clauses = [*where, *_filters(listing, args)]
+
+    rows, next_key = fetch(listing, field_names, clauses, after, limit)
+    page = {
+        listing.name: rows,
+        "next": encode_cursor(next_key) if next_key is not None else None,
+        "limit": limit,
+    }
+    try:
+        wants_total = flag(args.get("count", "0"))
+    except ValueError:
+        raise PageArgumentError(f"Invalid value for 'count': {args.get('count')}")
+    if wants_total:
+        page["total"] = count(listing, clauses)
+    return page
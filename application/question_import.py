@@ -0,0 +1,209 @@
+import csv
+import io
+import json
+import zipfile
+from itertools import islice
+import pyexcel
+import pyexcel_io.exceptions
+from application.database import db
+from application.models import Question, Quiz
+from application import quiz_snapshots
+from application.pagination import flag
+
+# Bulk question import (POST /api/admin/questions/import, flask --app app import-questions).
+#
+# Rows come from a CSV or XLSX sheet (header row: quiz_id, question_statement,
+# option1..option4, correct_option) or a JSON list of objects with the same keys.
+# They are read and validated one at a time and inserted BATCH_SIZE at a time
+# with executemany, all in the caller's transaction; Quiz.question_count and
+# the quiz versions are updated once per quiz at the end.
+
+FORMATS = ("csv", "xlsx", "json")
+BATCH_SIZE = 500
+MAX_REPORTED_ERRORS = 1000
+
+
+class ImportFormatError(ValueError):
+    """The file as a whole cannot be read (unknown format, broken JSON, ...)."""
+
+
+def format_of(filename):
+    extension = filename.rsplit(".", 1)[-1].lower() if "." in (filename or "") else ""
+    if extension not in FORMATS:
+        raise ImportFormatError(f"Unsupported file type {extension or filename!r}, use one of: {', '.join(FORMATS)}")
+    return extension
+
+
+def read_rows(stream, file_format):
+    """(row number, dict) for every row; numbers are as a spreadsheet shows them (header = row 1)."""
+    if file_format == "json":
+        try:
+            data = json.load(stream)
+        except ValueError as e:
+            raise ImportFormatError(f"Invalid JSON: {e}")
+        yield from json_rows(data)
+        return
+
+    try:
+        if file_format == "csv":
+            records = pyexcel.iget_records(file_type="csv", file_stream=io.TextIOWrapper(stream, encoding="utf-8-sig"))
+        else:
+            records = pyexcel.iget_records(file_type="xlsx", file_content=stream.read())
+        for number, record in enumerate(records, start=2):
+            yield number, dict(record)
+    except (pyexcel.exceptions.FileTypeNotSupported, pyexcel_io.exceptions.SupportingPluginAvailableButNotInstalled) as e:
+        raise ImportFormatError(str(e))
+    except UnicodeDecodeError as e:
+        raise ImportFormatError(f"The file is not UTF-8 text: {e}")
+    except csv.Error as e:
+        raise ImportFormatError(f"Invalid CSV: {e}")
+    except zipfile.BadZipFile as e:
+        raise ImportFormatError(f"Invalid XLSX: {e}")
+    finally:
+        pyexcel.free_resources()
+
+
+def json_rows(data):
+    """(row number, dict) for a JSON list of questions or {"questions": [...]}, counted from 1."""
+    if isinstance(data, dict):
+        data = data.get("questions")
+    if not isinstance(data, list):
+        raise ImportFormatError('JSON must be a list of questions or {"questions": [...]}')
+    for number, record in enumerate(data, start=1):
+        yield number, record if isinstance(record, dict) else None
+
+
+def _text(value):
+    if value is None:
+        return None
+    value = str(value).strip()
+    return value or None
+
+
+def _integer(value):
+    if isinstance(value, bool):
+        return None
+    if isinstance(value, float) and value.is_integer():
+        return int(value)
+    try:
+        return int(str(value).strip())
+    except (TypeError, ValueError):
+        return None
+
+
+def options(quiz_id, skip_invalid):
+    """
+    (default quiz id or None, skip_invalid) from the request: form/query strings
+    or JSON values. skip_invalid is a boolean or 1/0, true/false, yes/no.
+    Raises ImportFormatError for anything else.
+    """
+    default_quiz_id = None
+    if _text(quiz_id) is not None:
+        default_quiz_id = _integer(quiz_id)
+        if default_quiz_id is None:
+            raise ImportFormatError(f"quiz_id must be a number, not {quiz_id!r}")
+
+    if isinstance(skip_invalid, bool) or _text(skip_invalid) is None:
+        return default_quiz_id, bool(skip_invalid)
+    try:
+        return default_quiz_id, flag(str(skip_invalid))
+    except ValueError:
+        raise ImportFormatError(f"skip_invalid must be true or false, not {skip_invalid!r}")
+
+
+def validate(record, default_quiz_id, quiz_exists):
+    """(insert parameters, None) for a good row, (None, [problems]) otherwise."""
+    if record is None:
+        return None, ["not an object"]
+    problems = []
+
+    quiz_id = _integer(record.get("quiz_id")) if _text(record.get("quiz_id")) else default_quiz_id
+    if quiz_id is None:
+        problems.append("quiz_id is missing or not a number")
+    elif not quiz_exists(quiz_id):
+        problems.append(f"quiz {quiz_id} does not exist")
+
+    statement = _text(record.get("question_statement"))
+    if not statement:
+        problems.append("question_statement is empty")
+
+    options = {}
+    for number in range(1, 5):
+        option = _text(record.get(f"option{number}"))
+        if option is not None and len(option) > 255:
+            problems.append(f"option{number} is longer than 255 characters")
+        options[f"option{number}"] = option
+
+    correct = _integer(record.get("correct_option"))
+    if correct not in (1, 2, 3, 4):
+        problems.append("correct_option must be 1, 2, 3 or 4")
+    elif options[f"option{correct}"] is None:
+        problems.append(f"correct_option points at an empty option{correct}")
+
+    if problems:
+        return None, problems
+    return {"quiz_id": quiz_id, "question_statement": statement, "correct_option": correct, **options}, None
+
+
+def import_questions(rows, default_quiz_id=None, skip_invalid=False, batch_size=BATCH_SIZE):
+    """
+    Validate and insert rows from read_rows() in the caller's transaction.
+
+    With skip_invalid=False nothing should be kept if any row is invalid: the
+    caller rolls back when report["invalid"] is not 0. Returns the report
+    (rows read, imported, invalid, per-row errors, quizzes touched); the caller
+    commits and then calls quiz_snapshots.publish_versions(*report["quiz_ids"]).
+    """
+    known = {}
+
+    def quiz_exists(quiz_id):
+        if quiz_id not in known:
+            known[quiz_id] = db.session.get(Quiz, quiz_id) is not None
+        return known[quiz_id]
+
+    added = {}          # quiz id -> questions inserted
+    errors = []
+    invalid = 0
+    read = 0
+
+    def good_rows():
+        nonlocal invalid, read
+        for number, record in rows:
+            read += 1
+            params, problems = validate(record, default_quiz_id, quiz_exists)
+            if problems:
+                invalid += 1
+                if len(errors) < MAX_REPORTED_ERRORS:
+                    errors.append({"row": number, "errors": problems})
+                continue
+            if invalid and not skip_invalid:
+                continue  # the import will be rolled back; keep validating for the report
+            added[params["quiz_id"]] = added.get(params["quiz_id"], 0) + 1
+            yield params
+
+    good = good_rows()
+    while True:
+        batch = list(islice(good, batch_size))
+        if not batch:
+            break
+        db.session.execute(db.insert(Question), batch)
+
+    kept = skip_invalid or not invalid
+    imported = sum(added.values()) if kept else 0
+    if imported:
+        quiz = Quiz.__table__
+        db.session.execute(
+            db.update(quiz).where(quiz.c.id == db.bindparam("quiz")).values(
+                question_count=quiz.c.question_count + db.bindparam("added")
+            ),
+            [{"quiz": quiz_id, "added": count} for quiz_id, count in added.items()]
+        )
+        quiz_snapshots.bump_versions(*added)
+
+    return {
+        "rows": read,
+        "imported": imported,
+        "invalid": invalid,
+        "errors": errors,
+        "quiz_ids": sorted(added) if kept else [],
+    }
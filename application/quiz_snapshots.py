@@ -0,0 +1,182 @@
+import json
+from datetime import datetime
+from flask import abort, current_app
+from redis import RedisError
+from sqlalchemy.orm import joinedload, selectinload
+from application.database import db
+from application.models import Quiz
+from application.serializers import format_date, format_time
+from caching import get_redis
+
+# Immutable snapshot of everything the attempt route needs for one quiz version:
+# schedule, answer key and the pre-serialized GET payload. It lives in Redis
+# (shared by all workers) and in a small per-process dict, so a burst of students
+# starting or submitting the same quiz does not read the catalog tables at all.
+#
+# Quiz.version is bumped by the quiz and question CRUD routes; Redis holds a
+# pointer to the current version of each quiz that those routes refresh; the
+# delete routes (including the subject and chapter cascades) drop it, so the
+# next read falls back to the database and gets a 404. A submission that still
+# reaches a deleted quiz fails its insert, and the route then calls
+# forget_deleted() instead of answering 500.
+
+VERSION_KEY = "quiz_version:{quiz_id}"
+SNAPSHOT_KEY = "quiz_snapshot:{quiz_id}:{version}"
+POINTER_TIMEOUT = 3600        # seconds; bounds staleness if a refresh is ever missed
+SNAPSHOT_TIMEOUT = 86400
+LOCAL_LIMIT = 256             # snapshots kept per process
+
+_local = {}
+
+
+def _redis_call(action, fallback=None):
+    try:
+        return action(get_redis())
+    except RedisError as e:
+        current_app.logger.warning(f"Quiz snapshot cache unavailable: {str(e)}")
+        return fallback
+
+
+def bump_versions(*quiz_ids):
+    """Give the quizzes a new version in the caller's transaction; call publish_versions after commit."""
+    quiz_ids = [quiz_id for quiz_id in set(quiz_ids) if quiz_id is not None]
+    if quiz_ids:
+        db.session.execute(
+            db.update(Quiz)
+            .where(Quiz.id.in_(quiz_ids))
+            .values(version=Quiz.version + 1)
+        )
+    return quiz_ids
+
+
+def publish_versions(*quiz_ids):
+    """Point Redis at the committed versions; deleted quizzes lose their pointer."""
+    quiz_ids = [quiz_id for quiz_id in set(quiz_ids) if quiz_id is not None]
+    if not quiz_ids:
+        return
+    versions = dict(db.session.query(Quiz.id, Quiz.version).filter(Quiz.id.in_(quiz_ids)).all())
+
+    def write(client):
+        pipe = client.pipeline(transaction=False)
+        for quiz_id in quiz_ids:
+            key = VERSION_KEY.format(quiz_id=quiz_id)
+            if quiz_id in versions:
+                pipe.set(key, versions[quiz_id], ex=POINTER_TIMEOUT)
+            else:
+                pipe.delete(key)
+        pipe.execute()
+
+    _redis_call(write)
+    for quiz_id in quiz_ids:
+        _local.pop(quiz_id, None)
+
+
+def current_version(quiz_id):
+    """Current version of a quiz from the Redis pointer, falling back to one primary key read."""
+    version = _redis_call(lambda client: client.get(VERSION_KEY.format(quiz_id=quiz_id)))
+    if version is not None:
+        return int(version)
+
+    version = db.session.query(Quiz.version).filter(Quiz.id == quiz_id).scalar()
+    if version is None:
+        abort(404)
+    # nx: never overwrite a newer version published by a CRUD route meanwhile
+    _redis_call(lambda client: client.set(VERSION_KEY.format(quiz_id=quiz_id), version, nx=True, ex=POINTER_TIMEOUT))
+    return version
+
+
+def _build(quiz_id):
+    quiz = Quiz.query.options(
+        joinedload(Quiz.chapter),
+        selectinload(Quiz.questions)
+    ).filter(Quiz.id == quiz_id).first()
+    if quiz is None:
+        abort(404)
+
+    questions = sorted(quiz.questions, key=lambda question: question.id)
+    payload = {
+        "quiz": {
+            "id": quiz.id,
+            "chapter_id": quiz.chapter_id,
+            "date_of_quiz": format_date(quiz.date_of_quiz),
+            "start_time": format_time(quiz.start_time),
+            "time_duration": format_time(quiz.time_duration),
+            "remarks": quiz.remarks
+        },
+        "questions": [{
+            "id": q.id,
+            "question_statement": q.question_statement,
+            "option1": q.option1,
+            "option2": q.option2,
+            "option3": q.option3,
+            "option4": q.option4,
+            "correct_option": q.correct_option
+        } for q in questions]
+    }
+
+    # a quiz without a start time cannot be attempted, even though it has a starts_at
+    starts_at = None
+    if quiz.start_time and quiz.starts_at:
+        starts_at = quiz.starts_at.strftime('%Y-%m-%d %H:%M:%S')
+
+    # "body" is the JSON object above without its closing brace, so the GET
+    # handler only has to append the per-request timestamps.
+    return {
+        "quiz_id": quiz.id,
+        "version": quiz.version,
+        "subject_id": quiz.chapter.subject_id,
+        "date_of_quiz": payload["quiz"]["date_of_quiz"],
+        "start_time": payload["quiz"]["start_time"],
+        "starts_at": starts_at,
+        "answer_key": [[q.id, q.correct_option] for q in questions],
+        "body": json.dumps(payload, separators=(",", ":"))[:-1],
+    }
+
+
+def _remember(snapshot):
+    if len(_local) >= LOCAL_LIMIT:
+        _local.pop(next(iter(_local)))
+    snapshot["body"] = snapshot["body"].encode()
+    if snapshot["starts_at"]:
+        snapshot["starts_at"] = datetime.strptime(snapshot["starts_at"], '%Y-%m-%d %H:%M:%S')
+    _local[snapshot["quiz_id"]] = snapshot
+    return snapshot
+
+
+def forget_deleted(quiz_id):
+    """404 for a quiz that no longer exists, dropping whatever was cached for it."""
+    if db.session.query(Quiz.id).filter(Quiz.id == quiz_id).scalar() is None:
+        publish_versions(quiz_id)
+        abort(404)
+
+
+def get_snapshot(quiz_id):
+    """
+    Snapshot of the current version of a quiz: per-process copy, then Redis,
+    then built from the database and shared through Redis. 404 when the quiz
+    does not exist and no version pointer is left for it.
+    """
+    version = current_version(quiz_id)
+
+    snapshot = _local.get(quiz_id)
+    if snapshot is not None and snapshot["version"] == version:
+        return snapshot
+
+    key = SNAPSHOT_KEY.format(quiz_id=quiz_id, version=version)
+    cached = _redis_call(lambda client: client.get(key))
+    if cached is not None:
+        return _remember(json.loads(cached))
+
+    snapshot = _build(quiz_id)
+    if snapshot["version"] == version:
+        _redis_call(lambda client: client.set(key, json.dumps(snapshot), ex=SNAPSHOT_TIMEOUT))
+    return _remember(snapshot)
+
+
+def attempt_payload(snapshot, now):
+    """Pre-serialized GET body of the attempt route with the request's timestamps appended."""
+    tail = json.dumps({
+        "quiz_start_datetime": snapshot["starts_at"].strftime('%Y-%m-%d %H:%M:%S'),
+        "now": now.strftime('%Y-%m-%d %H:%M:%S')
+    }, separators=(",", ":"))
+    return snapshot["body"] + b"," + tail[1:].encode()
@@ -0,0 +1,118 @@
+import functools
+import os
+import sqlite3
+import time
+from flask import current_app, g, has_app_context, has_request_context, session
+from flask_sqlalchemy.session import Session
+from sqlalchemy.engine import make_url
+from sqlalchemy.pool import NullPool
+
+# Read/write session routing.
+#
+# Routes decorated with @read_replica run their SELECTs on the "replica" bind:
+# READ_REPLICA_URI (e.g. a PostgreSQL streaming replica), or for SQLite a
+# snapshot copy of the database file (SQLITE_SNAPSHOT_PATH) that the
+# refresh_read_snapshot task rewrites with the SQLite backup API. Everything
+# else stays on the primary:
+# - undecorated routes, Celery tasks and the CLI,
+# - any flush or INSERT/UPDATE/DELETE, and every query after it in the same request,
+# - a user's requests for READ_PRIMARY_AFTER_WRITE seconds after they wrote
+#   something, so they see their own quiz submission or edit right away,
+# - a snapshot that is missing or older than SQLITE_SNAPSHOT_MAX_AGE.
+
+REPLICA = "replica"
+STICKY_KEY = "read_primary_until"
+
+
+def snapshot_path(app):
+    path = app.config.get("SQLITE_SNAPSHOT_PATH")
+    if not path:
+        return None
+    return path if os.path.isabs(path) else os.path.join(app.instance_path, path)
+
+
+def replica_bind(app):
+    """Engine options of the replica bind (None when no replica is configured)."""
+    if app.config.get("READ_REPLICA_URI"):
+        return {"url": app.config["READ_REPLICA_URI"], "pool_pre_ping": True}
+    path = snapshot_path(app)
+    if path and make_url(app.config["SQLALCHEMY_DATABASE_URI"]).get_backend_name() == "sqlite":
+        # read-only, and no pool: the file is replaced on every refresh and a pooled
+        # connection would keep reading the old copy
+        return {"url": f"sqlite:///file:{path}?mode=ro&uri=true", "poolclass": NullPool}
+    return None
+
+
+def refresh_snapshot(app):
+    """Copy the SQLite database into the snapshot file; returns False if not configured."""
+    from application.database import db
+
+    path = snapshot_path(app)
+    if path is None or REPLICA not in db.engines:
+        return False
+    source_path = db.engines[None].url.database
+    partial = f"{path}.partial"
+    source = sqlite3.connect(source_path)
+    target = sqlite3.connect(partial)
+    try:
+        # a consistent copy; in WAL mode writers are not blocked meanwhile
+        source.backup(target)
+        # the snapshot is opened read-only, so it must not need a -wal / -shm file
+        target.execute("PRAGMA journal_mode=DELETE")
+    finally:
+        target.close()
+        source.close()
+    # readers that already opened the old file keep it, new ones get the new copy
+    os.replace(partial, path)
+    return True
+
+
+def _replica_ready():
+    app = current_app
+    if REPLICA not in app.extensions["sqlalchemy"].engines:
+        return False
+    path = snapshot_path(app)
+    if path and not app.config.get("READ_REPLICA_URI"):
+        try:
+            age = time.time() - os.path.getmtime(path)
+        except OSError:
+            return False
+        if age > app.config["SQLITE_SNAPSHOT_MAX_AGE"]:
+            return False
+    return True
+
+
+def read_replica(view):
+    """Run the view's queries on the replica bind (if there is one)."""
+    @functools.wraps(view)
+    def wrapper(*args, **kwargs):
+        # stays set for the rest of the request, streamed responses included
+        if session.get(STICKY_KEY, 0) < time.time() and _replica_ready():
+            g.read_replica = True
+        return view(*args, **kwargs)
+    return wrapper
+
+
+class RoutingSession(Session):
+    """db.session: Flask-SQLAlchemy's session, plus the replica routing above."""
+
+    def get_bind(self, mapper=None, clause=None, bind=None, **kwargs):
+        if self._flushing or getattr(clause, "is_dml", False):
+            self.info["wrote"] = True
+            if has_request_context():
+                g.db_wrote = True
+        if bind is None and not self.info.get("wrote") and has_app_context() and g.get("read_replica"):
+            return self._db.engines[REPLICA]
+        return super().get_bind(mapper=mapper, clause=clause, bind=bind, **kwargs)
+
+
+def _stick_to_primary(response):
+    seconds = current_app.config["READ_PRIMARY_AFTER_WRITE"]
+    if g.get("db_wrote") and seconds:
+        session[STICKY_KEY] = time.time() + seconds
+    return response
+
+
+def init_read_routing(app):
+    if replica_bind(app) is not None:
+        app.after_request(_stick_to_primary)
@@ -0,0 +1,163 @@
+from sqlalchemy import case, delete, func, insert, update
+from sqlalchemy.exc import IntegrityError
+from application.database import db
+from application.models import Chapter, Quiz, Score, SubjectScoreRollup, QuizScoreRollup
+
+
+class _Tally:
+    """attempts / max / sum / count of a group of new scores."""
+
+    def __init__(self):
+        self.attempts = 0
+        self.max_score = None
+        self.score_sum = 0
+        self.score_count = 0
+
+    def add(self, total_scored):
+        self.attempts += 1
+        if total_scored is not None:
+            self.score_sum += total_scored
+            self.score_count += 1
+            if self.max_score is None or total_scored > self.max_score:
+                self.max_score = total_scored
+
+
+def _bump_values(model, tally):
+    values = {
+        "attempts": model.attempts + tally.attempts,
+        "score_sum": model.score_sum + tally.score_sum,
+        "score_count": model.score_count + tally.score_count,
+    }
+    if tally.max_score is not None:
+        values["max_score"] = case(
+            (model.max_score.is_(None) | (model.max_score < tally.max_score), tally.max_score),
+            else_=model.max_score
+        )
+    return values
+
+
+def _bump(model, key_column, key, tally):
+    """
+    Add new attempts to a rollup row with a single UPDATE, creating the row on first use.
+    """
+    bump_row = update(model).where(key_column == key).values(**_bump_values(model, tally))
+    if db.session.execute(bump_row).rowcount:
+        return
+
+    try:
+        with db.session.begin_nested():
+            db.session.execute(insert(model).values(**{
+                key_column.key: key,
+                "attempts": tally.attempts,
+                "max_score": tally.max_score,
+                "score_sum": tally.score_sum,
+                "score_count": tally.score_count,
+            }))
+    except IntegrityError:
+        # a concurrent submission created the row first, so just bump it
+        db.session.execute(bump_row)
+
+
+def record_score(quiz_id, total_scored, subject_id=None):
+    """
+    Fold one new Score into the quiz and subject rollups.
+    Runs inside the caller's transaction, the caller commits.
+    """
+    if subject_id is None:
+        subject_id = (
+            db.session.query(Chapter.subject_id)
+            .join(Quiz, Quiz.chapter_id == Chapter.id)
+            .filter(Quiz.id == quiz_id)
+            .scalar()
+        )
+    record_scores([(quiz_id, subject_id, total_scored)])
+
+
+def record_scores(entries):
+    """
+    Fold a batch of new scores, given as (quiz_id, subject_id, total_scored),
+    into the rollups with one UPDATE per touched quiz and subject.
+    """
+    by_quiz = {}
+    by_subject = {}
+    for quiz_id, subject_id, total_scored in entries:
+        by_quiz.setdefault(quiz_id, _Tally()).add(total_scored)
+        if subject_id is not None:
+            by_subject.setdefault(subject_id, _Tally()).add(total_scored)
+
+    for quiz_id, tally in by_quiz.items():
+        _bump(QuizScoreRollup, QuizScoreRollup.quiz_id, quiz_id, tally)
+    for subject_id, tally in by_subject.items():
+        _bump(SubjectScoreRollup, SubjectScoreRollup.subject_id, subject_id, tally)
+
+
+def _aggregates():
+    return (
+        func.count(Score.id),
+        func.max(Score.total_scored),
+        func.coalesce(func.sum(Score.total_scored), 0),
+        func.count(Score.total_scored),
+    )
+
+
+def _rows(key_name, results):
+    return [
+        {
+            key_name: key,
+            "attempts": attempts,
+            "max_score": max_score,
+            "score_sum": score_sum,
+            "score_count": score_count,
+        }
+        for key, attempts, max_score, score_sum, score_count in results
+    ]
+
+
+def rebuild_score_rollups(subject_ids=None):
+    """
+    Recompute rollups from the Score table, for every subject or only the given ones.
+    Used for the initial backfill and after deletes that remove Score rows.
+    Returns (quiz rollups written, subject rollups written); the caller commits.
+    """
+    db.session.flush()
+
+    quiz_query = db.session.query(Score.quiz_id, *_aggregates()).group_by(Score.quiz_id)
+    subject_query = (
+        db.session.query(Chapter.subject_id, *_aggregates())
+        .join(Quiz, Quiz.chapter_id == Chapter.id)
+        .join(Score, Score.quiz_id == Quiz.id)
+        .group_by(Chapter.subject_id)
+    )
+    clear_quizzes = delete(QuizScoreRollup)
+    clear_subjects = delete(SubjectScoreRollup)
+
+    if subject_ids is not None:
+        subject_ids = list(subject_ids)
+        quiz_ids = (
+            db.select(Quiz.id)
+            .join(Chapter, Quiz.chapter_id == Chapter.id)
+            .where(Chapter.subject_id.in_(subject_ids))
+        )
+        quiz_query = quiz_query.filter(Score.quiz_id.in_(quiz_ids))
+        subject_query = subject_query.filter(Chapter.subject_id.in_(subject_ids))
+        clear_quizzes = clear_quizzes.where(QuizScoreRollup.quiz_id.in_(quiz_ids))
+        clear_subjects = clear_subjects.where(SubjectScoreRollup.subject_id.in_(subject_ids))
+
+    quiz_rows = _rows("quiz_id", quiz_query.all())
+    subject_rows = _rows("subject_id", subject_query.all())
+
+    db.session.execute(clear_quizzes, execution_options={"synchronize_session": False})
+    db.session.execute(clear_subjects, execution_options={"synchronize_session": False})
+    if quiz_rows:
+        db.session.execute(insert(QuizScoreRollup), quiz_rows)
+    if subject_rows:
+        db.session.execute(insert(SubjectScoreRollup), subject_rows)
+
+    return len(quiz_rows), len(subject_rows)
+
+
+def refresh_subjects(*subject_ids):
+    """Rebuild the rollups of a handful of subjects after their scores moved or were removed."""
+    subject_ids = {subject_id for subject_id in subject_ids if subject_id is not None}
+    if subject_ids:
+        rebuild_score_rollups(subject_ids=subject_ids)
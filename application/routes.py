@@ -1,34 +1,41 @@
 from flask import current_app as app
-from flask import request, jsonify, render_template
+from flask import Blueprint, request, jsonify, render_template
 from flask_security import verify_password, auth_required, roles_required, roles_accepted, current_user, login_user, logout_user,login_required
 from application.models import *
 from application.database import db
 from datetime import datetime, date ,timedelta
-from sqlalchemy.orm import joinedload
-from collections import defaultdict
+from sqlalchemy.orm import joinedload, selectinload
 from sqlalchemy import func, cast, String, or_ ,and_
-from caching import cache
+from sqlalchemy.exc import IntegrityError
+from caching import cached_with_tags, conditional_with_tags, bump_tags
+from application import rollups, search, quiz_snapshots, score_queue, metrics, read_routing, question_import, leaderboard, user_summary, list_queries, pagination
+from application.read_routing import read_replica
+from application.serializers import (
+    QuestionRow, QuizCount, QuizDetail, QuizPage, QuizWithChapter, QuizWithQuestions, UserRow, format_datetime, rows
+)
+from redis import RedisError
 import csv
 import io
 from io import StringIO
-from flask import make_response
+from flask import make_response, Response, stream_with_context
 from flask_mail import Message
 from mailer import mail
 from celery_context import FlaskTask
-from flask_mail import Message
-from mailer import mail
-from app import celery_app
-from celery_context import FlaskTask
+from celery import chord, shared_task
+from application import notifications
+
+# every HTTP route of the app; registered on the app by create_app()
+main = Blueprint("main", __name__)
 
 
 
-@app.route("/")
+@main.route("/")
 def index():
     return render_template("index.html")
 
 
 
-@app.route("/api/login", methods=["POST"])
+@main.route("/api/login", methods=["POST"])
 def login():
     data = request.json
     email = data.get("email")
@@ -52,7 +59,7 @@ def login():
         "message": "Login successful!"
     }), 200
 
-@app.route("/api/register", methods=["POST"])
+@main.route("/api/register", methods=["POST"])
 def register():
     data = request.json
     email = data.get("email")
@@ -90,28 +97,46 @@ def register():
         active=True
     )
     db.session.commit()
+    bump_tags("user")
 
     return jsonify({"success": True, "message": "User registered successfully!"}), 201
 
 
-@app.route("/api/logout", methods=["POST"])
+@main.route("/api/logout", methods=["POST"])
 @login_required
 def logout():
     logout_user()
     return jsonify({"success": True, "message": "Logged out successfully."}), 200
 
-@app.route("/api/admin/dashboard", methods=["GET"])
+@main.route("/api/admin/dashboard", methods=["GET"])
 @login_required
+@read_replica
 def admin_dashboard():
-
+    """
+    Deprecated: the whole catalog nested in one response. Use the
+    /api/admin/dashboard/tree routes, which load one level at a time.
+    Only one keyset page of subjects is returned (?limit=, ?after=, "next").
+    """
     if not current_user.has_role('admin'):
         return jsonify({'message': 'Unauthorized'}), 403
 
-    all_subjects = Subject.query.options(
-        joinedload(Subject.chapters)
-        .joinedload(Chapter.quizzes)
-        .joinedload(Quiz.questions)
-    ).all()
+    try:
+        limit, after = pagination.page_bounds(list_queries.SUBJECTS, request.args)
+    except pagination.PageArgumentError as e:
+        return jsonify({"message": str(e)}), 400
+
+    # selectinload runs one query per level instead of a single cartesian join
+    subject_query = Subject.query.options(
+        selectinload(Subject.chapters)
+        .selectinload(Chapter.quizzes)
+        .selectinload(Quiz.questions)
+    )
+    if after is not None:
+        subject_query = subject_query.filter(Subject.id > after[0])
+    # one extra subject tells whether there is a next page
+    all_subjects = subject_query.order_by(Subject.id).limit(limit + 1).all()
+    next_key = (all_subjects[limit - 1].id,) if len(all_subjects) > limit else None
+    all_subjects = all_subjects[:limit]
 
     response_data = []
     for subject in all_subjects:
@@ -127,66 +152,102 @@ def admin_dashboard():
                 'id': chapter.id,
                 'name': chapter.name,
                 'description': chapter.description,
-                'quizzes': []
+                'quizzes': rows(QuizWithQuestions, chapter.quizzes)
             }
 
-            for quiz in chapter.quizzes:
-                quiz_info = {
-                    'id': quiz.id,
-                    'date_of_quiz': quiz.date_of_quiz.strftime('%Y-%m-%d') if quiz.date_of_quiz else None,
-                    'start_time': quiz.start_time.strftime('%H:%M') if quiz.start_time else None,
-                    'time_duration': quiz.time_duration.strftime('%H:%M') if quiz.time_duration else None,
-                    'remarks': quiz.remarks,
-                    'questions': []
-                }
-
-                quiz_info['questions'] = [
-                    {
-                        'id': question.id,
-                        'question_statement': question.question_statement,
-                        'option1': question.option1,
-                        'option2': question.option2,
-                        'option3': question.option3,
-                        'option4': question.option4,
-                        'correct_option': question.correct_option
-                    }
-                    for question in quiz.questions
-                ]
-
-                chapter_info['quizzes'].append(quiz_info)
-
             subject_info['chapters'].append(chapter_info)
 
         response_data.append(subject_info)
 
-    return jsonify({'subjects': response_data}), 200
+    response = jsonify({
+        'subjects': response_data,
+        'next': pagination.encode_cursor(next_key) if next_key is not None else None,
+        'limit': limit
+    })
+    response.headers["Deprecation"] = "true"
+    response.headers["Link"] = '</api/admin/dashboard/tree>; rel="successor-version"'
+    return response, 200
+
+# ------------------------------------------------------------
+# Admin dashboard tree: every level is loaded on demand       |
+# ------------------------------------------------------------
+
+@main.route("/api/admin/dashboard/tree", methods=["GET"])
+@login_required
+@read_replica
+def admin_dashboard_tree():
+    """
+    Top level of the catalog tree: a page of subjects with their chapter and quiz counts.
+    """
+    if not current_user.has_role('admin'):
+        return jsonify({'message': 'Unauthorized'}), 403
+
+    return _list_page(list_queries.TREE_SUBJECTS)
+
+
+@main.route("/api/admin/dashboard/subjects/<int:subject_id>/chapters", methods=["GET"])
+@login_required
+@read_replica
+def admin_dashboard_chapters(subject_id):
+    """
+    One page of a subject's chapters with quiz and question counts.
+    """
+    if not current_user.has_role('admin'):
+        return jsonify({'message': 'Unauthorized'}), 403
+
+    return _list_page(list_queries.TREE_CHAPTERS, Chapter.subject_id == subject_id)
+
+
+@main.route("/api/admin/dashboard/chapters/<int:chapter_id>/quizzes", methods=["GET"])
+@login_required
+@read_replica
+def admin_dashboard_quizzes(chapter_id):
+    """
+    One page of a chapter's quizzes with their question counts (no question bodies).
+    """
+    if not current_user.has_role('admin'):
+        return jsonify({'message': 'Unauthorized'}), 403
+
+    return _list_page(list_queries.TREE_QUIZZES, Quiz.chapter_id == chapter_id)
+
+
+@main.route("/api/admin/dashboard/quizzes/<int:quiz_id>/questions", methods=["GET"])
+@login_required
+@read_replica
+def admin_dashboard_questions(quiz_id):
+    """
+    One page of a quiz's questions. Only requested when the admin expands a quiz.
+    """
+    if not current_user.has_role('admin'):
+        return jsonify({'message': 'Unauthorized'}), 403
+
+    return _list_page(list_queries.QUESTIONS, Question.quiz_id == quiz_id)
 
 ########################################################################
 #Rutes for crud operations for subjects , chapter ,question and quiz   |
 ########################################################################
 
-@app.route("/api/admin/subjects", methods=["GET"])
+def _list_page(listing, *where):
+    """One page of a list route (?after=&limit=&fields=&count=, see application/pagination.py)."""
+    try:
+        return jsonify(pagination.read_page(listing, request.args, *where)), 200
+    except pagination.PageArgumentError as e:
+        return jsonify({"message": str(e)}), 400
+
+
+@main.route("/api/admin/subjects", methods=["GET"])
 @login_required
-@cache.cached(timeout=30)     # set anything timeout= ? but the default is 50 sec
+@conditional_with_tags("subject")
+@cached_with_tags("subject")
 def get_subjects():
  
     if not current_user.has_role('admin'):
         return jsonify({"message": "Unauthorized"}), 403
 
-    all_subjects = Subject.query.all()
-    subjects_list = [
-        {
-            "id": subject.id,
-            "name": subject.name,
-            "description": subject.description
-        }
-        for subject in all_subjects
-    ]
-
-    return jsonify({"subjects": subjects_list}), 200
+    return _list_page(list_queries.SUBJECTS)
 
 
-@app.route("/api/admin/subjects", methods=["POST"])
+@main.route("/api/admin/subjects", methods=["POST"])
 @login_required
 def create_subject():
    
@@ -203,6 +264,8 @@ def create_subject():
     new_subject = Subject(name=subject_name, description=subject_description)
     db.session.add(new_subject)
     db.session.commit()
+    search.mark_catalog_changed()
+    bump_tags("subject")
 
     return jsonify({
         "id": new_subject.id,
@@ -211,7 +274,7 @@ def create_subject():
     }), 201
 
 
-@app.route("/api/admin/subjects/<int:subject_id>", methods=["GET"])
+@main.route("/api/admin/subjects/<int:subject_id>", methods=["GET"])
 @login_required
 
 def get_subject(subject_id):
@@ -229,7 +292,7 @@ def get_subject(subject_id):
     }), 200
 
 
-@app.route("/api/admin/subjects/<int:subject_id>", methods=["PUT"])
+@main.route("/api/admin/subjects/<int:subject_id>", methods=["PUT"])
 @login_required
 def update_subject(subject_id):
  
@@ -242,6 +305,8 @@ def update_subject(subject_id):
     subject_to_edit.description = data.get("description", subject_to_edit.description)
 
     db.session.commit()
+    search.mark_catalog_changed()
+    bump_tags("subject")
 
     return jsonify({
         "id": subject_to_edit.id,
@@ -250,7 +315,7 @@ def update_subject(subject_id):
     }), 200
 
 
-@app.route("/api/admin/subjects/<int:subject_id>", methods=["DELETE"])
+@main.route("/api/admin/subjects/<int:subject_id>", methods=["DELETE"])
 @login_required
 def delete_subject(subject_id):
 
@@ -258,8 +323,18 @@ def delete_subject(subject_id):
         return jsonify({"message": "Unauthorized"}), 403
 
     subject_to_remove = Subject.query.get_or_404(subject_id)
+    quiz_ids = [
+        quiz_id for quiz_id, in db.session.query(Quiz.id)
+        .join(Chapter, Chapter.id == Quiz.chapter_id)
+        .filter(Chapter.subject_id == subject_id)
+    ]
     db.session.delete(subject_to_remove)
     db.session.commit()
+    search.mark_catalog_changed()
+    # its chapters, quizzes and questions went with it
+    bump_tags("subject", "chapter", "quiz", "question")
+    quiz_snapshots.publish_versions(*quiz_ids)
+    leaderboard.refresh_subjects(subject_id, dropped_quiz_ids=quiz_ids)
 
     return jsonify({"message": "Subject deleted"}), 200
 
@@ -267,28 +342,20 @@ def delete_subject(subject_id):
 # Chapter CRUD Routes------ Administrator
 #################################################
 
-@app.route("/api/admin/chapters", methods=["GET"])
+@main.route("/api/admin/chapters", methods=["GET"])
 @login_required
+@conditional_with_tags("chapter")
+@cached_with_tags("chapter")
 def get_chapters():
     
     if not current_user.has_role('admin'):
         return jsonify({"message": "Unauthorized"}), 403
 
-    all_chapters = Chapter.query.all()
-    chapters_list = [
-        {
-            "id": chapter.id,
-            "name": chapter.name,
-            "description": chapter.description,
-            "subject_id": chapter.subject_id
-        }
-        for chapter in all_chapters
-    ]
-
-    return jsonify({"chapters": chapters_list}), 200
+    # ?subject_id= filters
+    return _list_page(list_queries.CHAPTERS)
 
 
-@app.route("/api/admin/chapters", methods=["POST"])
+@main.route("/api/admin/chapters", methods=["POST"])
 @login_required
 def create_chapter():
   
@@ -310,6 +377,8 @@ def create_chapter():
     )
     db.session.add(new_chapter)
     db.session.commit()
+    search.mark_catalog_changed()
+    bump_tags("chapter")
 
     return jsonify({
         "id": new_chapter.id,
@@ -319,7 +388,7 @@ def create_chapter():
     }), 201
 
 
-@app.route("/api/admin/chapters/<int:chapter_id>", methods=["GET"])
+@main.route("/api/admin/chapters/<int:chapter_id>", methods=["GET"])
 @login_required
 def get_chapter(chapter_id):
   
@@ -336,7 +405,7 @@ def get_chapter(chapter_id):
     }), 200
 
 
-@app.route("/api/admin/chapters/<int:chapter_id>", methods=["PUT"])
+@main.route("/api/admin/chapters/<int:chapter_id>", methods=["PUT"])
 @login_required
 def update_chapter(chapter_id):
   
@@ -350,10 +419,24 @@ def update_chapter(chapter_id):
     chapter_to_update.description = updates.get("description", chapter_to_update.description)
 
     #  may be Optional: Update subject_id if provided
+    previous_subject_id = chapter_to_update.subject_id
     if "subject_id" in updates:
         chapter_to_update.subject_id = updates["subject_id"]
 
+    # scores of this chapter now count towards another subject
+    moved_quiz_ids = []
+    if chapter_to_update.subject_id != previous_subject_id:
+        rollups.refresh_subjects(previous_subject_id, chapter_to_update.subject_id)
+        moved_quiz_ids = quiz_snapshots.bump_versions(
+            *[quiz_id for quiz_id, in db.session.query(Quiz.id).filter(Quiz.chapter_id == chapter_id)]
+        )
+
     db.session.commit()
+    search.mark_catalog_changed()
+    bump_tags("chapter")
+    quiz_snapshots.publish_versions(*moved_quiz_ids)
+    if moved_quiz_ids:
+        leaderboard.refresh_subjects(previous_subject_id, chapter_to_update.subject_id)
 
     return jsonify({
         "id": chapter_to_update.id,
@@ -363,15 +446,22 @@ def update_chapter(chapter_id):
     }), 200
 
 
-@app.route("/api/admin/chapters/<int:chapter_id>", methods=["DELETE"])
+@main.route("/api/admin/chapters/<int:chapter_id>", methods=["DELETE"])
 @login_required
 def delete_chapter(chapter_id):
     if not current_user.has_role('admin'):
         return jsonify({"message": "Unauthorized"}), 403
 
     chapter_to_remove = Chapter.query.get_or_404(chapter_id)
+    subject_id = chapter_to_remove.subject_id
+    quiz_ids = [quiz_id for quiz_id, in db.session.query(Quiz.id).filter(Quiz.chapter_id == chapter_id)]
     db.session.delete(chapter_to_remove)
+    rollups.refresh_subjects(subject_id)
     db.session.commit()
+    search.mark_catalog_changed()
+    bump_tags("chapter", "quiz", "question")
+    quiz_snapshots.publish_versions(*quiz_ids)
+    leaderboard.refresh_subjects(subject_id, dropped_quiz_ids=quiz_ids)
 
     return jsonify({"message": "Chapter deleted"}), 200
 
@@ -380,31 +470,20 @@ def delete_chapter(chapter_id):
 # Quiz CRUD Routes #########
 # ##########################
 
-@app.route("/api/admin/quizzes", methods=["GET"])
+@main.route("/api/admin/quizzes", methods=["GET"])
 @login_required
+@conditional_with_tags("quiz")
+@cached_with_tags("quiz")
 def get_quizzes():
   
     if not current_user.has_role('admin'):
         return jsonify({"message": "Unauthorized"}), 403
 
-    all_quizzes = Quiz.query.all()
-    quiz_entries = [
-        {
-            "id": quiz.id,
-            "chapter_id": quiz.chapter_id,
-            "date_of_quiz": quiz.date_of_quiz.strftime('%Y-%m-%d') if quiz.date_of_quiz else None,
-            "start_time": quiz.start_time.strftime('%H:%M') if quiz.start_time else None,
-            "time_duration": quiz.time_duration.strftime('%H:%M') if quiz.time_duration else None,
-            "remarks": quiz.remarks,
-            "created_at": quiz.created_at.strftime('%Y-%m-%d %H:%M:%S') if quiz.created_at else None
-        }
-        for quiz in all_quizzes
-    ]
-
-    return jsonify({"quizzes": quiz_entries}), 200
+    # ?chapter_id= filters
+    return _list_page(list_queries.QUIZZES)
 
 
-@app.route("/api/admin/quizzes", methods=["POST"])
+@main.route("/api/admin/quizzes", methods=["POST"])
 @login_required
 def create_quiz():
    
@@ -443,21 +522,16 @@ def create_quiz():
         time_duration=duration,
         remarks=notes
     )
+    new_quiz.refresh_schedule()
     db.session.add(new_quiz)
     db.session.commit()
+    search.mark_catalog_changed()
+    bump_tags("quiz")
 
-    return jsonify({
-        "id": new_quiz.id,
-        "chapter_id": new_quiz.chapter_id,
-        "date_of_quiz": new_quiz.date_of_quiz.strftime('%Y-%m-%d'),
-        "start_time": new_quiz.start_time.strftime('%H:%M') if new_quiz.start_time else None,
-        "time_duration": new_quiz.time_duration.strftime('%H:%M') if new_quiz.time_duration else None,
-        "remarks": new_quiz.remarks,
-        "created_at": new_quiz.created_at.strftime('%Y-%m-%d %H:%M:%S')
-    }), 201
+    return jsonify(QuizDetail.of(new_quiz)), 201
 
 
-@app.route("/api/admin/quizzes/<int:quiz_id>", methods=["GET"])
+@main.route("/api/admin/quizzes/<int:quiz_id>", methods=["GET"])
 @login_required
 def get_quiz(quiz_id):
     """
@@ -468,18 +542,10 @@ def get_quiz(quiz_id):
 
     quiz = Quiz.query.get_or_404(quiz_id)
 
-    return jsonify({
-        "id": quiz.id,
-        "chapter_id": quiz.chapter_id,
-        "date_of_quiz": quiz.date_of_quiz.strftime('%Y-%m-%d') if quiz.date_of_quiz else None,
-        "start_time": quiz.start_time.strftime('%H:%M') if quiz.start_time else None,
-        "time_duration": quiz.time_duration.strftime('%H:%M') if quiz.time_duration else None,
-        "remarks": quiz.remarks,
-        "created_at": quiz.created_at.strftime('%Y-%m-%d %H:%M:%S') if quiz.created_at else None
-    }), 200
+    return jsonify(QuizDetail.of(quiz)), 200
 
 
-@app.route("/api/admin/quizzes/<int:quiz_id>", methods=["PUT"])
+@main.route("/api/admin/quizzes/<int:quiz_id>", methods=["PUT"])
 @login_required
 def update_quiz(quiz_id):
  
@@ -488,6 +554,7 @@ def update_quiz(quiz_id):
 
     quiz = Quiz.query.get_or_404(quiz_id)
     updates = request.get_json()
+    previous_chapter_id = quiz.chapter_id
 
     if "chapter_id" in updates:
         quiz.chapter_id = updates["chapter_id"]
@@ -511,21 +578,27 @@ def update_quiz(quiz_id):
             return jsonify({"message": "Invalid time_duration format. Use HH:MM"}), 400
 
     quiz.remarks = updates.get("remarks", quiz.remarks)
+    quiz.refresh_schedule()
 
+    # moving a quiz to another chapter may move its scores to another subject
+    moved_subjects = []
+    if quiz.chapter_id != previous_chapter_id:
+        moved_subjects = db.session.query(Chapter.subject_id).filter(
+            Chapter.id.in_([previous_chapter_id, quiz.chapter_id])
+        ).all()
+        rollups.refresh_subjects(*[subject_id for subject_id, in moved_subjects])
+
+    quiz_snapshots.bump_versions(quiz.id)
     db.session.commit()
+    search.mark_catalog_changed()
+    bump_tags("quiz")
+    quiz_snapshots.publish_versions(quiz.id)
+    leaderboard.refresh_subjects(*[subject_id for subject_id, in moved_subjects])
 
-    return jsonify({
-        "id": quiz.id,
-        "chapter_id": quiz.chapter_id,
-        "date_of_quiz": quiz.date_of_quiz.strftime('%Y-%m-%d'),
-        "start_time": quiz.start_time.strftime('%H:%M') if quiz.start_time else None,
-        "time_duration": quiz.time_duration.strftime('%H:%M') if quiz.time_duration else None,
-        "remarks": quiz.remarks,
-        "created_at": quiz.created_at.strftime('%Y-%m-%d %H:%M:%S')
-    }), 200
+    return jsonify(QuizDetail.of(quiz)), 200
 
 
-@app.route("/api/admin/quizzes/<int:quiz_id>", methods=["DELETE"])
+@main.route("/api/admin/quizzes/<int:quiz_id>", methods=["DELETE"])
 @login_required
 def delete_quiz(quiz_id):
  
@@ -533,8 +606,14 @@ def delete_quiz(quiz_id):
         return jsonify({"message": "Unauthorized"}), 403
 
     target_quiz = Quiz.query.get_or_404(quiz_id)
+    subject_id = target_quiz.chapter.subject_id
     db.session.delete(target_quiz)
+    rollups.refresh_subjects(subject_id)
     db.session.commit()
+    search.mark_catalog_changed()
+    bump_tags("quiz", "question")
+    quiz_snapshots.publish_versions(quiz_id)
+    leaderboard.refresh_subjects(subject_id, dropped_quiz_ids=[quiz_id])
 
     return jsonify({"message": "Quiz deleted"}), 200
 
@@ -543,32 +622,28 @@ def delete_quiz(quiz_id):
 # Question CRUD Routes ######
 # ###########################
 
-@app.route("/api/admin/questions", methods=["GET"])
+def _adjust_question_count(quiz_id, delta):
+    """Keep Quiz.question_count in step with the question rows, in the caller's transaction."""
+    db.session.execute(
+        db.update(Quiz)
+        .where(Quiz.id == quiz_id)
+        .values(question_count=Quiz.question_count + delta)
+    )
+
+
+@main.route("/api/admin/questions", methods=["GET"])
 @login_required
+@cached_with_tags("question")
 def get_questions():
    
     if not current_user.has_role('admin'):
         return jsonify({"message": "Unauthorized"}), 403
 
-    question_records = Question.query.all()
-    question_list = [
-        {
-            "id": item.id,
-            "quiz_id": item.quiz_id,
-            "question_statement": item.question_statement,
-            "option1": item.option1,
-            "option2": item.option2,
-            "option3": item.option3,
-            "option4": item.option4,
-            "correct_option": item.correct_option
-        }
-        for item in question_records
-    ]
+    # ?quiz_id= filters
+    return _list_page(list_queries.QUESTIONS)
 
-    return jsonify({"questions": question_list}), 200
 
-
-@app.route("/api/admin/questions", methods=["POST"])
+@main.route("/api/admin/questions", methods=["POST"])
 @login_required
 def create_question():
   
@@ -597,21 +672,63 @@ def create_question():
         correct_option=answer
     )
     db.session.add(new_question)
+    _adjust_question_count(quiz_id, 1)
+    quiz_snapshots.bump_versions(quiz_id)
     db.session.commit()
+    bump_tags("question")
+    quiz_snapshots.publish_versions(quiz_id)
 
-    return jsonify({
-        "id": new_question.id,
-        "quiz_id": new_question.quiz_id,
-        "question_statement": new_question.question_statement,
-        "option1": new_question.option1,
-        "option2": new_question.option2,
-        "option3": new_question.option3,
-        "option4": new_question.option4,
-        "correct_option": new_question.correct_option
-    }), 201
+    return jsonify(QuestionRow.of(new_question)), 201
+
+
+@main.route("/api/admin/questions/import", methods=["POST"])
+@login_required
+def import_questions():
+    """
+    Bulk import questions (Admin only) from an uploaded CSV / XLSX / JSON file
+    (form field "file") or a JSON body {"questions": [...]}. Optional quiz_id is
+    used for rows without one; with skip_invalid=true the valid rows are kept
+    even if others are rejected. Answers with a per-row error report.
+    """
+    if not current_user.has_role('admin'):
+        return jsonify({"message": "Unauthorized"}), 403
+
+    options = request.form if request.files else request.args
+    quiz_id, skip_invalid = options.get("quiz_id"), options.get("skip_invalid")
+    payload = request.get_json() if request.is_json else None
+    if isinstance(payload, dict):
+        quiz_id = payload.get("quiz_id", quiz_id)
+        skip_invalid = payload.get("skip_invalid", skip_invalid)
+
+    try:
+        default_quiz_id, skip_invalid = question_import.options(quiz_id, skip_invalid)
+        if request.is_json:
+            rows = question_import.json_rows(payload)
+        else:
+            upload = request.files.get("file")
+            if upload is None:
+                return jsonify({"message": "Upload a CSV, XLSX or JSON file in the 'file' field"}), 400
+            file_format = options.get("format") or question_import.format_of(upload.filename)
+            rows = question_import.read_rows(upload.stream, file_format)
+        report = question_import.import_questions(rows, default_quiz_id=default_quiz_id, skip_invalid=skip_invalid)
+    except question_import.ImportFormatError as e:
+        db.session.rollback()
+        return jsonify({"message": str(e)}), 400
+
+    if report["invalid"] and not skip_invalid:
+        db.session.rollback()
+        return jsonify({
+            "message": f"Nothing imported: {report['invalid']} invalid row(s)",
+            **report
+        }), 422
+
+    db.session.commit()
+    bump_tags("question")
+    quiz_snapshots.publish_versions(*report["quiz_ids"])
+    return jsonify({"message": f"Imported {report['imported']} question(s)", **report}), 201
 
 
-@app.route("/api/admin/questions/<int:question_id>", methods=["GET"])
+@main.route("/api/admin/questions/<int:question_id>", methods=["GET"])
 @login_required
 def get_question(question_id):
     """
@@ -622,19 +739,10 @@ def get_question(question_id):
 
     question_item = Question.query.get_or_404(question_id)
 
-    return jsonify({
-        "id": question_item.id,
-        "quiz_id": question_item.quiz_id,
-        "question_statement": question_item.question_statement,
-        "option1": question_item.option1,
-        "option2": question_item.option2,
-        "option3": question_item.option3,
-        "option4": question_item.option4,
-        "correct_option": question_item.correct_option
-    }), 200
+    return jsonify(QuestionRow.of(question_item)), 200
 
 
-@app.route("/api/admin/questions/<int:question_id>", methods=["PUT"])
+@main.route("/api/admin/questions/<int:question_id>", methods=["PUT"])
 @login_required
 def update_question(question_id):
  
@@ -643,6 +751,7 @@ def update_question(question_id):
 
     question_entry = Question.query.get_or_404(question_id)
     updates = request.get_json()
+    previous_quiz_id = question_entry.quiz_id
 
     question_entry.quiz_id = updates.get("quiz_id", question_entry.quiz_id)
     question_entry.question_statement = updates.get("question_statement", question_entry.question_statement)
@@ -652,21 +761,19 @@ def update_question(question_id):
     question_entry.option4 = updates.get("option4", question_entry.option4)
     question_entry.correct_option = updates.get("correct_option", question_entry.correct_option)
 
+    if question_entry.quiz_id != previous_quiz_id:
+        _adjust_question_count(previous_quiz_id, -1)
+        _adjust_question_count(question_entry.quiz_id, 1)
+
+    quiz_snapshots.bump_versions(previous_quiz_id, question_entry.quiz_id)
     db.session.commit()
+    bump_tags("question")
+    quiz_snapshots.publish_versions(previous_quiz_id, question_entry.quiz_id)
 
-    return jsonify({
-        "id": question_entry.id,
-        "quiz_id": question_entry.quiz_id,
-        "question_statement": question_entry.question_statement,
-        "option1": question_entry.option1,
-        "option2": question_entry.option2,
-        "option3": question_entry.option3,
-        "option4": question_entry.option4,
-        "correct_option": question_entry.correct_option
-    }), 200
+    return jsonify(QuestionRow.of(question_entry)), 200
 
 
-@app.route("/api/admin/questions/<int:question_id>", methods=["DELETE"])
+@main.route("/api/admin/questions/<int:question_id>", methods=["DELETE"])
 @login_required
 def delete_question(question_id):
  
@@ -675,7 +782,11 @@ def delete_question(question_id):
 
     question_to_delete = Question.query.get_or_404(question_id)
     db.session.delete(question_to_delete)
+    _adjust_question_count(question_to_delete.quiz_id, -1)
+    quiz_snapshots.bump_versions(question_to_delete.quiz_id)
     db.session.commit()
+    bump_tags("question")
+    quiz_snapshots.publish_versions(question_to_delete.quiz_id)
 
     return jsonify({"message": "Question deleted"}), 200
 
@@ -684,28 +795,18 @@ def delete_question(question_id):
 # User Management CRUD Routes in admin portal
 # -------------------------------------------
 
-@app.route("/api/admin/users", methods=["GET"])
+@main.route("/api/admin/users", methods=["GET"])
 @login_required
+@cached_with_tags("user")
 def fetch_all_users():
-    """Fetch all registered users (admin access only)."""
+    """Fetch the registered users a page at a time, ?active= and ?role= filter (admin access only)."""
     if not current_user.has_role("admin"):
         return jsonify({"message": "Unauthorized access"}), 403
 
-    user_data = []
-    for user in User.query.all():
-        user_data.append({
-            "id": user.id,
-            "email": user.email,
-            "full_name": user.full_name,
-            "qualification": user.qualification,
-            "dob": user.dob,
-            "active": user.active,
-            "roles": [role.name for role in user.roles]
-        })
-    return jsonify({"users": user_data}), 200
+    return _list_page(list_queries.USERS)
 
 
-@app.route("/api/admin/users/<int:user_id>", methods=["GET"])
+@main.route("/api/admin/users/<int:user_id>", methods=["GET"])
 @login_required
 def fetch_user_by_id(user_id):
     """Retrieve specific user information using user ID (admin only)."""
@@ -713,18 +814,10 @@ def fetch_user_by_id(user_id):
         return jsonify({"message": "Unauthorized access"}), 403
 
     user = User.query.get_or_404(user_id)
-    return jsonify({
-        "id": user.id,
-        "email": user.email,
-        "full_name": user.full_name,
-        "qualification": user.qualification,
-        "dob": user.dob,
-        "active": user.active,
-        "roles": [role.name for role in user.roles]
-    }), 200
+    return jsonify(UserRow.of(user)), 200
 
 
-@app.route("/api/admin/users/<int:user_id>", methods=["PUT"])
+@main.route("/api/admin/users/<int:user_id>", methods=["PUT"])
 @login_required
 def modify_user_details(user_id):
     """Update user information (admin only)."""
@@ -742,21 +835,14 @@ def modify_user_details(user_id):
         user.active = payload["active"]
 
     db.session.commit()
+    bump_tags("user")
 
-    return jsonify({
-        "id": user.id,
-        "email": user.email,
-        "full_name": user.full_name,
-        "qualification": user.qualification,
-        "dob": user.dob,
-        "active": user.active,
-        "roles": [role.name for role in user.roles]
-    }), 200
+    return jsonify(UserRow.of(user)), 200
 
 
 
 
-@app.route("/api/admin/users/<int:user_id>", methods=["DELETE"])
+@main.route("/api/admin/users/<int:user_id>", methods=["DELETE"])
 @login_required
 def remove_user(user_id):
     """Delete a user record (admin only)."""
@@ -765,16 +851,30 @@ def remove_user(user_id):
 
     user = User.query.get_or_404(user_id)
     
+    # Subjects whose rollups include this user's attempts
+    touched_subjects = (
+        db.session.query(Chapter.subject_id)
+        .join(Quiz, Quiz.chapter_id == Chapter.id)
+        .join(Score, Score.quiz_id == Quiz.id)
+        .filter(Score.user_id == user_id)
+        .distinct()
+        .all()
+    )
+
     # Delete related score records
     Score.query.filter_by(user_id=user_id).delete()
+    rollups.refresh_subjects(*[subject_id for subject_id, in touched_subjects])
     
     # Delete the user
     db.session.delete(user)
     db.session.commit()
+    bump_tags("user")
+    leaderboard.refresh_subjects(*[subject_id for subject_id, in touched_subjects])
+    user_summary.forget(user_id)
 
     return jsonify({"message": "User successfully removed"}), 200
 
-# @app.route("/api/admin/users/<int:user_id>", methods=["DELETE"])
+# @main.route("/api/admin/users/<int:user_id>", methods=["DELETE"])
 # @login_required
 # def remove_user(user_id):
 #     """Delete a user record (admin only)."""
@@ -788,79 +888,90 @@ def remove_user(user_id):
 #     return jsonify({"message": "User successfully removed"}), 200
 
 
-@app.route("/api/admin/summary", methods=["GET"])
-@login_required
-def get_admin_summary():
-    """Generate dashboard metrics including top scores, attempts, and performers."""
-    # Bar Chart: Top scores by subject
-    top_scores = (
-        db.session.query(Subject.name, db.func.max(Score.total_scored).label('max_score'))
-        .join(Chapter, Subject.id == Chapter.subject_id)
-        .join(Quiz, Chapter.id == Quiz.chapter_id)
-        .join(Score, Quiz.id == Score.quiz_id)
-        .group_by(Subject.id)
+def _subject_rollups():
+    """(subject name, top score, attempts) for every subject that has been attempted."""
+    return (
+        db.session.query(Subject.name, SubjectScoreRollup.max_score, SubjectScoreRollup.attempts)
+        .join(SubjectScoreRollup, SubjectScoreRollup.subject_id == Subject.id)
+        .filter(SubjectScoreRollup.attempts > 0)
+        .order_by(Subject.id)
         .all()
     )
-    bar_labels = [subject for subject, _ in top_scores]
-    bar_scores = [score for _, score in top_scores]
 
-    # Pie Chart: Total quiz attempts per subject
-    attempt_data = (
-        db.session.query(Subject.name, db.func.count(Score.id).label('total_attempts'))
-        .join(Chapter, Subject.id == Chapter.subject_id)
-        .join(Quiz, Chapter.id == Quiz.chapter_id)
-        .join(Score, Quiz.id == Score.quiz_id)
-        .group_by(Subject.id)
-        .all()
-    )
-    pie_labels = [subject for subject, _ in attempt_data]
-    pie_values = [attempts for _, attempts in attempt_data]
-
-    # Table: Top performers across quizzes
-    max_scores_subq = (
-        db.session.query(
-            Score.user_id,
-            Score.quiz_id,
-            db.func.max(Score.total_scored).label("score")
-        )
-        .group_by(Score.user_id, Score.quiz_id)
-        .subquery()
-    )
 
-    top_performers = (
-        db.session.query(
-            User.full_name,
-            db.func.sum(max_scores_subq.c.score).label("total_score"),
-            db.func.count(max_scores_subq.c.score).label("quiz_attempts")
-        )
-        .join(max_scores_subq, max_scores_subq.c.user_id == User.id)
-        .group_by(User.id)
-        .order_by(db.func.sum(max_scores_subq.c.score).desc())
-        .limit(5)
+def _leaderboard_users(user_ids):
+    """{user id: {"full_name", "attempts"}} for leaderboard entries; attempts = quizzes scored."""
+    if not user_ids:
+        return {}
+    rows = (
+        db.session.query(User.id, User.full_name, func.count(func.distinct(Score.quiz_id)))
+        .outerjoin(Score, and_(Score.user_id == User.id, Score.total_scored.isnot(None)))
+        .filter(User.id.in_(user_ids))
+        .group_by(User.id, User.full_name)
         .all()
     )
+    return {user_id: {"full_name": full_name, "attempts": attempts} for user_id, full_name, attempts in rows}
 
-    leaderboard = []
-    for performer in top_performers:
-        leaderboard.append({
-            "full_name": performer.full_name,
-            "total_score": performer.total_score,
-            "attempts": performer.quiz_attempts
-        })
+
+@main.route("/api/admin/summary", methods=["GET"])
+@login_required
+@read_replica
+def get_admin_summary():
+    """Generate dashboard metrics including top scores, attempts, and performers."""
+    # Bar and Pie Charts: read straight from the per-subject rollups
+    subject_rollups = _subject_rollups()
+
+    # Bar Chart: Top scores by subject
+    bar_labels = [subject for subject, _, _ in subject_rollups]
+    bar_scores = [max_score for _, max_score, _ in subject_rollups]
+
+    # Pie Chart: Total quiz attempts per subject
+    pie_labels = [subject for subject, _, _ in subject_rollups]
+    pie_values = [attempts for _, _, attempts in subject_rollups]
+
+    # Table: Top performers across quizzes, from the global leaderboard
+    top_performers = leaderboard.top(5)
+    details = _leaderboard_users([user_id for _, user_id, _ in top_performers])
+
+    performers = []
+    for _, user_id, total_score in top_performers:
+        if user_id in details:
+            performers.append({
+                "full_name": details[user_id]["full_name"],
+                "total_score": total_score,
+                "attempts": details[user_id]["attempts"]
+            })
 
     return jsonify({
         "subject_labels_bar": bar_labels,
         "subject_top_scores_data": bar_scores,
         "subject_labels_pie": pie_labels,
         "subject_attempts_data": pie_values,
-        "top_performers": leaderboard
+        "top_performers": performers
     }), 200
 
+# --------------------------------------------------------
+# Admin Request Metrics                                   |
+# --------------------------------------------------------
+@main.route("/api/admin/metrics", methods=["GET"])
+@login_required
+def get_request_metrics():
+    """
+    Per-endpoint latency histograms, SQL statement counts and DB time of all workers,
+    in the Prometheus text format (admin only).
+    """
+    if not current_user.has_role('admin'):
+        return jsonify({"message": "Unauthorized"}), 403
+
+    return Response(metrics.render_prometheus(), mimetype="text/plain; version=0.0.4")
+
+
 # --------------------------------------------------------
 # Admin Search for Subjects                               |
 # --------------------------------------------------------
-@app.route("/api/admin/search/subjects", methods=["GET"])
+@main.route("/api/admin/search/subjects", methods=["GET"])
 @login_required
+@read_replica
 def find_subjects():
     """Allow admin to search for subjects by name (case-insensitive)."""
     if not current_user.has_role("admin"):
@@ -884,8 +995,9 @@ def find_subjects():
 # -----------------------------
 # Admin Search for Chapters   |
 # -----------------------------
-@app.route("/api/admin/search/chapters", methods=["GET"])
+@main.route("/api/admin/search/chapters", methods=["GET"])
 @login_required
+@read_replica
 def find_chapters():
     
     if not current_user.has_role("admin"):
@@ -910,8 +1022,9 @@ def find_chapters():
 # -----------------------------
 # Admin Search for a Quiz by ID
 # -----------------------------
-@app.route("/api/admin/search/quizzes", methods=["GET"])
+@main.route("/api/admin/search/quizzes", methods=["GET"])
 @login_required
+@read_replica
 def find_quiz_by_id():
     if not current_user.has_role("admin"):
         return jsonify({"message": "Access denied"}), 403
@@ -924,56 +1037,38 @@ def find_quiz_by_id():
     if quiz is None:
         return jsonify({"message": "No quiz found with the provided ID"}), 404
 
-    quiz_data = {
-        "id": quiz.id,
-        "chapter_id": quiz.chapter_id,
-        "date_of_quiz": quiz.date_of_quiz.strftime('%Y-%m-%d') if quiz.date_of_quiz else None,
-        "start_time": quiz.start_time.strftime('%H:%M') if quiz.start_time else None,
-        "time_duration": quiz.time_duration.strftime('%H:%M') if quiz.time_duration else None,
-        "remarks": quiz.remarks,
-        "created_at": quiz.created_at.strftime('%Y-%m-%d %H:%M:%S') if quiz.created_at else None
-    }
-
-    return jsonify({"quiz": quiz_data}), 200
+    return jsonify({"quiz": QuizDetail.of(quiz)}), 200
 
 
 # -----------------------------
 # Admin Search for Users
 # -----------------------------
-@app.route("/api/admin/search/users", methods=["GET"])
+@main.route("/api/admin/search/users", methods=["GET"])
 @login_required
+@read_replica
 def search_users():
     if not current_user.has_role("admin"):
         return jsonify({"message": "Unauthorized"}), 403
 
     query = request.args.get("q", "")
     # Search by full name or email (case-insensitive)
-    users = User.query.filter(
+    users = User.query.options(selectinload(User.roles)).filter(
         or_(
             User.full_name.ilike(f"%{query}%"),
             User.email.ilike(f"%{query}%")
         )
     ).all()
-    results = []
-    for u in users:
-        results.append({
-            "id": u.id,
-            "email": u.email,
-            "full_name": u.full_name,
-            "qualification": u.qualification,
-            "dob": u.dob,
-            "active": u.active,
-            "roles": [role.name for role in u.roles]
-        })
-    return jsonify({"users": results}), 200
+    return jsonify({"users": rows(UserRow, users)}), 200
 
 # ----------------------------------
 # User Dashboard & Quiz Attempt Routes
 # ----------------------------------
 
 
-@app.route('/api/user/dashboard', methods=["GET"])
+@main.route('/api/user/dashboard', methods=["GET"])
 @login_required
+@read_replica
+@conditional_with_tags("subject", "chapter", "quiz", per_minute=True)
 def load_user_dashboard():
     """
     Serve dashboard data for a logged-in user:
@@ -981,75 +1076,42 @@ def load_user_dashboard():
     - All quizzes
     """
     uid = current_user.id
-    today = date.today()
-    current_time = datetime.now().time()
+    now = datetime.now()
 
-    # Fetch upcoming quizzes (future date/time)
+    # Fetch upcoming quizzes (future date/time), a range scan on the starts_at index
     upcoming = Quiz.query.options(
         joinedload(Quiz.chapter).joinedload(Chapter.subject)
-    ).filter(
-        (Quiz.date_of_quiz > today) |
-        ((Quiz.date_of_quiz == today) & (Quiz.start_time > current_time))
-    ).order_by(Quiz.date_of_quiz, Quiz.start_time).all()
+    ).filter(Quiz.upcoming(now)).order_by(Quiz.starts_at).all()
 
     # All quizzes regardless of timing
     full_list = Quiz.query.options(
         joinedload(Quiz.chapter).joinedload(Chapter.subject)
-    ).order_by(Quiz.date_of_quiz, Quiz.start_time).all()
+    ).order_by(Quiz.starts_at).all()
 
     query_term = request.args.get('q', '').strip()
     search_subjects = []
     search_chapters = []
     search_quizzes = []
+    search_total = 0
+    limit = _search_limit()
 
     if query_term:
-        search_subjects = Quiz.query.options(
-            joinedload(Quiz.chapter).joinedload(Chapter.subject)
-        ).join(Quiz.chapter).join(Chapter.subject).filter(
-            Subject.name.ilike(f"%{query_term}%")
-        ).all()
-
-        search_chapters = Quiz.query.options(
-            joinedload(Quiz.chapter).joinedload(Chapter.subject)
-        ).join(Quiz.chapter).filter(
-            Chapter.name.ilike(f"%{query_term}%")
-        ).all()
-
-        search_quizzes = Quiz.query.options(
-            joinedload(Quiz.chapter).joinedload(Chapter.subject)
-        ).filter(
-            cast(Quiz.id, String).ilike(f"%{query_term}%")
-        ).all()
-
-    def quiz_info(q):
-        return {
-            "id": q.id,
-            "chapter_id": q.chapter_id,
-            "date_of_quiz": q.date_of_quiz.strftime('%Y-%m-%d') if q.date_of_quiz else None,
-            "start_time": q.start_time.strftime('%H:%M') if q.start_time else None,
-            "time_duration": q.time_duration.strftime('%H:%M') if q.time_duration else None,
-            "remarks": q.remarks,
-            "chapter": {
-                "id": q.chapter.id,
-                "name": q.chapter.name,
-                "subject": {
-                    "id": q.chapter.subject.id,
-                    "name": q.chapter.subject.name
-                } if q.chapter.subject else None
-            }
-        }
+        search_subjects, search_chapters, search_quizzes, search_total = _search_quiz_buckets(query_term, limit)
 
     return jsonify({
-        "upcoming_quizzes": [quiz_info(qz) for qz in upcoming],
-        "all_quizzes": [quiz_info(qz) for qz in full_list],
+        "upcoming_quizzes": rows(QuizWithChapter, upcoming),
+        "all_quizzes": rows(QuizWithChapter, full_list),
         "q": query_term,
-        "subject_results": [quiz_info(qz) for qz in search_subjects],
-        "chapter_results": [quiz_info(qz) for qz in search_chapters],
-        "quiz_results": [quiz_info(qz) for qz in search_quizzes]
+        "subject_results": rows(QuizWithChapter, search_subjects),
+        "chapter_results": rows(QuizWithChapter, search_chapters),
+        "quiz_results": rows(QuizWithChapter, search_quizzes),
+        "total": search_total,
+        "truncated": search_total > limit,
+        "limit": limit
     }), 200
 
 
-@app.route('/api/user_view_quiz/<int:quiz_id>', methods=["GET"])
+@main.route('/api/user_view_quiz/<int:quiz_id>', methods=["GET"])
 @login_required
 def view_quiz_details(quiz_id):
     """
@@ -1059,39 +1121,14 @@ def view_quiz_details(quiz_id):
         joinedload(Quiz.chapter).joinedload(Chapter.subject)
     ).get_or_404(quiz_id)
 
-    question_data = [{
-        "id": q.id,
-        "question_statement": q.question_statement,
-        "option1": q.option1,
-        "option2": q.option2,
-        "option3": q.option3,
-        "option4": q.option4,
-        "correct_option": q.correct_option
-    } for q in quiz.questions]
-
     return jsonify({
-        "quiz": {
-            "id": quiz.id,
-            "chapter": {
-                "id": quiz.chapter.id,
-                "name": quiz.chapter.name,
-                "subject": {
-                    "id": quiz.chapter.subject.id,
-                    "name": quiz.chapter.subject.name
-                } if quiz.chapter.subject else None
-            },
-            "date_of_quiz": quiz.date_of_quiz.strftime('%Y-%m-%d') if quiz.date_of_quiz else None,
-            "start_time": quiz.start_time.strftime('%H:%M') if quiz.start_time else None,
-            "time_duration": quiz.time_duration.strftime('%H:%M') if quiz.time_duration else None,
-            "remarks": quiz.remarks,
-            "created_at": quiz.created_at.strftime('%Y-%m-%d %H:%M:%S') if quiz.created_at else None
-        },
-        "num_questions": len(quiz.questions),
-        "questions": question_data
+        "quiz": QuizPage.of(quiz),
+        "num_questions": quiz.question_count,
+        "questions": rows(QuestionRow, quiz.questions)
     }), 200
 
 
-# @app.route('/api/user/upcoming_quizzes', methods=["GET"])
+# @main.route('/api/user/upcoming_quizzes', methods=["GET"])
 # @login_required
 # def fetch_upcoming_quizzes():
 #     """
@@ -1119,240 +1156,218 @@ def view_quiz_details(quiz_id):
 #         "upcoming_quizzes": [format_quiz(qz) for qz in upcoming_quizzes]
 #     }), 200
 
-@app.route('/api/user/upcoming_quizzes', methods=["GET"])
+@main.route('/api/user/upcoming_quizzes', methods=["GET"])
 @login_required
+@read_replica
+@conditional_with_tags("subject", "chapter", "quiz", per_minute=True)
 def fetch_upcoming_quizzes():
     """
     Return list of future quizzes for students.
     """
-    today = date.today()
-    current_time = datetime.now().time()
-
-    upcoming_quizzes = Quiz.query.filter(
-        (Quiz.date_of_quiz > today) |
-        ((Quiz.date_of_quiz == today) & (Quiz.start_time > current_time))
-    ).order_by(Quiz.date_of_quiz, Quiz.start_time).all()
-
-    def format_quiz(q):
-        return {
-            "id": q.id,
-            "chapter_id": q.chapter_id,
-            "chapter": {
-                "id": q.chapter.id,
-                "name": q.chapter.name,
-                "subject": {
-                    "id": q.chapter.subject.id,
-                    "name": q.chapter.subject.name
-                }
-            },
-            "date_of_quiz": q.date_of_quiz.strftime('%Y-%m-%d') if q.date_of_quiz else None,
-            "start_time": q.start_time.strftime('%H:%M') if q.start_time else None,
-            "time_duration": q.time_duration.strftime('%H:%M') if q.time_duration else None,
-            "remarks": q.remarks
-        }
+    upcoming_quizzes = Quiz.query.options(
+        joinedload(Quiz.chapter).joinedload(Chapter.subject)
+    ).filter(
+        Quiz.upcoming(datetime.now())
+    ).order_by(Quiz.starts_at).all()
 
     return jsonify({
-        "upcoming_quizzes": [format_quiz(qz) for qz in upcoming_quizzes]
+        "upcoming_quizzes": rows(QuizWithChapter, upcoming_quizzes)
     }), 200
 
-@app.route('/api/user/attempt_quiz/<int:quiz_id>/attempt', methods=["GET", "POST"])
+@main.route('/api/user/attempt_quiz/<int:quiz_id>/attempt', methods=["GET", "POST"])
 @login_required
 def handle_quiz_attempt(quiz_id):
     """
     GET: Show quiz content for attempt.
     POST: Save submitted responses and calculate score.
+    Both work from the cached quiz snapshot, without reading the catalog tables.
     """
-    quiz = Quiz.query.get_or_404(quiz_id)
+    snapshot = quiz_snapshots.get_snapshot(quiz_id)
     now = datetime.now()
 
-    if not quiz.start_time:
+    if not snapshot["starts_at"]:
         return jsonify({"message": "Start time missing. Contact admin."}), 400
 
-    start_datetime = datetime.combine(quiz.date_of_quiz, quiz.start_time)
-
-    if now < start_datetime:
+    if now < snapshot["starts_at"]:
         return jsonify({
-            "message": f"Quiz not started. Opens at {quiz.start_time.strftime('%H:%M')} on {quiz.date_of_quiz.strftime('%Y-%m-%d')}."
+            "message": f"Quiz not started. Opens at {snapshot['start_time']} on {snapshot['date_of_quiz']}."
         }), 400
 
     if request.method == "GET":
-        questions_payload = [{
-            "id": q.id,
-            "question_statement": q.question_statement,
-            "option1": q.option1,
-            "option2": q.option2,
-            "option3": q.option3,
-            "option4": q.option4,
-            "correct_option": q.correct_option
-        } for q in quiz.questions]
-
-        return jsonify({
-            "quiz": {
-                "id": quiz.id,
-                "chapter_id": quiz.chapter_id,
-                "date_of_quiz": quiz.date_of_quiz.strftime('%Y-%m-%d') if quiz.date_of_quiz else None,
-                "start_time": quiz.start_time.strftime('%H:%M') if quiz.start_time else None,
-                "time_duration": quiz.time_duration.strftime('%H:%M') if quiz.time_duration else None,
-                "remarks": quiz.remarks
-            },
-            "questions": questions_payload,
-            "quiz_start_datetime": start_datetime.strftime('%Y-%m-%d %H:%M:%S'),
-            "now": now.strftime('%Y-%m-%d %H:%M:%S')
-        }), 200
+        return Response(quiz_snapshots.attempt_payload(snapshot, now), mimetype="application/json")
 
     if request.method == "POST":
+        answers = request.json
         correct_answers = 0
-        for question in quiz.questions:
-            selected = request.json.get(f"question_{question.id}")
-            if selected and int(selected) == question.correct_option:
+        for question_id, correct_option in snapshot["answer_key"]:
+            selected = answers.get(f"question_{question_id}")
+            if selected and int(selected) == correct_option:
                 correct_answers += 1
 
+        total = len(snapshot["answer_key"])
+
+        if score_queue.enabled():
+            # write-behind: buffer the graded result, drain_score_queue stores it in a batch
+            key = score_queue.submission_key(current_user.id, quiz_id, request.headers.get("Idempotency-Key"))
+            try:
+                previous = score_queue.enqueue(
+                    key, quiz_id, snapshot["subject_id"], current_user.id, correct_answers, total
+                )
+            except RedisError as e:
+                app.logger.warning(f"Score queue unavailable, saving submission directly: {str(e)}")
+            else:
+                if previous is not None:
+                    return jsonify({"message": "Submission already received", **previous}), 200
+                return jsonify({
+                    "message": "Submission successful",
+                    "score": correct_answers,
+                    "total": total,
+                    "queued": True
+                }), 202
+
         score_entry = Score(
             quiz_id=quiz_id,
             user_id=current_user.id,
             total_scored=correct_answers,
             time_stamp_of_attempt=datetime.utcnow()
         )
-        db.session.add(score_entry)
-        db.session.commit()
+        try:
+            db.session.add(score_entry)
+            # keep the summary rollups in step, in the same transaction
+            rollups.record_score(quiz_id, correct_answers, subject_id=snapshot["subject_id"])
+            db.session.commit()
+        except IntegrityError:
+            # the quiz was deleted after its snapshot was cached
+            db.session.rollback()
+            quiz_snapshots.forget_deleted(quiz_id)
+            raise
+        leaderboard.record_score(quiz_id, snapshot["subject_id"], current_user.id, correct_answers)
+        user_summary.forget(current_user.id)
 
         return jsonify({
             "message": "Submission successful",
             "score": correct_answers,
-            "total": len(quiz.questions)
+            "total": total
         }), 200
 
 
-@app.route('/api/user/score', methods=["GET"])
+@main.route('/api/user/score', methods=["GET"])
 @login_required
 def fetch_user_scores():
     """
-    Fetch a list of quiz scores for the logged-in user, most recent first, including score percentage.
+    Fetch a page of quiz scores for the logged-in user, most recent first, including score percentage.
     """
-    user_id = current_user.id
-    user_scores = Score.query.options(
-        joinedload(Score.quiz).joinedload(Quiz.chapter),
-        joinedload(Score.quiz).joinedload(Quiz.questions)
-    ).filter_by(user_id=user_id).order_by(Score.time_stamp_of_attempt.desc()).all()
-
-    result = []
-    for entry in user_scores:
-        # Calculating total possible score as there is 1 point per question
-        total_questions = len(entry.quiz.questions)
-        score_percentage = (entry.total_scored / total_questions * 100) if total_questions > 0 else 0
-
-        result.append({
-            "id": entry.id,
-            "quiz_id": entry.quiz_id,
-            "total_scored": entry.total_scored,
-            "score_percentage": round(score_percentage, 2),  # Rounded to 2 decimal places
-            "time_stamp_of_attempt": entry.time_stamp_of_attempt.strftime('%Y-%m-%d %H:%M:%S') if entry.time_stamp_of_attempt else 'N/A'
-        })
-
-    return jsonify({"scores": result}), 200
+    return _list_page(list_queries.SCORES, Score.user_id == current_user.id)
 
 
-@app.route('/api/user/summary', methods=["GET"])
+@main.route('/api/user/summary', methods=["GET"])
 @login_required
 def fetch_user_summary():
     """
-    Returns quiz attempt stats grouped by subject and by month.
+    Returns quiz attempt stats grouped by subject and by month (cached per user).
+    Not @read_replica: a lagging replica's numbers would stay cached until the next submission.
     """
-    user_id = current_user.id
-
-    # Count attempts per subject
-    subject_stats = (
-        db.session.query(Subject.name, func.count(Score.id))
-        .join(Chapter, Subject.id == Chapter.subject_id)
-        .join(Quiz, Chapter.id == Quiz.chapter_id)
-        .join(Score, Quiz.id == Score.quiz_id)
-        .filter(Score.user_id == user_id)
-        .group_by(Subject.id)
-        .all()
-    )
-
-    subject_labels = [label for label, _ in subject_stats]
-    subject_values = [count for _, count in subject_stats]
+    return jsonify(user_summary.summary_for(current_user.id)), 200
 
-    # Monthly distribution of attempts
-    all_scores = Score.query.filter_by(user_id=user_id).all()
-    monthly_count = defaultdict(int)
-    for score in all_scores:
-        month_name = score.time_stamp_of_attempt.strftime("%B")
-        monthly_count[month_name] += 1
 
-    month_labels = list(monthly_count.keys())
-    month_values = list(monthly_count.values())
+@main.route('/api/user/rank', methods=["GET"])
+@login_required
+@read_replica
+def fetch_user_rank():
+    """
+    The logged-in user's rank on the global leaderboard, or on one subject's or
+    quiz's (?subject_id= / ?quiz_id=), with ?neighbors= places around them and
+    the ?top= best users.
+    """
+    subject_id = request.args.get("subject_id", type=int)
+    quiz_id = request.args.get("quiz_id", type=int)
+    if subject_id is not None and quiz_id is not None:
+        return jsonify({"message": "Give either subject_id or quiz_id, not both"}), 400
+    neighbors = min(max(request.args.get("neighbors", 2, type=int), 0), 10)
+    top_count = min(max(request.args.get("top", 5, type=int), 0), 50)
+
+    mine = leaderboard.standing(current_user.id, neighbors, subject_id=subject_id, quiz_id=quiz_id)
+    best = leaderboard.top(top_count, subject_id=subject_id, quiz_id=quiz_id)
+    details = _leaderboard_users(list({user_id for _, user_id, _ in mine["neighbors"] + best}))
+
+    def entry(rank, user_id, score):
+        return {
+            "rank": rank,
+            "full_name": details.get(user_id, {}).get("full_name"),
+            "score": score,
+            "me": user_id == current_user.id
+        }
 
     return jsonify({
-        "subject_labels": subject_labels,
-        "subject_data": subject_values,
-        "pie_labels": month_labels,
-        "pie_data": month_values
+        "subject_id": subject_id,
+        "quiz_id": quiz_id,
+        "rank": mine["rank"],
+        "score": mine["score"],
+        "total": mine["total"],
+        "neighbors": [entry(*item) for item in mine["neighbors"]],
+        "top": [entry(*item) for item in best]
     }), 200
 
 
-@app.route('/api/user/search', methods=["GET"])
+def _search_limit():
+    """?limit= of the quiz searches: search.SEARCH_LIMIT by default, at most pagination.MAX_LIMIT."""
+    return min(max(request.args.get("limit", search.SEARCH_LIMIT, type=int), 1), pagination.MAX_LIMIT)
+
+
+def _search_quiz_buckets(term, limit):
+    """
+    Run one ranked index search and split the hits the way the dashboard shows them:
+    (matched by subject, matched by chapter, matched by quiz id or remarks, total matches).
+    At most `limit` hits are returned; total counts them all.
+    """
+    # A number is a quiz ID: direct primary key lookup
+    if term.isdigit():
+        found = search.find_quiz_by_number(term)
+        return [], [], found, len(found)
+
+    tokens = search.tokenize(term)
+    by_subject, by_chapter, by_quiz = [], [], []
+    quizzes, total = search.search_quizzes(term, limit)
+    for quiz in quizzes:
+        if search.matches_all(tokens, quiz.chapter.subject.name):
+            by_subject.append(quiz)
+        elif search.matches_all(tokens, quiz.chapter.name):
+            by_chapter.append(quiz)
+        else:
+            by_quiz.append(quiz)
+    return by_subject, by_chapter, by_quiz, total
+
+
+@main.route('/api/user/search', methods=["GET"])
 @login_required
+@read_replica
 def search_user_quizzes():
     """
-    Allows users to search quizzes by subject name, chapter name, or quiz ID.
+    Allows users to search quizzes by subject name, chapter name, remarks or quiz ID.
     """
     keyword = request.args.get('q', '').strip()
     if not keyword:
         return jsonify({"message": "Query parameter 'q' is required"}), 400
 
-    # Lookup by subject
-    matches_by_subject = Quiz.query.options(
-        joinedload(Quiz.chapter).joinedload(Chapter.subject)
-    ).join(Quiz.chapter).join(Chapter.subject).filter(
-        Subject.name.ilike(f"%{keyword}%")
-    ).all()
-
-    # Lookup by chapter
-    matches_by_chapter = Quiz.query.options(
-        joinedload(Quiz.chapter).joinedload(Chapter.subject)
-    ).join(Quiz.chapter).filter(
-        Chapter.name.ilike(f"%{keyword}%")
-    ).all()
-
-    # Lookup by quiz ID
-    matches_by_id = Quiz.query.options(
-        joinedload(Quiz.chapter).joinedload(Chapter.subject)
-    ).filter(
-        cast(Quiz.id, String).ilike(f"%{keyword}%")
-    ).all()
-
-    def format_quiz(quiz):
-        return {
-            "id": quiz.id,
-            "chapter_id": quiz.chapter_id,
-            "date_of_quiz": quiz.date_of_quiz.strftime('%Y-%m-%d') if quiz.date_of_quiz else None,
-            "start_time": quiz.start_time.strftime('%H:%M') if quiz.start_time else None,
-            "time_duration": quiz.time_duration.strftime('%H:%M') if quiz.time_duration else None,
-            "remarks": quiz.remarks,
-            "chapter": {
-                "id": quiz.chapter.id,
-                "name": quiz.chapter.name,
-                "subject": {
-                    "id": quiz.chapter.subject.id,
-                    "name": quiz.chapter.subject.name
-                } if quiz.chapter.subject else None
-            }
-        }
+    limit = _search_limit()
+    matches_by_subject, matches_by_chapter, matches_by_id, total = _search_quiz_buckets(keyword, limit)
 
     return jsonify({
         "q": keyword,
-        "subject_results": [format_quiz(qz) for qz in matches_by_subject],
-        "chapter_results": [format_quiz(qz) for qz in matches_by_chapter],
-        "quiz_results": [format_quiz(qz) for qz in matches_by_id]
+        "subject_results": rows(QuizWithChapter, matches_by_subject),
+        "chapter_results": rows(QuizWithChapter, matches_by_chapter),
+        "quiz_results": rows(QuizWithChapter, matches_by_id),
+        "total": total,
+        "truncated": total > limit,
+        "limit": limit
     }), 200
     
 
 
 
-@app.route('/api/admin/search', methods=["GET"])
+@main.route('/api/admin/search', methods=["GET"])
 @login_required
+@read_replica
 def admin_search_api():
     """
     Search for subjects, chapters, quizzes, and users based on query parameter 'q'.
@@ -1400,7 +1415,7 @@ def admin_search_api():
     return jsonify(results), 200
 
 
-@app.route('/api/user/update_profile', methods=['POST'])
+@main.route('/api/user/update_profile', methods=['POST'])
 @login_required
 def update_profile():
     data = request.get_json()
@@ -1409,6 +1424,7 @@ def update_profile():
         return jsonify({'message': 'Full name is required'}), 400
     current_user.full_name = full_name
     db.session.commit()
+    bump_tags("user")
     return jsonify({'message': 'Profile updated'})
 
 
@@ -1417,90 +1433,84 @@ def update_profile():
 #####################
 
 
-@app.route('/api/admin/export_dashboard_data', methods=['GET'])
+class _CsvLine:
+    """Stand-in file for csv.writer: writerow() returns the formatted line instead of storing it."""
+    def write(self, line):
+        return line
+
+
+@main.route('/api/admin/export_dashboard_data', methods=['GET'])
 @login_required
+@read_replica
 def export_admin_dashboard_data():
   
     if not current_user.has_role('admin'):
         return jsonify({'message': 'Unauthorized'}), 403
 
-    # Create CSV in memory
-    output = io.StringIO()
-    writer = csv.writer(output)
-
-    # Subject-wise Top Scores
-    top_scores = (
-        db.session.query(Subject.name, func.max(Score.total_scored).label('max_score'))
-        .join(Chapter, Subject.id == Chapter.subject_id)
-        .join(Quiz, Chapter.id == Quiz.chapter_id)
-        .join(Score, Quiz.id == Score.quiz_id)
-        .group_by(Subject.id)
-        .all()
-    )
-    writer.writerow(['Subject-wise Top Scores'])
-    writer.writerow(['Subject', 'Top Score'])
-    for subject, score in top_scores:
-        writer.writerow([subject, score if score is not None else 'N/A'])
-    writer.writerow([])  # Blank row for separation
-
-    # Subject-wise Attempts
-    attempt_data = (
-        db.session.query(Subject.name, func.count(Score.id).label('total_attempts'))
-        .join(Chapter, Subject.id == Chapter.subject_id)
-        .join(Quiz, Chapter.id == Quiz.chapter_id)
-        .join(Score, Quiz.id == Score.quiz_id)
-        .group_by(Subject.id)
-        .all()
-    )
-    writer.writerow(['Subject-wise Attempts'])
-    writer.writerow(['Subject', 'Total Attempts'])
-    for subject, attempts in attempt_data:
-        writer.writerow([subject, attempts])
-    writer.writerow([])  # Blank row for separation
-
-    # User Information
-    user_scores = (
-        db.session.query(
-            User.id,
-            User.full_name,
-            User.email,
-            func.sum(Score.total_scored).label('total_score'),
-            func.count(Score.id).label('total_attempts')
+    def generate_rows():
+        # Rows are yielded as soon as they are formatted, nothing is kept in memory
+        writer = csv.writer(_CsvLine())
+
+        # Subject-wise Top Scores and Attempts come from the rollups
+        subject_rollups = _subject_rollups()
+        yield writer.writerow(['Subject-wise Top Scores'])
+        yield writer.writerow(['Subject', 'Top Score'])
+        for subject, score, _ in subject_rollups:
+            yield writer.writerow([subject, score if score is not None else 'N/A'])
+        yield writer.writerow([])  # Blank row for separation
+
+        # Subject-wise Attempts
+        yield writer.writerow(['Subject-wise Attempts'])
+        yield writer.writerow(['Subject', 'Total Attempts'])
+        for subject, _, attempts in subject_rollups:
+            yield writer.writerow([subject, attempts])
+        yield writer.writerow([])  # Blank row for separation
+
+        # User Information, streamed from the cursor in batches while the query runs
+        user_scores = db.session.execute(
+            db.select(
+                User.id,
+                User.full_name,
+                User.email,
+                func.sum(Score.total_scored).label('total_score'),
+                func.count(Score.id).label('total_attempts')
+            )
+            .outerjoin(Score, User.id == Score.user_id)
+            .group_by(User.id)
+            .order_by(User.id)
+            .execution_options(yield_per=1000)
         )
-        .outerjoin(Score, User.id == Score.user_id)
-        .group_by(User.id)
-        .all()
-    )
-    writer.writerow(['User Information'])
-    writer.writerow(['User ID', 'Full Name', 'Email', 'Total Score', 'Total Attempts'])
-    for user_id, full_name, email, total_score, total_attempts in user_scores:
-        writer.writerow([
-            user_id,
-            full_name or 'N/A',
-            email,
-            total_score if total_score is not None else 0,
-            total_attempts
-        ])
-    writer.writerow([])  # Blank row for separation
-
-    # Summary: Total Number of Users
-    total_users = db.session.query(func.count(User.id)).scalar()
-    writer.writerow(['Summary'])
-    writer.writerow(['Metric', 'Value'])
-    writer.writerow(['Total Users', total_users])
-
-    # Prepare response
-    response = make_response(output.getvalue())
+        yield writer.writerow(['User Information'])
+        yield writer.writerow(['User ID', 'Full Name', 'Email', 'Total Score', 'Total Attempts'])
+        total_users = 0
+        for user_id, full_name, email, total_score, total_attempts in user_scores:
+            total_users += 1
+            yield writer.writerow([
+                user_id,
+                full_name or 'N/A',
+                email,
+                total_score if total_score is not None else 0,
+                total_attempts
+            ])
+        yield writer.writerow([])  # Blank row for separation
+
+        # Summary: Total Number of Users (one row per user was written above)
+        yield writer.writerow(['Summary'])
+        yield writer.writerow(['Metric', 'Value'])
+        yield writer.writerow(['Total Users', total_users])
+
+    # Prepare a streaming response
+    response = Response(stream_with_context(generate_rows()), mimetype='text/csv')
     response.headers['Content-Disposition'] = f'attachment; filename=admin_dashboard_data_{datetime.now().strftime("%Y%m%d_%H%M%S")}.csv'
-    response.headers['Content-Type'] = 'text/csv'
     
     return response
 
 #for users............ 
 
 
-@app.route('/api/user/export_quiz_data', methods=['GET'])
+@main.route('/api/user/export_quiz_data', methods=['GET'])
 @login_required
+@read_replica
 def export_quiz_data():
     # Fetch user's quiz scores
     scores = (db.session.query(Score, Quiz, Chapter, Subject)
@@ -1517,9 +1527,9 @@ def export_quiz_data():
 
     for score, quiz, chapter, subject in scores:
         # Calculate total possible score (assuming 1 point per question)
-        total_questions = db.session.query(Question).filter_by(quiz_id=quiz.id).count()
+        total_questions = quiz.question_count
         score_percentage = (score.total_scored / total_questions * 100) if total_questions > 0 else 0
-        attempt_time = score.time_stamp_of_attempt.strftime('%Y-%m-%d %H:%M:%S') if score.time_stamp_of_attempt else 'N/A'
+        attempt_time = format_datetime(score.time_stamp_of_attempt) or 'N/A'
         
         writer.writerow([
             quiz.id,
@@ -1541,19 +1551,22 @@ def export_quiz_data():
 #############CELEERY TASKS#3#######################
 
 
-@celery_app.task(base=FlaskTask)
+@shared_task(base=FlaskTask)
 def send_daily_quiz_reminders():
     """
     Send daily reminders to all active users (except admin@quizmaster.com as this is admin) about new quizzes created in the last 24 hours.
+    The users are split into keyset chunks that are mailed in parallel by send_reminder_chunk,
+    and summarize_reminder_chunks collects the final sent/failed count.
     """
     time_threshold = datetime.utcnow() - timedelta(days=1)  # Last 24 hours
 
-    # Find new quizzes
+    # Find new quizzes, with their subject names in the same query
     new_quizzes = (
-        Quiz.query
+        db.session.query(Quiz.id, Subject.name)
         .join(Chapter, Quiz.chapter_id == Chapter.id)
         .join(Subject, Chapter.subject_id == Subject.id)
         .filter(Quiz.created_at >= time_threshold)
+        .order_by(Quiz.id)
         .all()
     )
 
@@ -1562,49 +1575,107 @@ def send_daily_quiz_reminders():
         app.logger.info("No new quizzes found for reminder.")
         return 0
 
-    # Get all active users
-    users = User.query.filter(User.active == True).all()
-    if not users:
-        app.logger.info("No active users found for reminder.")
-        return 0
+    quiz_lines = [f"- Quiz ID {quiz_id} in {subject_name}" for quiz_id, subject_name in new_quizzes]
 
-    # Prepare email content
+    chunks = notifications.plan_user_chunks(app.config.get("REMINDER_CHUNK_SIZE", 500))
+    chord(
+        send_reminder_chunk.s(after_id, upto_id, quiz_lines) for after_id, upto_id in chunks
+    )(summarize_reminder_chunks.s())
+
+    app.logger.info(f"Queued daily reminders in {len(chunks)} chunk(s).")
+    return len(chunks)
+
+
+@shared_task(base=FlaskTask, autoretry_for=notifications.CONNECTION_ERRORS, retry_backoff=True, max_retries=3)
+def send_reminder_chunk(after_id, upto_id, quiz_lines):
+    """
+    Mail one keyset range of users (id in (after_id, upto_id]) over a single SMTP session.
+    """
     subject = "QuizMaster: New Quizzes Await You!"
+    throttle = notifications.SendThrottle(app.config.get("MAIL_SEND_RATE_LIMIT", 0))
     sent_count = 0
-    for user in users:
-        # Skiping admin@quizmaster.com
-        if user.email == 'admin@quizmaster.com':
-            app.logger.info(f"Skipping reminder email for {user.email}")
-            continue
-
-        body = f"Hello {user.full_name or user.email},\n\n"
-        body += "New quizzes are available on QuizMaster:\n"
-        for quiz in new_quizzes:
-            subject_name = quiz.chapter.subject.name
-            body += f"- Quiz ID {quiz.id} in {subject_name}\n"
-        body += "\nLog in to attempt these quizzes: http://127.0.0.1:5000/#/user/dashboard\n\n"
-        body += "Best,\nQuizMaster Team"
-
-        msg = Message(
-            subject=subject,
-            recipients=[user.email],
-            body=body
-        )
-        try:
-            mail.send(msg)
-            app.logger.info(f"Sent reminder email to {user.email}")
-            sent_count += 1
-        except Exception as e:
-            app.logger.error(f"Failed to send email to {user.email}: {str(e)}")
+    failed_count = 0
 
-    return sent_count
+    # one SMTP session for the whole chunk; if it cannot be opened nothing was sent and the task is retried
+    conn = notifications.open_session()
+    try:
+        for user_id, email, full_name in notifications.iter_active_users(after_id, upto_id):
+            # Skiping admin@quizmaster.com
+            if email == notifications.ADMIN_EMAIL:
+                app.logger.info(f"Skipping reminder email for {email}")
+                continue
+
+            body = f"Hello {full_name or email},\n\n"
+            body += "New quizzes are available on QuizMaster:\n"
+            body += "\n".join(quiz_lines) + "\n"
+            body += "\nLog in to attempt these quizzes: http://127.0.0.1:5000/#/user/dashboard\n\n"
+            body += "Best,\nQuizMaster Team"
+
+            msg = Message(
+                subject=subject,
+                recipients=[email],
+                body=body
+            )
+            if notifications.send_with_retry(conn, msg, throttle):
+                sent_count += 1
+            else:
+                failed_count += 1
+    finally:
+        notifications.close_quietly(conn)
+
+    app.logger.info(f"Reminder chunk ({after_id}, {upto_id}]: sent {sent_count}, failed {failed_count}")
+    return {"sent": sent_count, "failed": failed_count}
+
+
+@shared_task(base=FlaskTask)
+def summarize_reminder_chunks(chunk_results):
+    """
+    Chord callback: add up the sent/failed counts of every reminder chunk.
+    """
+    totals = {
+        "sent": sum(result["sent"] for result in chunk_results),
+        "failed": sum(result["failed"] for result in chunk_results)
+    }
+    app.logger.info(f"Daily reminders finished: sent {totals['sent']}, failed {totals['failed']}")
+    return totals
+
+
+@shared_task(base=FlaskTask)
+def drain_score_queue():
+    """
+    Bulk insert the quiz submissions buffered in write-behind mode (SCORE_WRITE_BEHIND).
+    """
+    if not score_queue.enabled():
+        return 0
+    written = score_queue.drain()
+    if written:
+        app.logger.info(f"Stored {written} buffered quiz submission(s).")
+    return written
+
+
+@shared_task(base=FlaskTask)
+def rebuild_leaderboards():
+    """
+    Rebuild the Redis leaderboards from the Score table, repairing any drift.
+    """
+    written = leaderboard.rebuild()
+    app.logger.info(f"Rebuilt the leaderboards from {written} best score(s).")
+    return written
+
+
+@shared_task(base=FlaskTask)
+def refresh_read_snapshot():
+    """
+    Copy the SQLite database into the snapshot read by @read_replica routes (SQLITE_SNAPSHOT_PATH).
+    """
+    return read_routing.refresh_snapshot(app)
 
 
 ################################
 # for  momthly reports
 ###############################
 
-@celery_app.task(base=FlaskTask)
+@shared_task(base=FlaskTask)
 def send_monthly_activity_report():
     """
     Send a monthly activity report to all active users (except admin@quizmaster.com) on the 1st of each month.
@@ -1616,98 +1687,45 @@ def send_monthly_activity_report():
     last_day_prev_month = first_day_current_month - timedelta(seconds=1)
     first_day_prev_month = last_day_prev_month.replace(day=1, hour=0, minute=0, second=0, microsecond=0)
 
-    # Get new quizzes from the previous month
+    # Get new quizzes from the previous month, with chapter and subject names in one joined query
     new_quizzes = (
-        Quiz.query
+        db.session.query(Quiz.id, Subject.name, Chapter.name, Quiz.created_at)
         .join(Chapter, Quiz.chapter_id == Chapter.id)
         .join(Subject, Chapter.subject_id == Subject.id)
         .filter(
             Quiz.created_at >= first_day_prev_month,
             Quiz.created_at <= last_day_prev_month
         )
+        .order_by(Quiz.id)
         .all()
     )
 
-    # Get all active users
-    users = User.query.filter(User.active == True).all()
-    if not users:
-        app.logger.info("No active users found for monthly report.")
-        return 0
+    # The quiz table is the same for everyone, so it is rendered once; only the greeting is per user
+    month_label = first_day_prev_month.strftime('%B %Y')
+    render_report = notifications.monthly_report_renderer(app.jinja_env, new_quizzes, month_label)
 
-    # Prepare HTML email content
     sent_count = 0
-    for user in users:
-        
-        if user.email == 'admin@quizmaster.com':
-            app.logger.info(f"Skipping monthly report for {user.email}")
-            continue
-
-        html_content = f"""
-        <html>
-            <head>
-                <style>
-                    body {{ font-family: Arial, sans-serif; color: #333; line-height: 1.6; }}
-                    .container {{ max-width: 600px; margin: 0 auto; padding: 20px; background-color: #f9f9f9; }}
-                    .header {{ background-color: #007bff; color: white; padding: 10px; text-align: center; }}
-                    .content {{ background-color: white; padding: 20px; border-radius: 5px; }}
-                    table {{ width: 100%; border-collapse: collapse; margin: 20px 0; }}
-                    th, td {{ border: 1px solid #ddd; padding: 8px; text-align: left; }}
-                    th {{ background-color: #f2f2f2; }}
-                    .footer {{ text-align: center; font-size: 12px; color: #777; }}
-                </style>
-            </head>
-            <body>
-                <div class="container">
-                    <div class="header">
-                        <h2>QuizMaster Monthly Activity Report</h2>
-                    </div>
-                    <div class="content">
-                        <p>Hello {user.full_name or user.email},</p>
-                        <p>Your activity report for {first_day_prev_month.strftime('%B %Y')} is here!</p>
-                        <ul>
-                            <li><strong>Account Status:</strong> Active</li>
-                            <li><strong>New Quizzes Added:</strong> {len(new_quizzes)}</li>
-                        </ul>
-                        {'<h3>New Quizzes This Month</h3>' if new_quizzes else '<p>No new quizzes were added this month.</p>'}
-                        {'' if not new_quizzes else '''
-                        <table>
-                            <tr>
-                                <th>Quiz ID</th>
-                                <th>Subject</th>
-                                <th>Chapter</th>
-                                <th>Created Date</th>
-                            </tr>
-                            ''' + ''.join(f'''
-                            <tr>
-                                <td>{q.id}</td>
-                                <td>{q.chapter.subject.name}</td>
-                                <td>{q.chapter.name}</td>
-                                <td>{q.created_at.strftime('%Y-%m-%d')}</td>
-                            </tr>
-                            ''' for q in new_quizzes) + '</table>'}
-                        <p>Explore these quizzes and test your knowledge!</p>
-                        <p><a href="http://localhost:5000/user/dashboard" style="color: #007bff;">Go to Dashboard</a></p>
-                    </div>
-                    <div class="footer">
-                        <p>QuizMaster Team &copy; 2025</p>
-                    </div>
-                </div>
-            </body>
-        </html>
-        """
-
-        # Send email
-        msg = Message(
-            subject=f"QuizMaster Monthly Activity Report - {first_day_prev_month.strftime('%B %Y')}",
-            recipients=[user.email],
-            html=html_content
-        )
-        try:
-            mail.send(msg)
-            app.logger.info(f"Sent monthly report to {user.email}")
-            sent_count += 1
-        except Exception as e:
-            app.logger.error(f"Failed to send monthly report to {user.email}: {str(e)}")
+    conn = notifications.open_session()
+    try:
+        for user_id, email, full_name in notifications.iter_active_users(0):
+            if email == notifications.ADMIN_EMAIL:
+                app.logger.info(f"Skipping monthly report for {email}")
+                continue
+
+            # Send email
+            msg = Message(
+                subject=f"QuizMaster Monthly Activity Report - {month_label}",
+                recipients=[email],
+                html=render_report(full_name or email)
+            )
+            if notifications.send_with_retry(conn, msg):
+                app.logger.info(f"Sent monthly report to {email}")
+                sent_count += 1
+    finally:
+        notifications.close_quietly(conn)
+
+    if not sent_count:
+        app.logger.info("No monthly reports were sent.")
 
     return sent_count
 
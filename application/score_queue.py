@@ -0,0 +1,215 @@
+import hashlib
+import json
+import os
+import socket
+import uuid
+from datetime import datetime
+from flask import current_app
+from redis import ResponseError
+from sqlalchemy import insert
+from sqlalchemy.exc import IntegrityError
+from application.database import db
+from application.models import Quiz, Score, User
+from application import leaderboard, rollups, user_summary
+from caching import get_redis
+
+# Write-behind mode for quiz submissions (SCORE_WRITE_BEHIND).
+#
+# The attempt route grades in memory and appends the result to a Redis stream,
+# guarded by an idempotency marker, then answers immediately. The
+# drain_score_queue Celery task reads the stream through a consumer group and
+# bulk inserts each batch in one transaction. Entries are acknowledged only
+# after the commit, so a crash redelivers them (at-least-once), and the unique
+# Score.submission_key turns a redelivery into a no-op (exactly-once rows).
+# Durability of accepted-but-not-yet-written entries is Redis persistence:
+# run it with appendonly yes. A submission that can never be written (its quiz
+# or user was deleted before the drain) is moved to DEAD_STREAM with the
+# reason, so it cannot hold back the rest of the stream.
+
+STREAM = "score_submissions"
+GROUP = "score_writers"
+DEAD_STREAM = "score_submissions:dead"
+MARKER_KEY = "score_submission:{key}"
+MARKER_TIMEOUT = 86400  # how long a retried submission is recognised
+
+# Set the marker and append to the stream atomically: either both happen or neither.
+_ENQUEUE_SCRIPT = """
+if redis.call('SET', KEYS[1], ARGV[1], 'NX', 'EX', ARGV[2]) then
+    redis.call('XADD', KEYS[2], '*', 'data', ARGV[3])
+    return false
+end
+return redis.call('GET', KEYS[1])
+"""
+
+
+def enabled():
+    return current_app.config.get("SCORE_WRITE_BEHIND", False)
+
+
+def submission_key(user_id, quiz_id, client_key=None):
+    """
+    Idempotency key of a submission. A client-sent Idempotency-Key header is scoped
+    to the user and quiz; without one every submission is unique.
+    """
+    if client_key:
+        return hashlib.sha256(f"{user_id}:{quiz_id}:{client_key}".encode()).hexdigest()
+    return uuid.uuid4().hex
+
+
+def enqueue(key, quiz_id, subject_id, user_id, total_scored, total):
+    """
+    Buffer one graded submission. Returns None when it was queued, or the result
+    stored for an earlier submission with the same key. Raises RedisError when the
+    queue is unreachable so the caller can write synchronously instead.
+    """
+    result = json.dumps({"score": total_scored, "total": total})
+    record = json.dumps({
+        "key": key,
+        "quiz_id": quiz_id,
+        "subject_id": subject_id,
+        "user_id": user_id,
+        "total_scored": total_scored,
+        "time_stamp_of_attempt": datetime.utcnow().isoformat(),
+    })
+    script = get_redis().register_script(_ENQUEUE_SCRIPT)
+    previous = script(keys=[MARKER_KEY.format(key=key), STREAM], args=[result, MARKER_TIMEOUT, record])
+    return json.loads(previous) if previous else None
+
+
+def _consumer_name():
+    return f"{socket.gethostname()}-{os.getpid()}"
+
+
+def _ensure_group(client):
+    try:
+        client.xgroup_create(STREAM, GROUP, id="0", mkstream=True)
+    except ResponseError as e:
+        if "BUSYGROUP" not in str(e):
+            raise
+
+
+def _write_batch(records):
+    """Insert the records not already stored, fold them into the rollups, commit. Returns them."""
+    unique = {}
+    for record in records:
+        unique.setdefault(record["key"], record)
+
+    existing = {
+        key for key, in db.session.query(Score.submission_key)
+        .filter(Score.submission_key.in_(list(unique)))
+    }
+    fresh = [record for key, record in unique.items() if key not in existing]
+
+    if fresh:
+        db.session.execute(insert(Score), [
+            {
+                "quiz_id": record["quiz_id"],
+                "user_id": record["user_id"],
+                "total_scored": record["total_scored"],
+                "time_stamp_of_attempt": datetime.fromisoformat(record["time_stamp_of_attempt"]),
+                "submission_key": record["key"],
+            }
+            for record in fresh
+        ])
+        rollups.record_scores(
+            (record["quiz_id"], record["subject_id"], record["total_scored"]) for record in fresh
+        )
+    db.session.commit()
+    leaderboard.record_scores(
+        (record["quiz_id"], record["subject_id"], record["user_id"], record["total_scored"]) for record in fresh
+    )
+    user_summary.forget(*[record["user_id"] for record in fresh])
+    return fresh
+
+
+def _split_orphans(records):
+    """(records whose quiz and user still exist, records whose quiz or user was deleted)."""
+    quiz_ids = {
+        quiz_id for quiz_id, in db.session.query(Quiz.id).filter(Quiz.id.in_({r["quiz_id"] for r in records}))
+    }
+    user_ids = {
+        user_id for user_id, in db.session.query(User.id).filter(User.id.in_({r["user_id"] for r in records}))
+    }
+    live, orphans = [], []
+    for record in records:
+        (live if record["quiz_id"] in quiz_ids and record["user_id"] in user_ids else orphans).append(record)
+    return live, orphans
+
+
+def _dead_letter(client, records, reason):
+    for record in records:
+        client.xadd(DEAD_STREAM, {"data": json.dumps(record), "reason": reason})
+    current_app.logger.warning(
+        f"Score queue: {len(records)} submission(s) moved to {DEAD_STREAM} ({reason}): "
+        f"{', '.join(record['key'] for record in records)}"
+    )
+
+
+def _write_or_dead_letter(client, records):
+    """
+    Write a batch whose first insert failed: another consumer committed some of
+    the keys meanwhile (they are skipped on retry), or a quiz or user was deleted
+    since the submission (dead-lettered). One record at a time as the last resort.
+    """
+    records, orphans = _split_orphans(records)
+    if orphans:
+        _dead_letter(client, orphans, "quiz or user deleted")
+    try:
+        _write_batch(records)
+        return
+    except IntegrityError:
+        db.session.rollback()
+    for record in records:
+        try:
+            _write_batch([record])
+        except IntegrityError as e:
+            db.session.rollback()
+            _dead_letter(client, [record], f"integrity error: {e.orig}")
+
+
+def drain_batch(batch_size=None, consumer=None):
+    """
+    Write one batch from the stream. Entries a dead consumer read but never
+    acknowledged are taken over first. Returns the number of stream entries handled.
+    """
+    config = current_app.config
+    batch_size = batch_size or config.get("SCORE_QUEUE_BATCH_SIZE", 500)
+    consumer = consumer or _consumer_name()
+    client = get_redis()
+    _ensure_group(client)
+
+    claimed = client.xautoclaim(
+        STREAM, GROUP, consumer,
+        min_idle_time=config.get("SCORE_QUEUE_CLAIM_IDLE_MS", 60000),
+        start_id="0-0",
+        count=batch_size
+    )[1]
+    entries = [(entry_id, fields) for entry_id, fields in claimed if fields]
+    if not entries:
+        for _, stream_entries in client.xreadgroup(GROUP, consumer, {STREAM: ">"}, count=batch_size) or []:
+            entries.extend(stream_entries)
+    if not entries:
+        return 0
+
+    records = [json.loads(fields[b"data"]) for _, fields in entries]
+    try:
+        _write_batch(records)
+    except IntegrityError:
+        db.session.rollback()
+        _write_or_dead_letter(client, records)
+
+    entry_ids = [entry_id for entry_id, _ in entries]
+    client.xack(STREAM, GROUP, *entry_ids)
+    client.xdel(STREAM, *entry_ids)
+    return len(entries)
+
+
+def drain(batch_size=None):
+    """Write batches until the stream is empty (also the flush-on-shutdown path)."""
+    total = 0
+    consumer = _consumer_name()
+    while True:
+        handled = drain_batch(batch_size, consumer)
+        if not handled:
+            return total
+        total += handled
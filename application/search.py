@@ -0,0 +1,207 @@
+import re
+import time
+from sqlalchemy import column, func, select, table, text
+from sqlalchemy.orm import contains_eager, joinedload
+from application.database import db
+from application.models import Quiz, Chapter, Subject
+
+# Quiz discovery index: one document per quiz made of its subject name, chapter name
+# and remarks. On SQLite it is an FTS5 table kept in sync by triggers; other
+# backends get an in-process inverted index rebuilt from a single joined query.
+
+_WORD = re.compile(r"\w+", re.UNICODE)
+SEARCH_LIMIT = 50  # results per search unless ?limit= asks for more
+
+FTS_SCHEMA = [
+    "CREATE VIRTUAL TABLE IF NOT EXISTS quiz_search USING fts5("
+    "subject_name, chapter_name, remarks, tokenize='unicode61 remove_diacritics 2')",
+
+    """CREATE TRIGGER IF NOT EXISTS quiz_search_quiz_insert AFTER INSERT ON quiz BEGIN
+        INSERT INTO quiz_search(rowid, subject_name, chapter_name, remarks)
+        SELECT new.id, subject.name, chapter.name, new.remarks
+        FROM chapter JOIN subject ON subject.id = chapter.subject_id
+        WHERE chapter.id = new.chapter_id;
+    END""",
+
+    """CREATE TRIGGER IF NOT EXISTS quiz_search_quiz_update AFTER UPDATE OF chapter_id, remarks ON quiz BEGIN
+        DELETE FROM quiz_search WHERE rowid = old.id;
+        INSERT INTO quiz_search(rowid, subject_name, chapter_name, remarks)
+        SELECT new.id, subject.name, chapter.name, new.remarks
+        FROM chapter JOIN subject ON subject.id = chapter.subject_id
+        WHERE chapter.id = new.chapter_id;
+    END""",
+
+    """CREATE TRIGGER IF NOT EXISTS quiz_search_quiz_delete AFTER DELETE ON quiz BEGIN
+        DELETE FROM quiz_search WHERE rowid = old.id;
+    END""",
+
+    """CREATE TRIGGER IF NOT EXISTS quiz_search_chapter_update AFTER UPDATE OF name, subject_id ON chapter BEGIN
+        UPDATE quiz_search
+        SET chapter_name = new.name,
+            subject_name = (SELECT name FROM subject WHERE id = new.subject_id)
+        WHERE rowid IN (SELECT id FROM quiz WHERE chapter_id = new.id);
+    END""",
+
+    """CREATE TRIGGER IF NOT EXISTS quiz_search_subject_update AFTER UPDATE OF name ON subject BEGIN
+        UPDATE quiz_search SET subject_name = new.name
+        WHERE rowid IN (
+            SELECT quiz.id FROM quiz JOIN chapter ON chapter.id = quiz.chapter_id
+            WHERE chapter.subject_id = new.id
+        );
+    END""",
+]
+
+_fts = table("quiz_search", column("rowid"), column("rank"), column("quiz_search"))
+
+
+def tokenize(value):
+    return _WORD.findall((value or "").lower())
+
+
+def uses_fts():
+    return db.engine.dialect.name == "sqlite"
+
+
+def ensure_search_index():
+    """
+    Create the FTS5 table and its triggers when missing, filling it from the
+    existing quizzes. Returns True when the index had to be created.
+    """
+    if not uses_fts():
+        return False
+    exists = db.session.execute(text(
+        "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'quiz_search'"
+    )).first()
+    for statement in FTS_SCHEMA:
+        db.session.execute(text(statement))
+    if not exists:
+        rebuild_search_index()
+    return not exists
+
+
+def rebuild_search_index():
+    """Refill the search index from the catalog tables."""
+    if not uses_fts():
+        _fallback.clear()
+        return
+    db.session.execute(text("DELETE FROM quiz_search"))
+    db.session.execute(text(
+        "INSERT INTO quiz_search(rowid, subject_name, chapter_name, remarks) "
+        "SELECT quiz.id, subject.name, chapter.name, quiz.remarks "
+        "FROM quiz JOIN chapter ON chapter.id = quiz.chapter_id "
+        "JOIN subject ON subject.id = chapter.subject_id"
+    ))
+
+
+class _FallbackIndex:
+    """In-process inverted index for backends without FTS5."""
+
+    max_age = 60  # seconds; other workers' catalog edits show up within this window
+
+    def __init__(self):
+        self.clear()
+
+    def clear(self):
+        self.postings = None
+        self.built_at = 0.0
+
+    def _build(self):
+        postings = {}
+        rows = (
+            db.session.query(Quiz.id, Subject.name, Chapter.name, Quiz.remarks)
+            .join(Chapter, Quiz.chapter_id == Chapter.id)
+            .join(Subject, Chapter.subject_id == Subject.id)
+            .all()
+        )
+        for quiz_id, subject_name, chapter_name, remarks in rows:
+            for word in set(tokenize(f"{subject_name} {chapter_name} {remarks}")):
+                postings.setdefault(word, set()).add(quiz_id)
+        self.postings = postings
+        self.built_at = time.monotonic()
+
+    def search(self, tokens):
+        """Ids of the quizzes matching every token, best first."""
+        if self.postings is None or time.monotonic() - self.built_at > self.max_age:
+            self._build()
+
+        scores = None
+        for token in tokens:
+            hits = {}
+            for word, quiz_ids in self.postings.items():
+                if word.startswith(token):
+                    for quiz_id in quiz_ids:
+                        hits[quiz_id] = hits.get(quiz_id, 0) + (2 if word == token else 1)
+            if scores is None:
+                scores = hits
+            else:
+                scores = {quiz_id: scores[quiz_id] + hits[quiz_id] for quiz_id in scores.keys() & hits.keys()}
+            if not scores:
+                return []
+        return sorted(scores, key=lambda quiz_id: (-scores[quiz_id], quiz_id))
+
+
+_fallback = _FallbackIndex()
+
+
+def mark_catalog_changed():
+    """Called by the catalog CRUD routes; FTS5 is kept current by its triggers."""
+    if not uses_fts():
+        _fallback.clear()
+
+
+def search_quizzes(term, limit=SEARCH_LIMIT):
+    """
+    Ranked quiz search over subject name, chapter name and remarks.
+    Every search word is a prefix match and all of them must match.
+    Returns (the best `limit` quizzes, with chapter and subject already loaded,
+    total number of matches); the total is only counted when there are more.
+    """
+    tokens = tokenize(term)
+    if not tokens:
+        return [], 0
+
+    if uses_fts():
+        match = " ".join(f'"{token}"*' for token in tokens)
+        matching = _fts.c.quiz_search.op("MATCH")(match)
+        # one extra row tells whether the results were cut off
+        quizzes = (
+            Quiz.query
+            .join(Quiz.chapter)
+            .join(Chapter.subject)
+            .join(_fts, _fts.c.rowid == Quiz.id)
+            .filter(matching)
+            .options(contains_eager(Quiz.chapter).contains_eager(Chapter.subject))
+            .order_by(_fts.c.rank)
+            .limit(limit + 1)
+            .all()
+        )
+        if len(quizzes) <= limit:
+            return quizzes, len(quizzes)
+        total = db.session.execute(
+            select(func.count()).select_from(_fts).join(Quiz, Quiz.id == _fts.c.rowid).where(matching)
+        ).scalar()
+        return quizzes[:limit], total
+
+    matched_ids = _fallback.search(tokens)
+    ranked_ids = matched_ids[:limit]
+    if not ranked_ids:
+        return [], 0
+    quizzes = Quiz.query.options(
+        joinedload(Quiz.chapter).joinedload(Chapter.subject)
+    ).filter(Quiz.id.in_(ranked_ids)).all()
+    position = {quiz_id: index for index, quiz_id in enumerate(ranked_ids)}
+    return sorted(quizzes, key=lambda quiz: position[quiz.id]), len(matched_ids)
+
+
+def find_quiz_by_number(term):
+    """Numeric search terms are quiz ids: a primary key lookup instead of a text scan."""
+    quiz = Quiz.query.options(
+        joinedload(Quiz.chapter).joinedload(Chapter.subject)
+    ).filter(Quiz.id == int(term)).first()
+    return [quiz] if quiz else []
+
+
+def matches_all(tokens, value):
+    """True when every search word is a prefix of some word of value (same rule as the index)."""
+    words = tokenize(value)
+    return all(any(word.startswith(token) for word in words) for token in tokens)
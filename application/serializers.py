@@ -0,0 +1,252 @@
+import dataclasses
+from dataclasses import dataclass
+from functools import lru_cache
+from flask.json.provider import DefaultJSONProvider
+
+try:
+    import orjson
+except ImportError:  # optional: the stdlib json module is used without it
+    orjson = None
+
+# Response rows for the JSON routes.
+#
+# Every route used to build its own dicts with repeated strftime() and
+# "if x else None" for each Quiz, Question and User. The row types below are
+# built once per model object through one code path, with the date and time
+# strings memoised (a list of quizzes repeats the same few dates, start times
+# and durations over and over). They are __slots__ dataclasses: small, and
+# written by orjson directly when it is installed (see FastJSONProvider).
+
+
+# ---------------------------------------------------------------- formatting
+
+@lru_cache(maxsize=4096)
+def format_date(value):
+    """'YYYY-MM-DD' of a date / datetime, None stays None."""
+    return value.isoformat()[:10] if value is not None else None
+
+
+@lru_cache(maxsize=1024)
+def format_time(value):
+    """'HH:MM' of a time, None stays None."""
+    return value.isoformat("minutes") if value is not None else None
+
+
+def format_datetime(value):
+    """'YYYY-MM-DD HH:MM:SS' of a naive datetime, None stays None (not cached: mostly unique)."""
+    return value.isoformat(" ", "seconds") if value is not None else None
+
+
+# ---------------------------------------------------------------- row types
+
+@dataclass(slots=True)
+class SubjectRef:
+    id: int
+    name: str
+
+    @classmethod
+    def of(cls, subject):
+        return cls(subject.id, subject.name) if subject is not None else None
+
+
+@dataclass(slots=True)
+class ChapterRef:
+    id: int
+    name: str
+    subject: SubjectRef
+
+    @classmethod
+    def of(cls, chapter):
+        return cls(chapter.id, chapter.name, SubjectRef.of(chapter.subject))
+
+
+@dataclass(slots=True)
+class ChapterRow:
+    id: int
+    name: str
+    description: str
+    subject_id: int
+
+    @classmethod
+    def of(cls, chapter):
+        return cls(chapter.id, chapter.name, chapter.description, chapter.subject_id)
+
+
+def _quiz_fields(quiz):
+    return (
+        quiz.id,
+        quiz.chapter_id,
+        format_date(quiz.date_of_quiz),
+        format_time(quiz.start_time),
+        format_time(quiz.time_duration),
+        quiz.remarks,
+    )
+
+
+@dataclass(slots=True)
+class QuizRow:
+    """A quiz's schedule, as every quiz list shows it."""
+    id: int
+    chapter_id: int
+    date_of_quiz: str
+    start_time: str
+    time_duration: str
+    remarks: str
+
+    @classmethod
+    def of(cls, quiz):
+        return cls(*_quiz_fields(quiz))
+
+
+@dataclass(slots=True)
+class QuizDetail(QuizRow):
+    """Admin quiz CRUD and search: with the creation time."""
+    created_at: str
+
+    @classmethod
+    def of(cls, quiz):
+        return cls(*_quiz_fields(quiz), format_datetime(quiz.created_at))
+
+
+@dataclass(slots=True)
+class QuizCount(QuizRow):
+    """Admin dashboard tree: with the number of questions."""
+    question_count: int
+
+    @classmethod
+    def of(cls, quiz):
+        return cls(*_quiz_fields(quiz), quiz.question_count)
+
+
+@dataclass(slots=True)
+class QuizWithChapter(QuizRow):
+    """User dashboard, search and upcoming quizzes: with the chapter and subject names."""
+    chapter: ChapterRef
+
+    @classmethod
+    def of(cls, quiz):
+        return cls(*_quiz_fields(quiz), ChapterRef.of(quiz.chapter))
+
+
+@dataclass(slots=True)
+class QuizPage(QuizWithChapter):
+    """A single quiz page (user view): chapter, subject and creation time."""
+    created_at: str
+
+    @classmethod
+    def of(cls, quiz):
+        return cls(*_quiz_fields(quiz), ChapterRef.of(quiz.chapter), format_datetime(quiz.created_at))
+
+
+@dataclass(slots=True)
+class QuizWithQuestions(QuizRow):
+    """Full admin dashboard: with every question."""
+    questions: list
+
+    @classmethod
+    def of(cls, quiz):
+        return cls(*_quiz_fields(quiz), [QuestionRow.of(question) for question in quiz.questions])
+
+
+@dataclass(slots=True)
+class QuestionRow:
+    id: int
+    quiz_id: int
+    question_statement: str
+    option1: str
+    option2: str
+    option3: str
+    option4: str
+    correct_option: int
+
+    @classmethod
+    def of(cls, question):
+        return cls(
+            question.id, question.quiz_id, question.question_statement,
+            question.option1, question.option2, question.option3, question.option4,
+            question.correct_option
+        )
+
+
+@dataclass(slots=True)
+class UserRow:
+    id: int
+    email: str
+    full_name: str
+    qualification: str
+    dob: str
+    active: bool
+    roles: list
+
+    @classmethod
+    def of(cls, user):
+        return cls(
+            user.id, user.email, user.full_name, user.qualification, user.dob, user.active,
+            [role.name for role in user.roles]
+        )
+
+
+def rows(row_type, objects):
+    """row_type.of() of every object, as a list."""
+    return [row_type.of(obj) for obj in objects]
+
+
+# ---------------------------------------------------------------- JSON
+
+@lru_cache(maxsize=None)
+def _field_names(row_type):
+    return tuple(field.name for field in dataclasses.fields(row_type))
+
+
+def _shallow_dict(obj):
+    # dataclasses.asdict() deep-copies every value; the nested rows are handled by json itself
+    return {name: getattr(obj, name) for name in _field_names(type(obj))}
+
+
+class FastJSONProvider(DefaultJSONProvider):
+    """
+    Flask's JSON provider, writing with orjson when it is installed.
+
+    orjson writes the row types natively; dicts keep Flask's sorted keys, and
+    datetimes and anything else orjson does not know go through Flask's usual
+    conversions (HTTP dates, Decimal, UUID, __html__). Responses in debug mode
+    are indented by orjson too. Without orjson, or when a call passes
+    json.dumps() options, the stdlib path is used.
+    """
+
+    ORJSON_OPTIONS = (
+        (orjson.OPT_SORT_KEYS | orjson.OPT_NON_STR_KEYS | orjson.OPT_PASSTHROUGH_DATETIME) if orjson else 0
+    )
+
+    @staticmethod
+    def default(o):
+        if dataclasses.is_dataclass(o) and not isinstance(o, type):
+            return _shallow_dict(o)
+        return DefaultJSONProvider.default(o)
+
+    def dumps(self, obj, **kwargs):
+        if orjson is None or kwargs:
+            return super().dumps(obj, **kwargs)
+        return orjson.dumps(obj, default=self.default, option=self.ORJSON_OPTIONS).decode()
+
+    def loads(self, s, **kwargs):
+        if orjson is None or kwargs:
+            return super().loads(s, **kwargs)
+        return orjson.loads(s)
+
+    def response(self, *args, **kwargs):
+        if orjson is None:
+            return super().response(*args, **kwargs)
+        option = self.ORJSON_OPTIONS
+        if self.compact is False or (self.compact is None and self._app.debug):
+            # pretty-printed like Flask's debug output (indent 2), still through orjson
+            option |= orjson.OPT_INDENT_2
+        obj = self._prepare_response_obj(args, kwargs)
+        body = orjson.dumps(obj, default=self.default, option=option)
+        return self._app.response_class(body + b"\n", mimetype=self.mimetype)
+
+
+def init_json_provider(app):
+    """Call before Security(app): Flask-Security subclasses app.json_provider_class for its lazy strings."""
+    app.json_provider_class = FastJSONProvider
+    app.json = FastJSONProvider(app)
@@ -0,0 +1,101 @@
+from datetime import datetime
+from flask import current_app
+from sqlalchemy import func, literal, select, union_all
+from application.database import db
+from application.models import Chapter, Quiz, Score, Subject
+from caching import cache, tag_versions
+
+# Per-user summary (GET /api/user/summary): attempts per subject and per month.
+#
+# Both breakdowns are counted by the database in one UNION ALL round trip, and
+# the finished payload is cached per user. The attempt route and the
+# write-behind drain forget a user's entry after committing their submission;
+# catalog changes (renamed or deleted subjects, moved quizzes) are picked up
+# through the subject/chapter/quiz tag versions stored with the entry.
+
+SUMMARY_KEY = "user_summary:{user_id}"
+SUMMARY_TIMEOUT = 86400
+TAGS = ("subject", "chapter", "quiz")
+
+
+def _year_month(column):
+    """'YYYY-MM' of a timestamp column, in the database's own dialect."""
+    if db.session.get_bind().dialect.name == "sqlite":
+        return func.strftime("%Y-%m", column)
+    return func.to_char(column, "YYYY-MM")
+
+
+def compute(user_id):
+    """The summary payload, from one grouped query."""
+    by_subject = (
+        select(
+            literal("subject").label("kind"),
+            Subject.id.label("position"),
+            Subject.name.label("label"),
+            func.count(Score.id).label("attempts")
+        )
+        .select_from(Score)
+        .join(Quiz, Quiz.id == Score.quiz_id)
+        .join(Chapter, Chapter.id == Quiz.chapter_id)
+        .join(Subject, Subject.id == Chapter.subject_id)
+        .where(Score.user_id == user_id)
+        .group_by(Subject.id, Subject.name)
+    )
+    month = _year_month(Score.time_stamp_of_attempt)
+    by_month = (
+        select(
+            literal("month").label("kind"),
+            literal(0).label("position"),
+            month.label("label"),
+            func.count(Score.id).label("attempts")
+        )
+        .where(Score.user_id == user_id, Score.time_stamp_of_attempt.isnot(None))
+        .group_by(month)
+    )
+    rows = union_all(by_subject, by_month).subquery()
+    result = db.session.execute(
+        select(rows.c.kind, rows.c.label, rows.c.attempts).order_by(rows.c.kind, rows.c.position, rows.c.label)
+    ).all()
+
+    summary = {"subject_labels": [], "subject_data": [], "pie_labels": [], "pie_data": []}
+    for kind, label, attempts in result:
+        if kind == "subject":
+            summary["subject_labels"].append(label)
+            summary["subject_data"].append(attempts)
+        else:
+            # "2025-03" -> "March 2025"; months of different years stay apart
+            summary["pie_labels"].append(datetime.strptime(label, "%Y-%m").strftime("%B %Y"))
+            summary["pie_data"].append(attempts)
+    return summary
+
+
+def summary_for(user_id):
+    """The cached summary, recomputed when missing or when the catalog changed since."""
+    key = SUMMARY_KEY.format(user_id=user_id)
+    try:
+        versions = tag_versions(*TAGS)
+        cached = cache.get(key)
+    except Exception as e:
+        current_app.logger.warning(f"User summary cache unavailable: {str(e)}")
+        return compute(user_id)
+
+    if cached is not None and cached[0] == versions:
+        return cached[1]
+
+    summary = compute(user_id)
+    try:
+        cache.set(key, (versions, summary), timeout=SUMMARY_TIMEOUT)
+    except Exception as e:
+        current_app.logger.warning(f"User summary cache unavailable: {str(e)}")
+    return summary
+
+
+def forget(*user_ids):
+    """Drop the cached summaries of these users; call after committing their new scores."""
+    keys = [SUMMARY_KEY.format(user_id=user_id) for user_id in set(user_ids)]
+    if not keys:
+        return
+    try:
+        cache.delete_many(*keys)
+    except Exception as e:
+        current_app.logger.warning(f"User summary cache unavailable: {str(e)}")
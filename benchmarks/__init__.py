@@ -0,0 +1,6 @@
+"""
+Benchmarks for QuizMaster.
+
+Each module is a script, run it from the project root, e.g.
+    python -m benchmarks.monthly_report
+"""
@@ -0,0 +1,198 @@
+"""
+Synthetic data for benchmarks: subjects, chapters, quizzes, questions, users and
+historical Score rows, bulk inserted.
+
+    python -m benchmarks.datagen --database /tmp/bench.sqlite3
+    python -m benchmarks.datagen --database /tmp/bench.sqlite3 --subjects 50 --users 5000 --scores-per-user 40
+
+Rows are added to whatever the database already holds (run it twice to double
+the data); the schema and default accounts are created first if needed. Every
+synthetic user has the password "synthetic". Without --database a new file in
+the temp directory is used and its path printed. The same numbers always give
+the same data (--seed).
+"""
+import argparse
+import os
+import random
+import sys
+import tempfile
+import time
+import uuid
+from datetime import datetime, timedelta
+from itertools import islice
+
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+PASSWORD = "synthetic"
+
+DEFAULTS = {
+    "subjects": 10,
+    "chapters_per_subject": 4,
+    "quizzes_per_chapter": 5,
+    "questions_per_quiz": 10,
+    "users": 500,
+    "scores_per_user": 20,
+}
+
+
+def _next_id(model):
+    from sqlalchemy import func
+    from application.database import db
+    return (db.session.query(func.max(model.id)).scalar() or 0) + 1
+
+
+def _insert(model, rows, batch_size):
+    """executemany INSERTs of `batch_size` rows at a time; returns the number of rows."""
+    from sqlalchemy import insert
+    from application.database import db
+
+    rows = iter(rows)
+    total = 0
+    while True:
+        batch = list(islice(rows, batch_size))
+        if not batch:
+            return total
+        db.session.execute(insert(model), batch)
+        total += len(batch)
+
+
+def generate(subjects=DEFAULTS["subjects"],
+             chapters_per_subject=DEFAULTS["chapters_per_subject"],
+             quizzes_per_chapter=DEFAULTS["quizzes_per_chapter"],
+             questions_per_quiz=DEFAULTS["questions_per_quiz"],
+             users=DEFAULTS["users"],
+             scores_per_user=DEFAULTS["scores_per_user"],
+             seed=0, batch_size=5000):
+    """
+    Bulk insert the rows in one transaction (needs an app context) and rebuild
+    the score rollups. Returns the number of rows inserted per table.
+    """
+    from flask_security import hash_password
+    from application.database import db
+    from application.models import Chapter, Question, Quiz, Role, Score, Subject, User, UserRoles
+    from application.rollups import rebuild_score_rollups
+    from caching import bump_tags
+
+    rng = random.Random(seed)
+    now = datetime.now().replace(second=0, microsecond=0)
+    duration = datetime.strptime("00:30", "%H:%M").time()
+
+    subject_start = _next_id(Subject)
+    subject_rows = [
+        {"id": subject_id, "name": f"Subject {subject_id}", "description": f"Synthetic subject {subject_id}"}
+        for subject_id in range(subject_start, subject_start + subjects)
+    ]
+
+    chapter_rows = []
+    chapter_id = _next_id(Chapter)
+    for subject in subject_rows:
+        for _ in range(chapters_per_subject):
+            chapter_rows.append({
+                "id": chapter_id, "name": f"Chapter {chapter_id}", "subject_id": subject["id"],
+                "description": f"Synthetic chapter {chapter_id} of {subject['name']}",
+            })
+            chapter_id += 1
+
+    # four out of five quizzes already open (some of them long ago), the rest upcoming
+    quiz_rows = []
+    quiz_id = _next_id(Quiz)
+    for chapter in chapter_rows:
+        for _ in range(quizzes_per_chapter):
+            if rng.random() < 0.8:
+                starts = now - timedelta(days=rng.randint(0, 180), hours=rng.randint(1, 12))
+            else:
+                starts = now + timedelta(days=rng.randint(1, 30), hours=rng.randint(0, 12))
+            starts_at, ends_at = Quiz.schedule_for(datetime.combine(starts.date(), datetime.min.time()),
+                                                   starts.time(), duration)
+            quiz_rows.append({
+                "id": quiz_id, "chapter_id": chapter["id"],
+                "date_of_quiz": starts_at.replace(hour=0, minute=0), "start_time": starts_at.time(),
+                "time_duration": duration, "remarks": f"Synthetic quiz {quiz_id} on {chapter['name']}",
+                "question_count": questions_per_quiz, "starts_at": starts_at, "ends_at": ends_at,
+            })
+            quiz_id += 1
+
+    def question_rows():
+        question_id = _next_id(Question)
+        for quiz in quiz_rows:
+            for number in range(1, questions_per_quiz + 1):
+                yield {
+                    "id": question_id, "quiz_id": quiz["id"],
+                    "question_statement": f"Question {number} of quiz {quiz['id']}?",
+                    "option1": "Option A", "option2": "Option B", "option3": "Option C", "option4": "Option D",
+                    "correct_option": rng.randint(1, 4),
+                }
+                question_id += 1
+
+    # one bcrypt hash shared by every synthetic user, hashing each would take minutes
+    password = hash_password(PASSWORD)
+    user_start = _next_id(User)
+    user_rows = [
+        {"id": user_id, "email": f"bench{user_id}@quizmaster.com", "password": password,
+         "full_name": f"Bench User {user_id}", "fs_uniquifier": uuid.uuid4().hex, "active": True}
+        for user_id in range(user_start, user_start + users)
+    ]
+    role_id = Role.query.filter_by(name="user").one().id
+    user_role_rows = [{"user_id": user["id"], "role_id": role_id} for user in user_rows]
+
+    open_quizzes = [quiz for quiz in quiz_rows if quiz["starts_at"] <= now]
+
+    def score_rows():
+        if not open_quizzes:
+            return
+        for user in user_rows:
+            for quiz in rng.sample(open_quizzes, min(scores_per_user, len(open_quizzes))):
+                elapsed = (now - quiz["starts_at"]).total_seconds()
+                yield {
+                    "quiz_id": quiz["id"], "user_id": user["id"],
+                    "total_scored": rng.randint(0, questions_per_quiz),
+                    "time_stamp_of_attempt": quiz["starts_at"] + timedelta(seconds=rng.uniform(0, elapsed)),
+                }
+
+    counts = {
+        "subjects": _insert(Subject, subject_rows, batch_size),
+        "chapters": _insert(Chapter, chapter_rows, batch_size),
+        "quizzes": _insert(Quiz, quiz_rows, batch_size),
+        "questions": _insert(Question, question_rows(), batch_size),
+        "users": _insert(User, user_rows, batch_size),
+    }
+    _insert(UserRoles, user_role_rows, batch_size)
+    counts["scores"] = _insert(Score, score_rows(), batch_size)
+    rebuild_score_rollups([subject["id"] for subject in subject_rows])
+    db.session.commit()
+    bump_tags("subject", "chapter", "quiz", "question", "user")
+    return counts
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--database", help="SQLite file to fill (default: a new temp file)")
+    for name, default in DEFAULTS.items():
+        parser.add_argument(f"--{name.replace('_', '-')}", type=int, default=default)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--batch-size", type=int, default=5000, help="rows per executemany")
+    args = parser.parse_args()
+
+    database = args.database or os.path.join(tempfile.mkdtemp(prefix="quizmaster-data-"), "bench.sqlite3")
+    os.environ["FLASK_SQLALCHEMY_DATABASE_URI"] = f"sqlite:///{os.path.abspath(database)}"
+    sys.path.insert(0, PROJECT_ROOT)
+
+    from app import create_app
+    from application.commands import init_database
+
+    app = create_app()
+    with app.app_context():
+        init_database()
+        started = time.perf_counter()
+        counts = generate(**{name: getattr(args, name) for name in DEFAULTS},
+                          seed=args.seed, batch_size=args.batch_size)
+        seconds = time.perf_counter() - started
+
+    rows = sum(counts.values())
+    print(f"database: {os.path.abspath(database)}")
+    print(", ".join(f"{count} {name}" for name, count in counts.items()))
+    print(f"{rows} rows in {seconds:.1f} s ({rows / seconds:.0f} rows/s)")
+
+
+if __name__ == "__main__":
+    main()
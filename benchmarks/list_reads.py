@@ -0,0 +1,121 @@
+"""
+Latency and peak memory of the admin list reads (quizzes, questions, chapters,
+users): ORM objects from Model.query.all() against the column projections of
+the listings in application/list_queries.py.
+
+    python -m benchmarks.list_reads
+    python -m benchmarks.list_reads --rows 20000 --repeat 5
+
+A throwaway database gets --rows quizzes, questions and users (and
+--rows / 50 chapters) from benchmarks.datagen. Both paths end in the same
+serializer row types, so only the read differs. Time is the best of --repeat
+runs; memory is the peak traced by tracemalloc during one more run, in a
+fresh session each time.
+"""
+import argparse
+import gc
+import os
+import sys
+import tempfile
+import time
+import tracemalloc
+
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def _orm_reads():
+    from sqlalchemy.orm import selectinload
+    from application.models import Chapter, Question, Quiz, User
+    from application.serializers import ChapterRow, QuestionRow, QuizDetail, UserRow, rows
+
+    # what the routes did before application/list_queries.py
+    return {
+        "quizzes": lambda: rows(QuizDetail, Quiz.query.all()),
+        "questions": lambda: rows(QuestionRow, Question.query.all()),
+        "chapters": lambda: rows(ChapterRow, Chapter.query.all()),
+        "users": lambda: rows(UserRow, User.query.options(selectinload(User.roles)).all()),
+    }
+
+
+def _projected_reads():
+    from application import list_queries
+    from application.pagination import fetch
+
+    # the whole list in one read (the routes read a page of it at a time)
+    return {
+        name: lambda listing=listing: fetch(listing)[0]
+        for name, listing in (
+            ("quizzes", list_queries.QUIZZES), ("questions", list_queries.QUESTIONS),
+            ("chapters", list_queries.CHAPTERS), ("users", list_queries.USERS),
+        )
+    }
+
+
+def _measure(read, repeat):
+    """(best seconds, peak MiB, rows); the session is cleared before every run."""
+    from application.database import db
+
+    timings = []
+    for _ in range(repeat):
+        db.session.remove()
+        gc.collect()
+        started = time.perf_counter()
+        result = read()
+        timings.append(time.perf_counter() - started)
+        count = len(result)
+        del result
+
+    db.session.remove()
+    gc.collect()
+    tracemalloc.start()
+    result = read()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del result
+    db.session.remove()
+    return min(timings), peak / 2 ** 20, count
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, default=100000, help="quizzes, questions and users in the database")
+    parser.add_argument("--repeat", type=int, default=3, help="timed runs per read (the best one counts)")
+    parser.add_argument("--database", help="an existing database instead of a new synthetic one")
+    args = parser.parse_args()
+    sys.path.insert(0, PROJECT_ROOT)
+
+    from benchmarks.query_budget import _configure_environment
+
+    database = args.database or os.path.join(tempfile.mkdtemp(prefix="quizmaster-lists-"), "bench.sqlite3")
+    _configure_environment(os.path.abspath(database))
+
+    from app import create_app
+    from application.commands import init_database
+    from benchmarks import datagen
+
+    app = create_app()
+    with app.app_context():
+        init_database()
+        if not args.database:
+            print(f"filling {database} ...", file=sys.stderr)
+            datagen.generate(
+                subjects=max(args.rows // 200, 1), chapters_per_subject=4, quizzes_per_chapter=50,
+                questions_per_quiz=1, users=args.rows, scores_per_user=0
+            )
+
+        print(f"{'list':10s} {'read':18s} {'rows':>8s} {'ms':>9s} {'peak MiB':>9s}")
+        results = {}
+        for label, reads in (("ORM objects", _orm_reads()), ("column projection", _projected_reads())):
+            for name, read in reads.items():
+                seconds, peak, count = _measure(read, args.repeat)
+                results[(name, label)] = (seconds, peak)
+                print(f"{name:10s} {label:18s} {count:8d} {seconds * 1000:9.1f} {peak:9.1f}")
+
+        print()
+        for name in _projected_reads():
+            (orm_time, orm_peak), (new_time, new_peak) = results[(name, "ORM objects")], results[(name, "column projection")]
+            print(f"{name:10s} {orm_time / new_time:5.1f}x faster, {orm_peak / new_peak:5.1f}x less memory")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,190 @@
+"""
+Requests per second of /api/user/upcoming_quizzes and of quiz submission under
+each gunicorn worker model (sync, gthread, gevent).
+
+    python -m benchmarks.loadtest
+    python -m benchmarks.loadtest --models sync gevent --workers 4 --concurrency 32 --seconds 15
+    python -m benchmarks.loadtest --no-redis      # when no Redis server is running
+
+For every worker model a gunicorn server (gunicorn.conf.py, wsgi:app) is
+started on a throwaway SQLite database seeded with a synthetic catalog, and
+--concurrency client threads, each logged in as the seeded student, send
+requests over keep-alive connections for --seconds. Reported: requests per
+second, p50/p95 latency and the number of failed requests.
+"""
+import argparse
+import http.client
+import json
+import os
+import socket
+import statistics
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+MODELS = {
+    "sync": {"GUNICORN_WORKER_CLASS": "sync"},
+    "gthread": {"GUNICORN_WORKER_CLASS": "gthread", "GUNICORN_THREADS": "8"},
+    "gevent": {"GUNICORN_WORKER_CLASS": "gevent", "GUNICORN_WORKER_CONNECTIONS": "200"},
+}
+
+
+def _environment(database_path, no_redis):
+    env = dict(os.environ)
+    env["FLASK_SQLALCHEMY_DATABASE_URI"] = f"sqlite:///{database_path}"
+    env["FLASK_DEBUG"] = "false"
+    if no_redis:
+        env["FLASK_CACHE_TYPE"] = "NullCache"
+        env["FLASK_CACHE_REDIS_PORT"] = "1"
+        env["FLASK_REDIS_SOCKET_TIMEOUT"] = "0.05"
+    return env
+
+
+def prepare_database(env, scale):
+    """init-db plus a synthetic catalog; returns the id of a quiz that is open for attempts."""
+    code = (
+        "from app import create_app\n"
+        "from application.commands import init_database\n"
+        "from application.models import Quiz\n"
+        "from benchmarks.query_budget import grow\n"
+        "from datetime import datetime\n"
+        "app = create_app()\n"
+        "with app.app_context():\n"
+        "    init_database()\n"
+        f"    grow({scale})\n"
+        "    print(Quiz.query.filter(Quiz.starts_at <= datetime.now()).first().id)\n"
+    )
+    result = subprocess.run(
+        [sys.executable, "-c", code], cwd=PROJECT_ROOT, env=env, capture_output=True, text=True, check=True
+    )
+    return int(result.stdout.strip().splitlines()[-1])
+
+
+def _free_port():
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def start_server(env, model, workers, port):
+    env = dict(env, **MODELS[model])
+    env["GUNICORN_WORKERS"] = str(workers)
+    env["GUNICORN_BIND"] = f"127.0.0.1:{port}"
+    server = subprocess.Popen(
+        [sys.executable, "-m", "gunicorn", "-c", "gunicorn.conf.py", "wsgi:app"],
+        cwd=PROJECT_ROOT, env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL
+    )
+    deadline = time.monotonic() + 30
+    while time.monotonic() < deadline:
+        try:
+            socket.create_connection(("127.0.0.1", port), timeout=1).close()
+            return server
+        except OSError:
+            time.sleep(0.2)
+    server.kill()
+    raise RuntimeError(f"gunicorn ({model}) did not start")
+
+
+def login(port):
+    conn = http.client.HTTPConnection("127.0.0.1", port, timeout=30)
+    conn.request(
+        "POST", "/api/login",
+        body=json.dumps({"email": "user@quizmaster.com", "password": "user123"}),
+        headers={"Content-Type": "application/json"}
+    )
+    response = conn.getresponse()
+    response.read()
+    conn.close()
+    cookie = response.getheader("Set-Cookie")
+    if response.status != 200 or not cookie:
+        raise RuntimeError(f"login failed with HTTP {response.status}")
+    return cookie.split(";", 1)[0]
+
+
+def hammer(port, cookie, method, path, body, concurrency, seconds):
+    """Drive the route from `concurrency` threads; returns (latencies, failures)."""
+    latencies = []
+    failures = [0]
+    lock = threading.Lock()
+    stop_at = time.monotonic() + seconds
+    headers = {"Cookie": cookie, "Content-Type": "application/json"}
+
+    def client():
+        conn = http.client.HTTPConnection("127.0.0.1", port, timeout=30)
+        mine = []
+        failed = 0
+        while time.monotonic() < stop_at:
+            started = time.perf_counter()
+            try:
+                conn.request(method, path, body=body, headers=headers)
+                response = conn.getresponse()
+                response.read()
+                ok = response.status < 400
+            except (OSError, http.client.HTTPException):
+                conn.close()
+                conn = http.client.HTTPConnection("127.0.0.1", port, timeout=30)
+                ok = False
+            if ok:
+                mine.append(time.perf_counter() - started)
+            else:
+                failed += 1
+        conn.close()
+        with lock:
+            latencies.extend(mine)
+            failures[0] += failed
+
+    threads = [threading.Thread(target=client) for _ in range(concurrency)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return latencies, failures[0]
+
+
+def _report(model, name, latencies, failures, seconds):
+    if latencies:
+        ordered = sorted(latencies)
+        p50 = statistics.median(ordered) * 1000
+        p95 = ordered[int(len(ordered) * 0.95) - 1] * 1000
+    else:
+        p50 = p95 = float("nan")
+    print(f"{model:8s} {name:20s} {len(latencies) / seconds:9.1f} {p50:8.1f} {p95:8.1f} {failures:7d}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--models", nargs="+", default=list(MODELS), choices=list(MODELS))
+    parser.add_argument("--workers", type=int, default=2, help="gunicorn worker processes")
+    parser.add_argument("--concurrency", type=int, default=16, help="client threads")
+    parser.add_argument("--seconds", type=float, default=10, help="duration of each measurement")
+    parser.add_argument("--scale", type=int, default=20, help="synthetic subjects to seed")
+    parser.add_argument("--no-redis", action="store_true", help="run without a Redis server (no caching)")
+    args = parser.parse_args()
+
+    env = _environment(os.path.join(tempfile.mkdtemp(prefix="quizmaster-load-"), "load.sqlite3"), args.no_redis)
+    quiz_id = prepare_database(env, args.scale)
+
+    print(f"{args.workers} worker(s), {args.concurrency} client threads, {args.seconds:.0f} s per route")
+    print(f"{'model':8s} {'route':20s} {'req/s':>9s} {'p50 ms':>8s} {'p95 ms':>8s} {'failed':>7s}")
+    for model in args.models:
+        port = _free_port()
+        server = start_server(env, model, args.workers, port)
+        try:
+            cookie = login(port)
+            for name, method, path, body in (
+                ("upcoming_quizzes", "GET", "/api/user/upcoming_quizzes", None),
+                ("submit quiz", "POST", f"/api/user/attempt_quiz/{quiz_id}/attempt", "{}"),
+            ):
+                latencies, failures = hammer(port, cookie, method, path, body, args.concurrency, args.seconds)
+                _report(model, name, latencies, failures, args.seconds)
+        finally:
+            server.terminate()
+            server.wait(timeout=30)
+
+
+if __name__ == "__main__":
+    main()
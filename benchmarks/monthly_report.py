@@ -0,0 +1,130 @@
+"""
+Emails rendered per second for the monthly activity report, before and after
+moving it to render-once Jinja templates.
+
+    python -m benchmarks.monthly_report --users 2000 --quizzes 100
+"""
+import argparse
+import os
+import time
+from datetime import datetime, timedelta
+from types import SimpleNamespace
+
+from jinja2 import Environment, FileSystemLoader, select_autoescape
+
+from application.notifications import monthly_report_renderer
+
+TEMPLATES = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "templates")
+
+
+def legacy_render(user, new_quizzes, first_day_prev_month):
+    """The f-string body send_monthly_activity_report used to build for every user."""
+    return f"""
+        <html>
+            <head>
+                <style>
+                    body {{ font-family: Arial, sans-serif; color: #333; line-height: 1.6; }}
+                    .container {{ max-width: 600px; margin: 0 auto; padding: 20px; background-color: #f9f9f9; }}
+                    .header {{ background-color: #007bff; color: white; padding: 10px; text-align: center; }}
+                    .content {{ background-color: white; padding: 20px; border-radius: 5px; }}
+                    table {{ width: 100%; border-collapse: collapse; margin: 20px 0; }}
+                    th, td {{ border: 1px solid #ddd; padding: 8px; text-align: left; }}
+                    th {{ background-color: #f2f2f2; }}
+                    .footer {{ text-align: center; font-size: 12px; color: #777; }}
+                </style>
+            </head>
+            <body>
+                <div class="container">
+                    <div class="header">
+                        <h2>QuizMaster Monthly Activity Report</h2>
+                    </div>
+                    <div class="content">
+                        <p>Hello {user.full_name or user.email},</p>
+                        <p>Your activity report for {first_day_prev_month.strftime('%B %Y')} is here!</p>
+                        <ul>
+                            <li><strong>Account Status:</strong> Active</li>
+                            <li><strong>New Quizzes Added:</strong> {len(new_quizzes)}</li>
+                        </ul>
+                        {'<h3>New Quizzes This Month</h3>' if new_quizzes else '<p>No new quizzes were added this month.</p>'}
+                        {'' if not new_quizzes else '''
+                        <table>
+                            <tr>
+                                <th>Quiz ID</th>
+                                <th>Subject</th>
+                                <th>Chapter</th>
+                                <th>Created Date</th>
+                            </tr>
+                            ''' + ''.join(f'''
+                            <tr>
+                                <td>{q.id}</td>
+                                <td>{q.chapter.subject.name}</td>
+                                <td>{q.chapter.name}</td>
+                                <td>{q.created_at.strftime('%Y-%m-%d')}</td>
+                            </tr>
+                            ''' for q in new_quizzes) + '</table>'}
+                        <p>Explore these quizzes and test your knowledge!</p>
+                        <p><a href="http://localhost:5000/user/dashboard" style="color: #007bff;">Go to Dashboard</a></p>
+                    </div>
+                    <div class="footer">
+                        <p>QuizMaster Team &copy; 2025</p>
+                    </div>
+                </div>
+            </body>
+        </html>
+        """
+
+
+def make_data(user_count, quiz_count):
+    month_start = datetime(2025, 6, 1)
+    users = [
+        SimpleNamespace(email=f"user{i}@quizmaster.com", full_name=f"User {i}")
+        for i in range(user_count)
+    ]
+    quiz_objects = []
+    quiz_rows = []
+    for i in range(quiz_count):
+        subject = SimpleNamespace(name=f"Subject {i % 10}")
+        chapter = SimpleNamespace(name=f"Chapter {i % 40}", subject=subject)
+        created_at = month_start + timedelta(hours=i)
+        quiz_objects.append(SimpleNamespace(id=i + 1, chapter=chapter, created_at=created_at))
+        quiz_rows.append((i + 1, subject.name, chapter.name, created_at))
+    return users, quiz_objects, quiz_rows, month_start
+
+
+def run(user_count, quiz_count):
+    users, quiz_objects, quiz_rows, month_start = make_data(user_count, quiz_count)
+
+    started = time.perf_counter()
+    for user in users:
+        legacy_render(user, quiz_objects, month_start)
+    legacy_seconds = time.perf_counter() - started
+
+    env = Environment(loader=FileSystemLoader(TEMPLATES), autoescape=select_autoescape(["html"]))
+    started = time.perf_counter()
+    render_report = monthly_report_renderer(env, quiz_rows, month_start.strftime('%B %Y'))
+    for user in users:
+        render_report(user.full_name or user.email)
+    template_seconds = time.perf_counter() - started
+
+    return {
+        "users": user_count,
+        "quizzes": quiz_count,
+        "legacy_emails_per_second": round(user_count / legacy_seconds, 1),
+        "template_emails_per_second": round(user_count / template_seconds, 1),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--users", type=int, default=2000)
+    parser.add_argument("--quizzes", type=int, default=100)
+    args = parser.parse_args()
+
+    result = run(args.users, args.quizzes)
+    print(f"users={result['users']} quizzes={result['quizzes']}")
+    print(f"before (f-string per user): {result['legacy_emails_per_second']:>10} emails/s")
+    print(f"after  (render-once table): {result['template_emails_per_second']:>10} emails/s")
+
+
+if __name__ == "__main__":
+    main()
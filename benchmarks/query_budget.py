@@ -0,0 +1,407 @@
+"""
+SQL statement budget of every route, to catch N+1 regressions.
+
+Seeds a synthetic catalog in a throwaway SQLite database, calls each route
+through the Flask test client at a small and at a large scale, and checks that
+the number of statements stays within the route's budget and does not grow
+with the number of rows. Offending statements are printed grouped by the line
+of application code that ran them. Exits with status 1 on any failure.
+
+    python -m benchmarks.query_budget
+    python -m benchmarks.query_budget --small 2 --large 10 --verbose
+
+Caching is switched off (NullCache, no Redis) so the numbers are those of a
+cold request.
+"""
+import argparse
+import os
+import sys
+import tempfile
+import traceback
+from collections import Counter
+from datetime import datetime, timedelta
+
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+APPLICATION_DIR = os.path.join(PROJECT_ROOT, "application")
+
+# Statements allowed per route (or task). "Does not grow" is checked separately.
+BUDGETS = {
+    "GET /api/admin/dashboard": 6,
+    "GET /api/admin/dashboard/tree": 4,
+    "GET /api/admin/dashboard/subjects/<id>/chapters": 5,
+    "GET /api/admin/dashboard/chapters/<id>/quizzes": 5,
+    "GET /api/admin/dashboard/quizzes/<id>/questions": 5,
+    "GET /api/admin/subjects": 3,
+    "GET /api/admin/subjects/<id>": 3,
+    "GET /api/admin/chapters": 3,
+    "GET /api/admin/chapters/<id>": 3,
+    "GET /api/admin/quizzes": 3,
+    "GET /api/admin/quizzes/<id>": 3,
+    "GET /api/admin/questions": 3,
+    "GET /api/admin/questions/<id>": 3,
+    "GET /api/admin/questions?quiz_id=&after=&count=": 3,
+    "GET /api/admin/users": 4,
+    "GET /api/admin/users/<id>": 4,
+    "GET /api/admin/users?active=&count=": 4,
+    "GET /api/admin/summary": 4,
+    "GET /api/admin/metrics": 2,
+    "GET /api/admin/search/subjects": 3,
+    "GET /api/admin/search/chapters": 3,
+    "GET /api/admin/search/quizzes": 3,
+    "GET /api/admin/search/users": 4,
+    "GET /api/admin/search": 6,
+    "GET /api/admin/export_dashboard_data": 5,
+    "GET /api/user/dashboard": 4,
+    "GET /api/user/dashboard?q=": 5,
+    "GET /api/user/search": 4,
+    "GET /api/user/search?limit=1": 4,
+    "GET /api/user_view_quiz/<id>": 4,
+    "GET /api/user/upcoming_quizzes": 3,
+    "GET /api/user/attempt_quiz/<id>/attempt": 4,
+    "POST /api/user/attempt_quiz/<id>/attempt": 8,
+    "GET /api/user/score": 3,
+    "GET /api/user/score?after=": 3,
+    "GET /api/user/summary": 3,
+    "GET /api/user/rank": 5,
+    "GET /api/user/export_quiz_data": 3,
+    "POST /api/user/update_profile": 4,
+    "POST /api/admin/subjects": 4,
+    "PUT /api/admin/subjects/<id>": 5,
+    "POST /api/admin/chapters": 4,
+    "PUT /api/admin/chapters/<id>": 5,
+    "POST /api/admin/quizzes": 4,
+    "PUT /api/admin/quizzes/<id>": 7,
+    "POST /api/admin/questions": 7,
+    "POST /api/admin/questions/import": 7,
+    "PUT /api/admin/questions/<id>": 7,
+    "DELETE /api/admin/questions/<id>": 7,
+    "DELETE /api/admin/quizzes/<id>": 14,
+    "DELETE /api/admin/chapters/<id>": 10,
+    "DELETE /api/admin/subjects/<id>": 7,
+    "PUT /api/admin/users/<id>": 5,
+    "DELETE /api/admin/users/<id>": 16,
+    "task send_monthly_activity_report": 4,
+    "task send_reminder_chunk": 3,
+}
+
+# Routes that are deliberately not measured here (Flask-Security's own views are skipped too).
+NOT_MEASURED = {
+    "/", "/api/login", "/api/register", "/api/logout",
+}
+
+
+def _configure_environment(database_path):
+    """Must run before create_app(): it reads FLASK_* overrides from the environment."""
+    os.environ["FLASK_SQLALCHEMY_DATABASE_URI"] = f"sqlite:///{database_path}"
+    os.environ["FLASK_CACHE_TYPE"] = "NullCache"
+    os.environ["FLASK_CACHE_REDIS_PORT"] = "1"      # nothing listens there: Redis helpers fall back at once
+    os.environ["FLASK_REDIS_SOCKET_TIMEOUT"] = "0.05"
+    os.environ["FLASK_MAIL_SUPPRESS_SEND"] = "true"
+    os.environ["FLASK_DEBUG"] = "false"
+
+
+class StatementLog:
+    """Statements run on the engine, with the application frame that issued them."""
+
+    def __init__(self):
+        self.entries = []
+        self.active = False
+
+    def before_cursor_execute(self, conn, cursor, statement, parameters, context, executemany):
+        if self.active:
+            self.entries.append((_call_site(), " ".join(statement.split())))
+
+    def take(self):
+        entries, self.entries = self.entries, []
+        return entries
+
+
+def _call_site():
+    for frame in reversed(traceback.extract_stack()[:-2]):
+        if frame.filename.startswith(APPLICATION_DIR) and not frame.filename.endswith("metrics.py"):
+            return f"{os.path.relpath(frame.filename, PROJECT_ROOT)}:{frame.lineno} in {frame.name}"
+    return "framework (login, session, security)"
+
+
+def grow(scale):
+    """Add rows until the catalog has `scale` subjects (2 chapters, 2 quizzes, 3 questions each)."""
+    from application.database import db
+    from application.models import Chapter, Question, Quiz, Score, Subject
+    from application.rollups import rebuild_score_rollups
+    from flask import current_app
+
+    datastore = current_app.security.datastore
+    existing = Subject.query.count()
+    now = datetime.now()
+    for index in range(existing, scale):
+        subject = Subject(name=f"Subject {index}", description="synthetic")
+        db.session.add(subject)
+        for chapter_index in range(2):
+            chapter = Chapter(name=f"Chapter {index}.{chapter_index}", description="synthetic", subject=subject)
+            db.session.add(chapter)
+            for quiz_index in range(2):
+                # half of them upcoming, half already open
+                day = now + timedelta(days=1 + index) if quiz_index else now - timedelta(days=1 + index)
+                quiz = Quiz(
+                    chapter=chapter,
+                    date_of_quiz=day.replace(hour=0, minute=0, second=0, microsecond=0),
+                    start_time=day.time().replace(second=0, microsecond=0),
+                    time_duration=datetime.strptime("00:30", "%H:%M").time(),
+                    remarks=f"synthetic quiz {index}.{chapter_index}.{quiz_index}",
+                    question_count=3,
+                )
+                quiz.refresh_schedule()
+                db.session.add(quiz)
+                for question_index in range(3):
+                    db.session.add(Question(
+                        quiz=quiz,
+                        question_statement=f"Question {question_index}?",
+                        option1="a", option2="b", option3="c", option4="d",
+                        correct_option=1 + question_index % 4,
+                    ))
+
+        for user_index in range(2):
+            user = datastore.create_user(
+                email=f"student{index}.{user_index}@quizmaster.com",
+                password="synthetic",
+                full_name=f"Student {index}.{user_index}",
+                roles=["user"],
+                active=True,
+            )
+            for quiz in subject.chapters[0].quizzes:
+                db.session.add(Score(quiz=quiz, user=user, total_scored=user_index, time_stamp_of_attempt=now))
+    db.session.flush()
+
+    # the seeded student attempts a few quizzes of every scale step too
+    student = datastore.find_user(email="user@quizmaster.com")
+    for quiz in Quiz.query.order_by(Quiz.id.desc()).limit(2):
+        db.session.add(Score(quiz_id=quiz.id, user_id=student.id, total_scored=1, time_stamp_of_attempt=now))
+    rebuild_score_rollups()
+    db.session.commit()
+
+
+def _first_id(model, *criteria):
+    from application.database import db
+    return db.session.query(model.id).filter(*criteria).order_by(model.id).limit(1).scalar()
+
+
+def _latest_score(model, user_id):
+    """Sort key (time stamp, id) of a user's latest attempt: the cursor of a second score page."""
+    from application.database import db
+    return tuple(
+        db.session.query(model.time_stamp_of_attempt, model.id).filter(model.user_id == user_id)
+        .order_by(model.time_stamp_of_attempt.desc(), model.id.desc()).first()
+    )
+
+
+def _checks():
+    """(name, who, method, url, json) for every measured route; read routes first, then writes."""
+    from application.models import Chapter, Question, Quiz, Score, Subject, User
+    from application.pagination import encode_cursor
+
+    subject_id = _first_id(Subject)
+    chapter_id = _first_id(Chapter)
+    quiz_id = _first_id(Quiz)
+    question_id = _first_id(Question)
+    student_id = _first_id(User, User.email == "user@quizmaster.com")
+    open_quiz_id = _first_id(Quiz, Quiz.starts_at <= datetime.now())
+    stamp = datetime.now().strftime("%H%M%S%f")
+    last_score = _latest_score(Score, student_id)
+
+    checks = [
+        ("GET /api/admin/dashboard", "admin", "GET", "/api/admin/dashboard", None),
+        ("GET /api/admin/dashboard/tree", "admin", "GET", "/api/admin/dashboard/tree", None),
+        ("GET /api/admin/dashboard/subjects/<id>/chapters", "admin", "GET", f"/api/admin/dashboard/subjects/{subject_id}/chapters", None),
+        ("GET /api/admin/dashboard/chapters/<id>/quizzes", "admin", "GET", f"/api/admin/dashboard/chapters/{chapter_id}/quizzes", None),
+        ("GET /api/admin/dashboard/quizzes/<id>/questions", "admin", "GET", f"/api/admin/dashboard/quizzes/{quiz_id}/questions", None),
+        ("GET /api/admin/subjects", "admin", "GET", "/api/admin/subjects", None),
+        ("GET /api/admin/subjects/<id>", "admin", "GET", f"/api/admin/subjects/{subject_id}", None),
+        ("GET /api/admin/chapters", "admin", "GET", "/api/admin/chapters", None),
+        ("GET /api/admin/chapters/<id>", "admin", "GET", f"/api/admin/chapters/{chapter_id}", None),
+        ("GET /api/admin/quizzes", "admin", "GET", "/api/admin/quizzes", None),
+        ("GET /api/admin/quizzes/<id>", "admin", "GET", f"/api/admin/quizzes/{quiz_id}", None),
+        ("GET /api/admin/questions", "admin", "GET", "/api/admin/questions", None),
+        ("GET /api/admin/questions/<id>", "admin", "GET", f"/api/admin/questions/{question_id}", None),
+        ("GET /api/admin/questions?quiz_id=&after=&count=", "admin", "GET",
+         f"/api/admin/questions?quiz_id={quiz_id}&after={encode_cursor([question_id])}&count=1", None),
+        ("GET /api/admin/users", "admin", "GET", "/api/admin/users", None),
+        ("GET /api/admin/users/<id>", "admin", "GET", f"/api/admin/users/{student_id}", None),
+        ("GET /api/admin/users?active=&count=", "admin", "GET", "/api/admin/users?active=true&count=1", None),
+        ("GET /api/admin/summary", "admin", "GET", "/api/admin/summary", None),
+        ("GET /api/admin/metrics", "admin", "GET", "/api/admin/metrics", None),
+        ("GET /api/admin/search/subjects", "admin", "GET", "/api/admin/search/subjects?q=Subject", None),
+        ("GET /api/admin/search/chapters", "admin", "GET", "/api/admin/search/chapters?q=Chapter", None),
+        ("GET /api/admin/search/quizzes", "admin", "GET", f"/api/admin/search/quizzes?quiz_id={quiz_id}", None),
+        ("GET /api/admin/search/users", "admin", "GET", "/api/admin/search/users?q=Student", None),
+        ("GET /api/admin/search", "admin", "GET", "/api/admin/search?q=synthetic", None),
+        ("GET /api/admin/export_dashboard_data", "admin", "GET", "/api/admin/export_dashboard_data", None),
+        ("GET /api/user/dashboard", "user", "GET", "/api/user/dashboard", None),
+        ("GET /api/user/dashboard?q=", "user", "GET", "/api/user/dashboard?q=synthetic", None),
+        ("GET /api/user/search", "user", "GET", "/api/user/search?q=synthetic", None),
+        ("GET /api/user/search?limit=1", "user", "GET", "/api/user/search?q=synthetic&limit=1", None),
+        ("GET /api/user_view_quiz/<id>", "user", "GET", f"/api/user_view_quiz/{quiz_id}", None),
+        ("GET /api/user/upcoming_quizzes", "user", "GET", "/api/user/upcoming_quizzes", None),
+        ("GET /api/user/attempt_quiz/<id>/attempt", "user", "GET", f"/api/user/attempt_quiz/{open_quiz_id}/attempt", None),
+        ("POST /api/user/attempt_quiz/<id>/attempt", "user", "POST", f"/api/user/attempt_quiz/{open_quiz_id}/attempt", {}),
+        ("GET /api/user/score", "user", "GET", "/api/user/score", None),
+        ("GET /api/user/score?after=", "user", "GET", f"/api/user/score?after={encode_cursor(last_score)}", None),
+        ("GET /api/user/summary", "user", "GET", "/api/user/summary", None),
+        ("GET /api/user/rank", "user", "GET", "/api/user/rank", None),
+        ("GET /api/user/export_quiz_data", "user", "GET", "/api/user/export_quiz_data", None),
+        ("POST /api/user/update_profile", "user", "POST", "/api/user/update_profile", {"full_name": "Seeded Student"}),
+    ]
+
+    # writes: each scale creates, edits and deletes its own rows
+    created = {}
+
+    def create(key, url, payload):
+        return ("POST " + url, "admin", "POST", url, payload, key)
+
+    checks += [
+        create("subject", "/api/admin/subjects", {"name": f"Budget subject {stamp}"}),
+        ("PUT /api/admin/subjects/<id>", "admin", "PUT", lambda: f"/api/admin/subjects/{created['subject']}", {"description": "edited"}),
+        create("chapter", "/api/admin/chapters", lambda: {"name": f"Budget chapter {stamp}", "subject_id": created["subject"]}),
+        ("PUT /api/admin/chapters/<id>", "admin", "PUT", lambda: f"/api/admin/chapters/{created['chapter']}", {"description": "edited"}),
+        create("quiz", "/api/admin/quizzes", lambda: {"chapter_id": created["chapter"], "start_time": "09:00", "time_duration": "00:10"}),
+        ("PUT /api/admin/quizzes/<id>", "admin", "PUT", lambda: f"/api/admin/quizzes/{created['quiz']}", {"remarks": "edited"}),
+        create("question", "/api/admin/questions", lambda: {"quiz_id": created["quiz"], "question_statement": "Budget?", "correct_option": 1}),
+        ("POST /api/admin/questions/import", "admin", "POST", "/api/admin/questions/import",
+         lambda: {"quiz_id": created["quiz"], "questions": [
+             {"question_statement": f"Imported {n}?", "option1": "a", "option2": "b", "correct_option": 2} for n in range(20)
+         ]}),
+        ("PUT /api/admin/questions/<id>", "admin", "PUT", lambda: f"/api/admin/questions/{created['question']}", {"option1": "edited"}),
+        ("DELETE /api/admin/questions/<id>", "admin", "DELETE", lambda: f"/api/admin/questions/{created['question']}", None),
+        ("DELETE /api/admin/quizzes/<id>", "admin", "DELETE", lambda: f"/api/admin/quizzes/{created['quiz']}", None),
+        ("DELETE /api/admin/chapters/<id>", "admin", "DELETE", lambda: f"/api/admin/chapters/{created['chapter']}", None),
+        ("DELETE /api/admin/subjects/<id>", "admin", "DELETE", lambda: f"/api/admin/subjects/{created['subject']}", None),
+        ("PUT /api/admin/users/<id>", "admin", "PUT", f"/api/admin/users/{student_id}", {"qualification": "edited"}),
+        ("DELETE /api/admin/users/<id>", "admin", "DELETE",
+         lambda: f"/api/admin/users/{_first_id(User, User.email.like('student%'))}", None),
+    ]
+    return checks, created
+
+
+def _tasks():
+    from application import routes
+    return [
+        ("task send_monthly_activity_report", lambda: routes.send_monthly_activity_report.run()),
+        ("task send_reminder_chunk", lambda: routes.send_reminder_chunk.run(0, None, ["- Quiz ID 1 in Subject 0"])),
+    ]
+
+
+def measure(clients, log):
+    """Statement log of every route and task at the current scale, as {name: [(call site, statement)]}."""
+    checks, created = _checks()
+    results = {}
+    for check in checks:
+        name, who, method, url, payload = check[:5]
+        url = url() if callable(url) else url
+        payload = payload() if callable(payload) else payload
+        # a fresh app context per call, so nothing cached on g (e.g. the logged in user) leaks between calls
+        with clients[who].application.app_context():
+            log.active = True
+            response = clients[who].open(url, method=method, json=payload)
+            response.get_data()  # run streamed responses to the end
+            log.active = False
+        results[name] = (response.status_code, log.take())
+        if len(check) > 5:
+            if response.status_code != 201:
+                raise RuntimeError(f"{name} failed with HTTP {response.status_code}: {response.get_data(as_text=True)[:300]}")
+            created[check[5]] = response.get_json()["id"]
+
+    for name, run in _tasks():
+        log.active = True
+        run()
+        log.active = False
+        results[name] = (200, log.take())
+    return results
+
+
+def _unmeasured_routes(app):
+    measured = {name.split(" ", 1)[1].split("?")[0] for name in BUDGETS if not name.startswith("task ")}
+    missing = []
+    for rule in app.url_map.iter_rules():
+        if rule.endpoint == "static" or rule.endpoint.startswith("security.") or rule.rule in NOT_MEASURED:
+            continue
+        path = rule.rule
+        for argument in rule.arguments:
+            path = path.replace(f"<int:{argument}>", "<id>")
+        if path not in measured:
+            missing.append(rule.rule)
+    return sorted(set(missing))
+
+
+def _report_statements(entries):
+    by_site = Counter(site for site, _ in entries)
+    sample = {}
+    for site, statement in entries:
+        sample.setdefault(site, statement)
+    for site, count in by_site.most_common():
+        print(f"        {count:4d} x {site}")
+        print(f"               {sample[site][:150]}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--small", type=int, default=2, help="subjects in the small dataset")
+    parser.add_argument("--large", type=int, default=8, help="subjects in the large dataset")
+    parser.add_argument("--verbose", action="store_true", help="print the statements of every route")
+    args = parser.parse_args()
+
+    workdir = tempfile.mkdtemp(prefix="quizmaster-budget-")
+    _configure_environment(os.path.join(workdir, "budget.sqlite3"))
+    sys.path.insert(0, PROJECT_ROOT)
+
+    from sqlalchemy import event
+    from application.commands import init_database
+    from application.database import db
+    from app import create_app
+
+    app = create_app()
+    with app.app_context():
+        init_database()
+        log = StatementLog()
+        event.listen(db.engine, "before_cursor_execute", log.before_cursor_execute)
+
+        clients = {"admin": app.test_client(), "user": app.test_client()}
+        clients["admin"].post("/api/login", json={"email": "admin@quizmaster.com", "password": "admin123"})
+        clients["user"].post("/api/login", json={"email": "user@quizmaster.com", "password": "user123"})
+
+        grow(args.small)
+        small = measure(clients, log)
+        grow(args.large)
+        large = measure(clients, log)
+
+    failures = 0
+    print(f"{'route':55s} {'small':>6s} {'large':>6s} {'budget':>7s}")
+    for name, budget in BUDGETS.items():
+        if name not in large:
+            print(f"{name:55s} not measured")
+            failures += 1
+            continue
+        small_status, small_entries = small[name]
+        large_status, large_entries = large[name]
+        problems = []
+        if large_status >= 400 or small_status >= 400:
+            problems.append(f"HTTP {small_status}/{large_status}")
+        if len(large_entries) > budget:
+            problems.append("over budget")
+        if len(large_entries) > len(small_entries):
+            problems.append("grows with rows")
+        print(f"{name:55s} {len(small_entries):6d} {len(large_entries):6d} {budget:7d}  {', '.join(problems)}")
+        if problems:
+            failures += 1
+            _report_statements(large_entries)
+        elif args.verbose:
+            _report_statements(large_entries)
+
+    for rule in _unmeasured_routes(app):
+        print(f"{rule:55s} no budget")
+        failures += 1
+
+    print(f"\n{failures} failure(s)" if failures else "\nall routes within budget")
+    sys.exit(1 if failures else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,308 @@
+"""
+Latency (p50/p95/p99) and throughput of the main user journeys, per route, as JSON.
+
+    python -m benchmarks.scenarios --output before.json
+    python -m benchmarks.scenarios --output after.json --baseline before.json
+    python -m benchmarks.scenarios --url http://127.0.0.1:8000 --concurrency 8
+
+By default the routes are called in-process through the Flask test client, on
+a throwaway database filled by benchmarks.datagen (or on --database, an
+existing one). With --url they are sent over HTTP to a running server, e.g.
+gunicorn started with FLASK_SQLALCHEMY_DATABASE_URI pointing at a database
+filled by benchmarks.datagen. Each route gets --requests requests from
+--concurrency clients (each logged in once, as the default user and admin).
+
+Without --redis (test client only) caching is switched off, so every request
+does its full work. The JSON has the commit it was measured on; --baseline
+prints the change in p95 and throughput against an earlier result.
+"""
+import argparse
+import http.client
+import json
+import math
+import os
+import random
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from datetime import datetime
+from urllib.parse import urlsplit
+
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+ADMIN = {"email": "admin@quizmaster.com", "password": "admin123"}
+STUDENT = {"email": "user@quizmaster.com", "password": "user123"}
+
+
+class TestClientTransport:
+    """Requests through app.test_client(), each in its own app context."""
+
+    def __init__(self, app):
+        self.app = app
+        self.client = app.test_client()
+
+    def request(self, method, path, payload=None):
+        with self.app.app_context():
+            response = self.client.open(path, method=method, json=payload)
+            return response.status_code, response.get_data()
+
+
+class HttpTransport:
+    """Requests over one keep-alive HTTP connection, with the session cookie."""
+
+    def __init__(self, base_url):
+        parts = urlsplit(base_url)
+        self.host, self.port = parts.hostname, parts.port or 80
+        self.connection = http.client.HTTPConnection(self.host, self.port, timeout=60)
+        self.cookie = None
+
+    def request(self, method, path, payload=None):
+        headers = {"Content-Type": "application/json"}
+        if self.cookie:
+            headers["Cookie"] = self.cookie
+        body = json.dumps(payload) if payload is not None else None
+        try:
+            self.connection.request(method, path, body=body, headers=headers)
+            response = self.connection.getresponse()
+            data = response.read()
+        except (OSError, http.client.HTTPException):
+            self.connection.close()
+            self.connection = http.client.HTTPConnection(self.host, self.port, timeout=60)
+            return 599, b""
+        cookie = response.getheader("Set-Cookie")
+        if cookie:
+            self.cookie = cookie.split(";", 1)[0]
+        return response.status, data
+
+
+def _login(transport, account):
+    status, _ = transport.request("POST", "/api/login", account)
+    if status != 200:
+        raise RuntimeError(f"login as {account['email']} failed with HTTP {status}")
+    return transport
+
+
+def _open_quizzes(transport, limit=20):
+    """{quiz id: [question ids]} of quizzes that can be attempted now."""
+    status, body = transport.request("GET", "/api/user/dashboard")
+    if status != 200:
+        raise RuntimeError(f"GET /api/user/dashboard failed with HTTP {status}")
+    now = datetime.now().strftime("%Y-%m-%d %H:%M")
+    quizzes = {}
+    for quiz in json.loads(body)["all_quizzes"]:
+        if quiz["date_of_quiz"] and quiz["start_time"] and f"{quiz['date_of_quiz']} {quiz['start_time']}" <= now:
+            status, body = transport.request("GET", f"/api/user/attempt_quiz/{quiz['id']}/attempt")
+            if status == 200:
+                quizzes[quiz["id"]] = [question["id"] for question in json.loads(body)["questions"]]
+            if len(quizzes) == limit:
+                break
+    if not quizzes:
+        raise RuntimeError("no quiz is open for attempts, fill the database with benchmarks.datagen first")
+    return quizzes
+
+
+def _scenarios(quizzes):
+    """(name, account, request builder); a builder takes a Random and returns (method, path, payload)."""
+    quiz_ids = sorted(quizzes)
+
+    def answers(rng, quiz_id):
+        return {f"question_{question_id}": rng.randint(1, 4) for question_id in quizzes[quiz_id]}
+
+    def attempt_post(rng):
+        quiz_id = rng.choice(quiz_ids)
+        return "POST", f"/api/user/attempt_quiz/{quiz_id}/attempt", answers(rng, quiz_id)
+
+    return [
+        ("POST /api/login", None, lambda rng: ("POST", "/api/login", STUDENT)),
+        ("GET /api/user/dashboard", STUDENT, lambda rng: ("GET", "/api/user/dashboard", None)),
+        ("GET /api/user/upcoming_quizzes", STUDENT, lambda rng: ("GET", "/api/user/upcoming_quizzes", None)),
+        ("GET /api/user/attempt_quiz/<id>/attempt", STUDENT,
+         lambda rng: ("GET", f"/api/user/attempt_quiz/{rng.choice(quiz_ids)}/attempt", None)),
+        ("POST /api/user/attempt_quiz/<id>/attempt", STUDENT, attempt_post),
+        ("GET /api/user/summary", STUDENT, lambda rng: ("GET", "/api/user/summary", None)),
+        ("GET /api/user/export_quiz_data", STUDENT, lambda rng: ("GET", "/api/user/export_quiz_data", None)),
+        ("GET /api/admin/summary", ADMIN, lambda rng: ("GET", "/api/admin/summary", None)),
+        ("GET /api/admin/export_dashboard_data", ADMIN,
+         lambda rng: ("GET", "/api/admin/export_dashboard_data", None)),
+    ]
+
+
+def percentile(ordered, p):
+    """Nearest-rank percentile of an ascending list."""
+    if not ordered:
+        return None
+    return ordered[max(math.ceil(p / 100 * len(ordered)) - 1, 0)]
+
+
+def run_scenario(new_transport, clients, account, build, requests, warmup):
+    """Send `requests` requests spread over the clients; returns the route's statistics."""
+    latencies = []
+    errors = [0]
+    lock = threading.Lock()
+
+    def drive(index, transport, count):
+        rng = random.Random(index)
+        mine, failed = [], 0
+        for _ in range(count):
+            method, path, payload = build(rng)
+            # logins get a fresh client, the others reuse the logged-in session
+            target = transport if account else new_transport()
+            started = time.perf_counter()
+            status, _ = target.request(method, path, payload)
+            elapsed = time.perf_counter() - started
+            if status >= 400:
+                failed += 1
+            else:
+                mine.append(elapsed)
+        with lock:
+            latencies.extend(mine)
+            errors[0] += failed
+
+    transports = [client[account["email"]] if account else None for client in clients]
+    for index, transport in enumerate(transports):
+        drive(index, transport, warmup)
+    latencies.clear()
+    errors[0] = 0
+
+    share, extra = divmod(requests, len(transports))
+    threads = [
+        threading.Thread(target=drive, args=(index, transport, share + (index < extra)))
+        for index, transport in enumerate(transports)
+    ]
+    started = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    elapsed = time.perf_counter() - started
+
+    ordered = sorted(latencies)
+
+    def ms(value):
+        return round(value * 1000, 2) if value is not None else None
+
+    return {
+        "requests": requests,
+        "errors": errors[0],
+        "p50_ms": ms(percentile(ordered, 50)),
+        "p95_ms": ms(percentile(ordered, 95)),
+        "p99_ms": ms(percentile(ordered, 99)),
+        "throughput_rps": round(len(ordered) / elapsed, 1) if elapsed else None,
+    }
+
+
+def _commit():
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], cwd=PROJECT_ROOT, capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def _test_client_app(args):
+    """The app on --database, or on a new database filled by benchmarks.datagen."""
+    from benchmarks.query_budget import _configure_environment
+
+    database = args.database or os.path.join(tempfile.mkdtemp(prefix="quizmaster-scenarios-"), "bench.sqlite3")
+    if args.redis:
+        os.environ["FLASK_SQLALCHEMY_DATABASE_URI"] = f"sqlite:///{os.path.abspath(database)}"
+        os.environ["FLASK_MAIL_SUPPRESS_SEND"] = "true"
+    else:
+        _configure_environment(os.path.abspath(database))
+    sys.path.insert(0, PROJECT_ROOT)
+
+    from app import create_app
+    from application.commands import init_database
+    from benchmarks import datagen
+
+    app = create_app()
+    with app.app_context():
+        init_database()
+        dataset = None
+        if not args.database:
+            dataset = datagen.generate(subjects=args.subjects, users=args.users, seed=args.seed)
+    return app, dataset
+
+
+def compare(result, baseline):
+    print(f"{'route':45s} {'p95 ms':>18s} {'req/s':>18s}", file=sys.stderr)
+    for name, now in result["routes"].items():
+        before = baseline["routes"].get(name)
+        if not before or before["p95_ms"] is None or now["p95_ms"] is None:
+            print(f"{name:45s} {'no baseline':>17s}", file=sys.stderr)
+            continue
+        p95_change = (now["p95_ms"] - before["p95_ms"]) / before["p95_ms"] * 100 if before["p95_ms"] else 0
+        rps_change = (
+            (now["throughput_rps"] - before["throughput_rps"]) / before["throughput_rps"] * 100
+            if before["throughput_rps"] else 0
+        )
+        print(
+            f"{name:45s} {now['p95_ms']:8.1f} ({p95_change:+5.0f}%) {now['throughput_rps']:8.1f} ({rps_change:+5.0f}%)",
+            file=sys.stderr
+        )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--url", help="base URL of a running server (default: in-process test client)")
+    parser.add_argument("--database", help="test client: an existing database instead of a new synthetic one")
+    parser.add_argument("--redis", action="store_true", help="test client: keep the Redis cache configuration")
+    parser.add_argument("--requests", type=int, default=200, help="measured requests per route")
+    parser.add_argument("--warmup", type=int, default=5, help="unmeasured requests per route and client first")
+    parser.add_argument("--concurrency", type=int, default=1, help="concurrent clients")
+    parser.add_argument("--subjects", type=int, default=10, help="synthetic data: subjects (see benchmarks.datagen)")
+    parser.add_argument("--users", type=int, default=500, help="synthetic data: users")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--routes", nargs="+", help="only the routes containing one of these strings")
+    parser.add_argument("--output", help="write the JSON here instead of stdout")
+    parser.add_argument("--baseline", help="an earlier JSON result to compare against")
+    args = parser.parse_args()
+
+    if args.url:
+        def new_transport():
+            return HttpTransport(args.url)
+        dataset = None
+    else:
+        app, dataset = _test_client_app(args)
+
+        def new_transport():
+            return TestClientTransport(app)
+
+    clients = [
+        {account["email"]: _login(new_transport(), account) for account in (STUDENT, ADMIN)}
+        for _ in range(args.concurrency)
+    ]
+    scenarios = _scenarios(_open_quizzes(clients[0][STUDENT["email"]]))
+    if args.routes:
+        scenarios = [scenario for scenario in scenarios if any(part in scenario[0] for part in args.routes)]
+
+    routes = {}
+    for name, account, build in scenarios:
+        routes[name] = run_scenario(new_transport, clients, account, build, args.requests, args.warmup)
+        print(f"{name:45s} p95 {routes[name]['p95_ms']} ms, {routes[name]['throughput_rps']} req/s", file=sys.stderr)
+
+    result = {
+        "commit": _commit(),
+        "measured_at": datetime.now().isoformat(timespec="seconds"),
+        "target": args.url or "test client",
+        "concurrency": args.concurrency,
+        "dataset": dataset,
+        "routes": routes,
+    }
+    text = json.dumps(result, indent=2)
+    if args.output:
+        with open(args.output, "w") as handle:
+            handle.write(text + "\n")
+    else:
+        print(text)
+
+    if args.baseline:
+        with open(args.baseline) as handle:
+            compare(result, json.load(handle))
+
+
+if __name__ == "__main__":
+    main()
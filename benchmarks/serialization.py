@@ -0,0 +1,184 @@
+"""
+Serialization time per 10k rows: the old hand-built dicts against the row
+types of application/serializers.py, written by the stdlib json module and by
+orjson (when installed).
+
+    python -m benchmarks.serialization
+    python -m benchmarks.serialization --rows 50000 --repeat 7
+
+The rows are transient model objects (no database), shaped like the largest
+lists the app sends: the user dashboard's quizzes with their chapter and
+subject, the admin question list and the admin user list. Each figure is the
+best of --repeat runs of building the rows and writing the JSON response body.
+"""
+import argparse
+import os
+import sys
+import time
+from datetime import datetime, timedelta
+
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def _models(count):
+    from application.models import Chapter, Question, Quiz, Role, Subject, User
+
+    subjects = [Subject(id=number, name=f"Subject {number}") for number in range(1, 11)]
+    chapters = [
+        Chapter(id=number, name=f"Chapter {number}", subject=subjects[number % len(subjects)])
+        for number in range(1, 41)
+    ]
+    started = datetime(2025, 1, 1, 9, 0)
+    duration = datetime.strptime("00:30", "%H:%M").time()
+    quizzes = []
+    for number in range(count):
+        starts = started + timedelta(days=number % 180, hours=number % 8)
+        quizzes.append(Quiz(
+            id=number + 1, chapter=chapters[number % len(chapters)], chapter_id=chapters[number % len(chapters)].id,
+            date_of_quiz=starts.replace(hour=0), start_time=starts.time(), time_duration=duration,
+            remarks=f"Synthetic quiz {number + 1}", created_at=started + timedelta(seconds=number * 37)
+        ))
+    questions = [
+        Question(
+            id=number + 1, quiz_id=number // 10 + 1, question_statement=f"Question {number + 1}?",
+            option1="Option A", option2="Option B", option3="Option C", option4="Option D",
+            correct_option=number % 4 + 1
+        )
+        for number in range(count)
+    ]
+    role = Role(name="user")
+    users = [
+        User(
+            id=number + 1, email=f"bench{number + 1}@quizmaster.com", full_name=f"Bench User {number + 1}",
+            qualification="B.Sc", dob="2000-01-01", active=True, roles=[role]
+        )
+        for number in range(count)
+    ]
+    return quizzes, questions, users
+
+
+# the dicts as the routes built them before application/serializers.py
+
+def _legacy_quiz(q):
+    return {
+        "id": q.id,
+        "chapter_id": q.chapter_id,
+        "date_of_quiz": q.date_of_quiz.strftime('%Y-%m-%d') if q.date_of_quiz else None,
+        "start_time": q.start_time.strftime('%H:%M') if q.start_time else None,
+        "time_duration": q.time_duration.strftime('%H:%M') if q.time_duration else None,
+        "remarks": q.remarks,
+        "chapter": {
+            "id": q.chapter.id,
+            "name": q.chapter.name,
+            "subject": {
+                "id": q.chapter.subject.id,
+                "name": q.chapter.subject.name
+            } if q.chapter.subject else None
+        }
+    }
+
+
+def _legacy_question(item):
+    return {
+        "id": item.id,
+        "quiz_id": item.quiz_id,
+        "question_statement": item.question_statement,
+        "option1": item.option1,
+        "option2": item.option2,
+        "option3": item.option3,
+        "option4": item.option4,
+        "correct_option": item.correct_option
+    }
+
+
+def _legacy_user(user):
+    return {
+        "id": user.id,
+        "email": user.email,
+        "full_name": user.full_name,
+        "qualification": user.qualification,
+        "dob": user.dob,
+        "active": user.active,
+        "roles": [role.name for role in user.roles]
+    }
+
+
+def _best(run, repeat):
+    timings = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        run()
+        timings.append(time.perf_counter() - started)
+    return min(timings)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, default=10000, help="rows per list")
+    parser.add_argument("--repeat", type=int, default=5, help="runs per measurement (the best one counts)")
+    args = parser.parse_args()
+    sys.path.insert(0, PROJECT_ROOT)
+
+    from flask import Flask
+    from flask.json.provider import DefaultJSONProvider
+    from application import serializers
+    from application.serializers import FastJSONProvider, QuestionRow, QuizWithChapter, UserRow, rows
+
+    app = Flask(__name__)
+    stdlib_provider = DefaultJSONProvider(app)
+    fast_provider = FastJSONProvider(app)
+    # the indented responses of debug mode (localdevelopmentConfig has DEBUG = True)
+    debug_app = Flask(__name__)
+    debug_app.debug = True
+    debug_stdlib_provider = DefaultJSONProvider(debug_app)
+    debug_provider = FastJSONProvider(debug_app)
+
+    def debug_response(provider):
+        def respond(obj):
+            with debug_app.app_context():
+                return provider.response(obj).get_data()
+        return respond
+    orjson = serializers.orjson
+
+    quizzes, questions, users = _models(args.rows)
+    lists = [
+        ("quizzes with chapter", quizzes, _legacy_quiz, QuizWithChapter),
+        ("questions", questions, _legacy_question, QuestionRow),
+        ("users", users, _legacy_user, UserRow),
+    ]
+
+    def with_orjson(enabled, run):
+        serializers.orjson = orjson if enabled else None
+        try:
+            return run()
+        finally:
+            serializers.orjson = orjson
+
+    scale = 10000 / args.rows
+    print(f"ms per 10k rows (best of {args.repeat}, {args.rows} rows per list)")
+    print(f"{'list':22s} {'variant':28s} {'build':>8s} {'json':>8s} {'total':>8s}")
+    for name, objects, legacy, row_type in lists:
+        variants = [
+            ("dicts + stdlib json", lambda: [legacy(obj) for obj in objects], stdlib_provider.dumps, False),
+            ("row types + stdlib json", lambda: rows(row_type, objects), fast_provider.dumps, False),
+            ("dicts + stdlib json, debug", lambda: [legacy(obj) for obj in objects], debug_response(debug_stdlib_provider), False),
+        ]
+        if orjson is not None:
+            variants.append(("row types + orjson", lambda: rows(row_type, objects), fast_provider.dumps, True))
+            variants.append(("row types + orjson, debug", lambda: rows(row_type, objects), debug_response(debug_provider), True))
+        for variant, build, dump, use_orjson in variants:
+            serializers.format_date.cache_clear()
+            serializers.format_time.cache_clear()
+            built = build()
+            build_time = _best(build, args.repeat)
+            dump_time = with_orjson(use_orjson, lambda: _best(lambda: dump({"rows": built}), args.repeat))
+            print(
+                f"{name:22s} {variant:28s} {build_time * 1000 * scale:8.1f} {dump_time * 1000 * scale:8.1f} "
+                f"{(build_time + dump_time) * 1000 * scale:8.1f}"
+            )
+    if orjson is None:
+        print("orjson is not installed: only the stdlib json variants were measured")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,126 @@
+"""
+Throughput of a mixed read / quiz-submission load on SQLite, per database
+engine profile (DATABASE_PROFILE in application/config.py).
+
+    python -m benchmarks.sqlite_concurrency
+    python -m benchmarks.sqlite_concurrency --processes 8 --write-ratio 0.5 --seconds 15
+
+For every profile a throwaway database is seeded with a synthetic catalog, then
+--processes worker processes (each one its own app, like gunicorn workers), all
+logged in as the seeded student, call the user dashboard and score routes or
+submit a quiz for --seconds. Reported per profile: reads and submissions per
+second, p95 latency and failed requests ("database is locked" and the like).
+
+Caching is switched off (NullCache, no Redis) so every request hits the database.
+"""
+import argparse
+import logging
+import multiprocessing
+import os
+import random
+import sys
+import tempfile
+import time
+
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+READS = ("/api/user/dashboard", "/api/user/score")
+
+
+def _prepare(database_path, profile, scale):
+    """Seed the database; returns the ids of quizzes that are open for attempts."""
+    from datetime import datetime
+    from app import create_app
+    from application.commands import init_database
+    from application.database import db
+    from application.models import Quiz
+    from benchmarks.query_budget import _configure_environment, grow
+
+    _configure_environment(database_path)
+    os.environ["FLASK_DATABASE_PROFILE"] = profile
+    app = create_app()
+    with app.app_context():
+        init_database()
+        grow(scale)
+        quiz_ids = [quiz_id for (quiz_id,) in db.session.query(Quiz.id).filter(Quiz.starts_at <= datetime.now())]
+        db.engine.dispose()
+    return quiz_ids
+
+
+def _worker(database_path, profile, quiz_ids, write_ratio, seconds, seed):
+    from benchmarks.query_budget import _configure_environment
+
+    _configure_environment(database_path)
+    os.environ["FLASK_DATABASE_PROFILE"] = profile
+    from app import create_app
+
+    app = create_app()
+    app.logger.setLevel(logging.CRITICAL)     # failed requests are counted, not printed
+    client = app.test_client()
+    with app.app_context():
+        client.post("/api/login", json={"email": "user@quizmaster.com", "password": "user123"})
+
+    rng = random.Random(seed)
+    reads, writes, failed = [], [], 0
+    stop_at = time.monotonic() + seconds
+    while time.monotonic() < stop_at:
+        write = rng.random() < write_ratio
+        started = time.perf_counter()
+        with app.app_context():
+            if write:
+                response = client.post(f"/api/user/attempt_quiz/{rng.choice(quiz_ids)}/attempt", json={})
+            else:
+                response = client.get(rng.choice(READS))
+        elapsed = time.perf_counter() - started
+        if response.status_code >= 400:
+            failed += 1
+        elif write:
+            writes.append(elapsed)
+        else:
+            reads.append(elapsed)
+    return reads, writes, failed
+
+
+def _p95(samples):
+    if not samples:
+        return float("nan")
+    return sorted(samples)[max(int(len(samples) * 0.95) - 1, 0)] * 1000
+
+
+def run(profile, args):
+    database_path = os.path.join(tempfile.mkdtemp(prefix="quizmaster-sqlite-"), "bench.sqlite3")
+    quiz_ids = _prepare(database_path, profile, args.scale)
+    jobs = [
+        (database_path, profile, quiz_ids, args.write_ratio, args.seconds, seed)
+        for seed in range(args.processes)
+    ]
+    # spawn: every worker builds its own app and engine, nothing is shared
+    with multiprocessing.get_context("spawn").Pool(args.processes) as pool:
+        results = pool.starmap(_worker, jobs)
+    reads = [sample for result in results for sample in result[0]]
+    writes = [sample for result in results for sample in result[1]]
+    failed = sum(result[2] for result in results)
+    print(
+        f"{profile:12s} {len(reads) / args.seconds:8.1f} {_p95(reads):10.1f} "
+        f"{len(writes) / args.seconds:9.1f} {_p95(writes):10.1f} {failed:7d}"
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--profiles", nargs="+", default=["default", "concurrent"], choices=["default", "concurrent"])
+    parser.add_argument("--processes", type=int, default=4, help="concurrent worker processes")
+    parser.add_argument("--write-ratio", type=float, default=0.3, help="share of requests that submit a quiz")
+    parser.add_argument("--seconds", type=float, default=10, help="duration per profile")
+    parser.add_argument("--scale", type=int, default=10, help="synthetic subjects to seed")
+    args = parser.parse_args()
+    sys.path.insert(0, PROJECT_ROOT)
+
+    print(f"{args.processes} processes, {args.write_ratio:.0%} submissions, {args.seconds:.0f} s per profile")
+    print(f"{'profile':12s} {'reads/s':>8s} {'read p95':>10s} {'writes/s':>9s} {'write p95':>10s} {'failed':>7s}")
+    for profile in args.profiles:
+        run(profile, args)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,60 @@
+"""
+Import-to-ready time of each process type (web worker, Celery worker, Celery
+beat, CLI), every run in a fresh interpreter.
+
+    python -m benchmarks.startup --runs 7
+
+"Ready" is the point where the process could start serving: the Flask app is
+built (web, CLI) or the Celery app is finalized with all tasks registered
+(worker, beat). Nothing here touches the database, Redis or the broker.
+"""
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+PROCESSES = {
+    # what gunicorn does with app:app
+    "web": "import app; app.app",
+    # celery -A app.celery_app worker / beat: load the app, finalize the task registry
+    "celery worker": "import app; app.celery_app.loader.import_default_modules(); app.celery_app.finalize()",
+    "celery beat": "import app; app.celery_app.finalize(); import celery_config; celery_config.beat_schedule",
+    # flask --app app <command>: the CLI builds the app through the factory
+    "cli": "from flask.cli import ScriptInfo; ScriptInfo(app_import_path='app').load_app()",
+}
+
+CHILD = """
+import time
+started = time.perf_counter()
+{code}
+print(time.perf_counter() - started)
+"""
+
+
+def time_process(code):
+    result = subprocess.run(
+        [sys.executable, "-c", CHILD.format(code=code)],
+        cwd=PROJECT_ROOT, capture_output=True, text=True, check=True
+    )
+    return float(result.stdout.strip().splitlines()[-1])
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--runs", type=int, default=5, help="fresh processes per type")
+    args = parser.parse_args()
+
+    print(f"{'process':15s} {'median ms':>10s} {'min ms':>8s} {'max ms':>8s}")
+    for name, code in PROCESSES.items():
+        samples = [time_process(code) for _ in range(args.runs)]
+        print(
+            f"{name:15s} {statistics.median(samples) * 1000:10.0f} "
+            f"{min(samples) * 1000:8.0f} {max(samples) * 1000:8.0f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
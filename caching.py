@@ -1,3 +1,170 @@
+import hashlib
+import time
+from datetime import datetime
+from functools import wraps
+from flask import current_app, request
 from flask_caching import Cache
+from flask_security import current_user
+import redis
 
-cache = Cache()
\ No newline at end of file
+cache = Cache()
+
+
+def get_redis():
+    """
+    Plain redis client for the same Redis instance the cache uses (CACHE_REDIS_*),
+    for data structures Flask-Caching does not cover. One client (and pool) per app.
+    """
+    client = current_app.extensions.get("quizmaster_redis")
+    if client is None:
+        config = current_app.config
+        client = redis.Redis(
+            host=config.get("CACHE_REDIS_HOST", "localhost"),
+            port=config.get("CACHE_REDIS_PORT", 6379),
+            db=config.get("CACHE_REDIS_DB", 0),
+            password=config.get("CACHE_REDIS_PASSWORD"),
+            socket_timeout=config.get("REDIS_SOCKET_TIMEOUT", 2),
+        )
+        current_app.extensions["quizmaster_redis"] = client
+    return client
+
+
+def reset_redis_pools(app):
+    """
+    After a fork: drop the Redis connections inherited from the parent process
+    (cache backend and get_redis client) so the child opens its own.
+    """
+    clients = [app.extensions.get("quizmaster_redis")]
+    backend = app.extensions.get("cache", {}).get(cache)
+    clients += [getattr(backend, "_write_client", None), getattr(backend, "_read_client", None)]
+    for client in clients:
+        if client is not None:
+            client.connection_pool.reset()
+
+
+# Tagged response cache.
+#
+# Every entity type (subject, chapter, quiz, question, user) has a version stamp
+# in the cache. A cached response's key includes the current versions of its tags,
+# so bump_tags() after a write makes every older entry unreachable at once; the
+# orphans simply expire. That makes long TTLs safe for the admin list endpoints.
+# When a tag has no stored version (NullCache, or a backend that dropped it), a
+# write could not be told apart from no write, so nothing is cached or
+# revalidated: the view just runs.
+
+TAG_KEY = "cache_tag:{tag}"
+TAGGED_TIMEOUT = 86400
+
+
+def _seed():
+    # versions are timestamps: a new one is always above every earlier one,
+    # even when the old stamp was evicted in between
+    return time.time_ns()
+
+
+class TagVersionMissing(Exception):
+    """A tag has no stored version: skip the tagged cache and the ETag, serve a fresh response."""
+
+
+def tag_versions(*tags):
+    """Current version of each tag, starting the ones not seen yet (None if the cache keeps nothing)."""
+    keys = [TAG_KEY.format(tag=tag) for tag in tags]
+    versions = cache.get_many(*keys)
+    for index, version in enumerate(versions):
+        if version is None:
+            cache.add(keys[index], _seed(), timeout=0)
+            versions[index] = cache.get(keys[index])
+    return versions
+
+
+def bump_tags(*tags):
+    """Invalidate every cached response tagged with any of tags. Call after the commit."""
+    try:
+        version = _seed()
+        cache.set_many({TAG_KEY.format(tag=tag): version for tag in tags}, timeout=0)
+    except Exception as e:
+        current_app.logger.error(f"Could not invalidate cache tags {', '.join(tags)}: {str(e)}")
+
+
+def _request_key(*tags):
+    """Path, query string, caller roles and tag versions: everything a tagged read depends on."""
+    roles = ",".join(sorted(role.name for role in current_user.roles))
+    versions = tag_versions(*tags)
+    if any(version is None for version in versions):
+        raise TagVersionMissing(", ".join(tags))
+    versions = ".".join(str(version) for version in versions)
+    query = "&".join(f"{name}={value}" for name, value in sorted(request.args.items(multi=True)))
+    return f"{request.path}?{query}:{roles}:{versions}"
+
+
+def cached_with_tags(*tags, timeout=TAGGED_TIMEOUT):
+    """
+    Cache a view's successful responses under the request path, query string,
+    the caller's roles and the versions of tags. Errors are never cached.
+    Goes under @login_required, so the roles are known.
+    """
+    def decorator(view):
+        @wraps(view)
+        def wrapper(*args, **kwargs):
+            try:
+                key = f"tagged:{_request_key(*tags)}"
+                cached = cache.get(key)
+            except TagVersionMissing:
+                return view(*args, **kwargs)
+            except Exception as e:
+                current_app.logger.warning(f"Tagged cache unavailable: {str(e)}")
+                return view(*args, **kwargs)
+
+            if cached is not None:
+                body, status, mimetype = cached
+                return current_app.response_class(body, status=status, mimetype=mimetype)
+
+            response = current_app.make_response(view(*args, **kwargs))
+            if response.status_code == 200 and not response.is_streamed:
+                try:
+                    cache.set(key, (response.get_data(), response.status_code, response.mimetype), timeout=timeout)
+                except Exception as e:
+                    current_app.logger.warning(f"Tagged cache unavailable: {str(e)}")
+            return response
+        return wrapper
+    return decorator
+
+
+def etag_for_tags(*tags, per_minute=False):
+    """
+    Strong ETag of a tagged read for the current request: the same inputs as the
+    cached_with_tags key, hashed. per_minute adds the current minute for views whose
+    result moves with the clock (quiz start times have minute resolution).
+    """
+    minute = datetime.now().strftime("%Y%m%d%H%M") if per_minute else ""
+    return hashlib.sha1(f"{_request_key(*tags)}:{minute}".encode()).hexdigest()
+
+
+def conditional_with_tags(*tags, per_minute=False):
+    """
+    Answer If-None-Match with 304 before the view runs when none of tags changed,
+    and put the ETag on successful responses. Goes under @login_required.
+    """
+    def decorator(view):
+        @wraps(view)
+        def wrapper(*args, **kwargs):
+            try:
+                etag = etag_for_tags(*tags, per_minute=per_minute)
+            except TagVersionMissing:
+                return view(*args, **kwargs)
+            except Exception as e:
+                current_app.logger.warning(f"Tagged cache unavailable: {str(e)}")
+                return view(*args, **kwargs)
+
+            if request.if_none_match.contains(etag):
+                response = current_app.response_class(status=304)
+            else:
+                response = current_app.make_response(view(*args, **kwargs))
+                if response.status_code != 200:
+                    return response
+            response.set_etag(etag)
+            # the browser must come back every time, but may reuse the body on a 304
+            response.headers["Cache-Control"] = "private, no-cache"
+            return response
+        return wrapper
+    return decorator
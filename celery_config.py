@@ -12,4 +12,16 @@ beat_schedule = {
         'task': 'application.routes.send_monthly_activity_report',
         'schedule': crontab(hour=9, minute=0, day_of_month=1),  #  will send at 9 AM  on the 1st
     },
+    'drain-score-queue': {
+        'task': 'application.routes.drain_score_queue',
+        'schedule': 5.0,  # every 5 seconds; a no-op unless SCORE_WRITE_BEHIND is on
+    },
+    'rebuild-leaderboards': {
+        'task': 'application.routes.rebuild_leaderboards',
+        'schedule': crontab(hour=3, minute=30),  # nightly, repairs any drift of the Redis leaderboards
+    },
+    'refresh-read-snapshot': {
+        'task': 'application.routes.refresh_read_snapshot',
+        'schedule': 60.0,  # every minute; a no-op unless SQLITE_SNAPSHOT_PATH is set
+    },
 }
\ No newline at end of file
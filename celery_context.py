@@ -1,9 +1,25 @@
-from celery import Task
-from app import create_app
+from celery import Task, current_app as current_celery_app
+from celery.signals import worker_shutting_down
 
-app, _= create_app()
+# Tasks run inside the app context of the one Flask app that create_app() built
+# for this process and attached to the Celery app as celery_app.flask_app.
 
 class FlaskTask(Task):
     def __call__(self, *args, **kwargs):
-        with app.app_context():
-            return self.run(*args, **kwargs)
\ No newline at end of file
+        with self.app.flask_app.app_context():
+            return self.run(*args, **kwargs)
+
+
+@worker_shutting_down.connect
+def flush_score_queue(**kwargs):
+    # write out buffered quiz submissions before the worker goes away
+    from application import score_queue
+    app = current_celery_app.flask_app
+    with app.app_context():
+        if not score_queue.enabled():
+            return
+        try:
+            written = score_queue.drain()
+            app.logger.info(f"Flushed {written} buffered quiz submission(s) on shutdown.")
+        except Exception as e:
+            app.logger.error(f"Could not flush the score queue on shutdown: {str(e)}")
@@ -0,0 +1,42 @@
+# gunicorn -c gunicorn.conf.py wsgi:app
+#
+# Every setting can be changed with an environment variable:
+#   GUNICORN_BIND                 address to listen on (127.0.0.1:8000)
+#   GUNICORN_WORKER_CLASS         sync, gthread or gevent (gthread when GUNICORN_THREADS > 1, else sync)
+#   GUNICORN_WORKERS              worker processes (2 x CPUs + 1)
+#   GUNICORN_THREADS              threads per gthread worker (1)
+#   GUNICORN_WORKER_CONNECTIONS   concurrent requests per gevent worker (100)
+#   GUNICORN_TIMEOUT              seconds before a stuck worker is restarted (30)
+#
+# sync suits the CPU-bound routes; gthread or gevent let one worker wait on
+# SQLite, Redis and SMTP for many requests at once.
+import multiprocessing
+import os
+
+bind = os.environ.get("GUNICORN_BIND", "127.0.0.1:8000")
+threads = int(os.environ.get("GUNICORN_THREADS", "1"))
+worker_class = os.environ.get("GUNICORN_WORKER_CLASS", "gthread" if threads > 1 else "sync")
+workers = int(os.environ.get("GUNICORN_WORKERS", multiprocessing.cpu_count() * 2 + 1))
+worker_connections = int(os.environ.get("GUNICORN_WORKER_CONNECTIONS", "100"))
+timeout = int(os.environ.get("GUNICORN_TIMEOUT", "30"))
+accesslog = "-"
+
+# Build the app once in the master; workers are forked from it.
+preload_app = True
+
+if worker_class == "gevent":
+    # must happen before the app (and with it socket, ssl, redis) is imported by preload
+    from gevent import monkey
+    monkey.patch_all()
+
+
+def post_fork(server, worker):
+    # Connections opened in the master must not be shared with the forked workers.
+    from application.database import db
+    from caching import reset_redis_pools
+    from wsgi import app
+
+    with app.app_context():
+        for engine in db.engines.values():
+            engine.dispose(close=False)
+    reset_redis_pools(app)
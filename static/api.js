@@ -0,0 +1,64 @@
+// fetch() for the catalog/dashboard GET routes that send an ETag.
+// The last body of each URL is kept in memory and revalidated with If-None-Match;
+// a 304 is turned back into a normal 200 response built from the kept body,
+// so callers use it exactly like fetch().
+const etagCache = new Map();
+
+export async function fetchWithETag(url, options = {}) {
+  const entry = etagCache.get(url);
+  const headers = new Headers(options.headers || {});
+  if (entry) {
+    headers.set("If-None-Match", entry.etag);
+  }
+
+  // no-store: revalidation is done here, keep the browser cache out of it
+  const response = await fetch(url, { ...options, headers, cache: "no-store" });
+
+  if (response.status === 304 && entry) {
+    return new Response(entry.body, {
+      status: 200,
+      headers: { "Content-Type": "application/json", "ETag": entry.etag }
+    });
+  }
+
+  const etag = response.headers.get("ETag");
+  if (response.ok && etag) {
+    etagCache.set(url, { etag, body: await response.clone().text() });
+  } else {
+    etagCache.delete(url);
+  }
+  return response;
+}
+
+// URL of a paginated list route (application/pagination.py) with these query
+// parameters; empty values are left out, so a blank filter means "all".
+export function listUrl(path, params = {}) {
+  const query = new URLSearchParams();
+  for (const [name, value] of Object.entries(params)) {
+    if (value !== "" && value !== null && value !== undefined) {
+      query.set(name, value);
+    }
+  }
+  const text = query.toString();
+  return text ? `${path}?${text}` : path;
+}
+
+// Every row of a paginated list, following the "next" cursors; for the small
+// lists a form needs in full (e.g. the subjects of a dropdown, with
+// fields: "id,name").
+export async function fetchAllPages(path, key, params = {}) {
+  const rows = [];
+  let after = null;
+  do {
+    const response = await fetchWithETag(listUrl(path, { limit: 500, ...params, after }), {
+      headers: { "Content-Type": "application/json" }
+    });
+    const data = await response.json();
+    if (!response.ok) {
+      throw new Error(data.message || `Failed to load ${key}.`);
+    }
+    rows.push(...data[key]);
+    after = data.next;
+  } while (after);
+  return rows;
+}
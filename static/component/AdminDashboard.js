@@ -1,8 +1,12 @@
+import { listUrl } from "../api.js";
+
 export default {
   name: "AdminDashboard",
   data() {
     return {
       subjects: [],
+      subjectsNext: null,
+      loadingMoreSubjects: false,
       searchQuery: "",
       subjectResults: [],
       chapterResults: [],
@@ -24,15 +28,22 @@ export default {
     }
   },
   methods: {
+    // one page of a tree level; every node keeps its own children and their
+    // "next" cursor (null once all are loaded), loaded only when expanded
+    async fetchTreePage(path, after) {
+      const response = await fetch(listUrl(path, { after }), {
+        headers: { "Content-Type": "application/json" }
+      });
+      return { response, data: await response.json() };
+    },
+
     async loadData() {
       this.isLoading = true;
       try {
-        const response = await fetch("/api/admin/dashboard", {
-          headers: { "Content-Type": "application/json" }
-        });
-        const data = await response.json();
+        const { response, data } = await this.fetchTreePage("/api/admin/dashboard/tree", null);
         if (response.ok && data.subjects) {
-          this.subjects = data.subjects;
+          this.subjects = data.subjects.map(this.subjectNode);
+          this.subjectsNext = data.next;
         } else {
           this.showToast("Error", data.message || "Failed to load dashboard data", "danger");
         }
@@ -44,6 +55,128 @@ export default {
       }
     },
 
+    async loadMoreSubjects() {
+      this.loadingMoreSubjects = true;
+      try {
+        const { response, data } = await this.fetchTreePage("/api/admin/dashboard/tree", this.subjectsNext);
+        if (response.ok) {
+          this.subjects = this.subjects.concat(data.subjects.map(this.subjectNode));
+          this.subjectsNext = data.next;
+        } else {
+          this.showToast("Error", data.message || "Failed to load subjects", "danger");
+        }
+      } catch (error) {
+        console.error("Error loading subjects:", error);
+        this.showToast("Error", "Failed to load subjects", "danger");
+      } finally {
+        this.loadingMoreSubjects = false;
+      }
+    },
+
+    subjectNode(subject) {
+      return { ...subject, expanded: false, chapters: [], chaptersLoaded: false, chapterNext: null, loadingChapters: false };
+    },
+
+    async toggleSubject(subject) {
+      subject.expanded = !subject.expanded;
+      if (subject.expanded && !subject.chaptersLoaded) {
+        await this.loadChapters(subject);
+      }
+    },
+
+    async loadChapters(subject) {
+      subject.loadingChapters = true;
+      try {
+        const { response, data } = await this.fetchTreePage(
+          `/api/admin/dashboard/subjects/${subject.id}/chapters`, subject.chapterNext
+        );
+        if (response.ok) {
+          const chapters = data.chapters.map(chapter => ({
+            ...chapter,
+            expanded: false,
+            quizzes: [],
+            quizzesLoaded: false,
+            quizNext: null,
+            loadingQuizzes: false
+          }));
+          subject.chapters = subject.chapters.concat(chapters);
+          subject.chapterNext = data.next;
+          subject.chaptersLoaded = true;
+        } else {
+          this.showToast("Error", data.message || "Failed to load chapters", "danger");
+        }
+      } catch (error) {
+        console.error("Error loading chapters:", error);
+        this.showToast("Error", "Failed to load chapters", "danger");
+      } finally {
+        subject.loadingChapters = false;
+      }
+    },
+
+    async toggleChapter(chapter) {
+      chapter.expanded = !chapter.expanded;
+      if (chapter.expanded && !chapter.quizzesLoaded) {
+        await this.loadQuizzes(chapter);
+      }
+    },
+
+    async loadQuizzes(chapter) {
+      chapter.loadingQuizzes = true;
+      try {
+        const { response, data } = await this.fetchTreePage(
+          `/api/admin/dashboard/chapters/${chapter.id}/quizzes`, chapter.quizNext
+        );
+        if (response.ok) {
+          const quizzes = data.quizzes.map(quiz => ({
+            ...quiz,
+            expanded: false,
+            questions: [],
+            questionsLoaded: false,
+            questionNext: null,
+            loadingQuestions: false
+          }));
+          chapter.quizzes = chapter.quizzes.concat(quizzes);
+          chapter.quizNext = data.next;
+          chapter.quizzesLoaded = true;
+        } else {
+          this.showToast("Error", data.message || "Failed to load quizzes", "danger");
+        }
+      } catch (error) {
+        console.error("Error loading quizzes:", error);
+        this.showToast("Error", "Failed to load quizzes", "danger");
+      } finally {
+        chapter.loadingQuizzes = false;
+      }
+    },
+
+    async toggleQuiz(quiz) {
+      quiz.expanded = !quiz.expanded;
+      if (quiz.expanded && !quiz.questionsLoaded) {
+        await this.loadQuestions(quiz);
+      }
+    },
+
+    async loadQuestions(quiz) {
+      quiz.loadingQuestions = true;
+      try {
+        const { response, data } = await this.fetchTreePage(
+          `/api/admin/dashboard/quizzes/${quiz.id}/questions`, quiz.questionNext
+        );
+        if (response.ok) {
+          quiz.questions = quiz.questions.concat(data.questions);
+          quiz.questionNext = data.next;
+          quiz.questionsLoaded = true;
+        } else {
+          this.showToast("Error", data.message || "Failed to load questions", "danger");
+        }
+      } catch (error) {
+        console.error("Error loading questions:", error);
+        this.showToast("Error", "Failed to load questions", "danger");
+      } finally {
+        quiz.loadingQuestions = false;
+      }
+    },
+
     showToast(title, message, variant = 'success') {
       alert(`${title}: ${message}`);
     },
@@ -77,7 +210,7 @@ export default {
       this.$router.push("/admin/chapters");
     },
 
-    async deleteChapter(chapterId) {
+    async deleteChapter(subjectId, chapterId) {
       if (confirm("Are you sure you want to permanently delete this chapter and all its associated quizzes and questions?")) {
         try {
           const response = await fetch(`/api/admin/chapters/${chapterId}`, {
@@ -87,7 +220,11 @@ export default {
           const data = await response.json();
           if (response.ok) {
             this.showToast("Success", "Chapter deleted successfully");
-            await this.loadData();
+            const subject = this.subjects.find(s => s.id === subjectId);
+            if (subject) {
+              subject.chapter_count -= 1;
+              subject.chapters = subject.chapters.filter(c => c.id !== chapterId);
+            }
           } else {
             this.showToast("Error", data.message || "Failed to delete chapter", "danger");
           }
@@ -326,7 +463,7 @@ export default {
                       <td>{{ chapter.subject_id }}</td>
                       <td>
                         <button 
-                          @click="deleteChapter(chapter.id)" 
+                          @click="deleteChapter(chapter.subject_id, chapter.id)" 
                           class="btn btn-sm btn-outline-danger" 
                           data-bs-toggle="tooltip" 
                           data-bs-placement="top" 
@@ -419,8 +556,12 @@ export default {
             <div class="col-lg-6 mb-4" v-for="subject in subjects" :key="subject.id">
               <div class="card shadow-md h-100">
                 <div class="card-header py-3 d-flex justify-content-between align-items-center">
-                  <h6 class="m-0 font-weight-bold text-primary">
+                  <h6 class="m-0 font-weight-bold text-primary" role="button" @click="toggleSubject(subject)">
+                    <i :class="subject.expanded ? 'fas fa-chevron-down me-1' : 'fas fa-chevron-right me-1'"></i>
                     <i class="fas fa-book me-1"></i> {{ subject.name }}
+                    <small class="text-muted ms-2">
+                      {{ subject.chapter_count }} chapter(s), {{ subject.quiz_count }} quiz(es)
+                    </small>
                   </h6>
                   <div class="d-flex gap-2">
                     <button 
@@ -434,7 +575,7 @@ export default {
                     </button>
                   </div>
                 </div>
-                <div class="card-body">
+                <div class="card-body" v-if="subject.expanded">
                   <div class="table-responsive">
                     <table class="table table-bordered table-hover">
                       <thead class="table-light">
@@ -446,49 +587,107 @@ export default {
                         </tr>
                       </thead>
                       <tbody>
-                        <tr v-for="chapter in subject.chapters" :key="chapter.id">
-                          <td>{{ chapter.name }}</td>
-                          <td>
-                            <span v-if="chapter.quizzes && chapter.quizzes.length">
-                              {{ chapter.quizzes.length }} quiz(es)
-                            </span>
-                            <span v-else class="text-muted">No quizzes</span>
-                          </td>
-                          <td>
-                            <span v-if="chapter.quizzes && chapter.quizzes.length">
-                              {{ chapter.quizzes.reduce((acc, quiz) => acc + (quiz.questions ? quiz.questions.length : 0), 0) }} total
-                            </span>
-                            <span v-else class="text-muted">0</span>
-                          </td>
-                          <td>
-                            <div class="d-flex gap-2">
-                              <button 
-                                @click="addQuestion(subject.id, chapter.id)" 
-                                class="btn btn-outline-info" 
-                                data-bs-toggle="tooltip" 
-                                data-bs-placement="top" 
-                                title="Add a new question to this chapter"
-                              >
-                                Add Question
-                              </button>
-                              <button 
-                                @click="deleteChapter(chapter.id)" 
-                                class="btn btn-sm btn-outline-danger" 
-                                data-bs-toggle="tooltip" 
-                                data-bs-placement="top" 
-                                title="Delete this chapter and its contents"
+                        <template v-for="chapter in subject.chapters">
+                          <tr :key="'chapter-' + chapter.id">
+                            <td role="button" @click="toggleChapter(chapter)">
+                              <i :class="chapter.expanded ? 'fas fa-chevron-down me-1' : 'fas fa-chevron-right me-1'"></i>
+                              {{ chapter.name }}
+                            </td>
+                            <td>
+                              <span v-if="chapter.quiz_count">
+                                {{ chapter.quiz_count }} quiz(es)
+                              </span>
+                              <span v-else class="text-muted">No quizzes</span>
+                            </td>
+                            <td>
+                              <span v-if="chapter.question_count">
+                                {{ chapter.question_count }} total
+                              </span>
+                              <span v-else class="text-muted">0</span>
+                            </td>
+                            <td>
+                              <div class="d-flex gap-2">
+                                <button 
+                                  @click="addQuestion(subject.id, chapter.id)" 
+                                  class="btn btn-outline-info" 
+                                  data-bs-toggle="tooltip" 
+                                  data-bs-placement="top" 
+                                  title="Add a new question to this chapter"
+                                >
+                                  Add Question
+                                </button>
+                                <button 
+                                  @click="deleteChapter(subject.id, chapter.id)" 
+                                  class="btn btn-sm btn-outline-danger" 
+                                  data-bs-toggle="tooltip" 
+                                  data-bs-placement="top" 
+                                  title="Delete this chapter and its contents"
+                                >
+                                  Delete Chapter
+                                </button>
+                              </div>
+                            </td>
+                          </tr>
+                          <tr v-if="chapter.expanded" :key="'quizzes-' + chapter.id">
+                            <td colspan="4">
+                              <div v-if="chapter.loadingQuizzes" class="text-muted small">Loading quizzes...</div>
+                              <div v-else-if="!chapter.quizzes.length" class="text-muted small">No quizzes yet</div>
+                              <ul class="list-unstyled mb-0">
+                                <li v-for="quiz in chapter.quizzes" :key="quiz.id" class="mb-2">
+                                  <a href="#" @click.prevent="toggleQuiz(quiz)">
+                                    <i :class="quiz.expanded ? 'fas fa-chevron-down me-1' : 'fas fa-chevron-right me-1'"></i>
+                                    Quiz #{{ quiz.id }}
+                                  </a>
+                                  <small class="text-muted">
+                                    {{ quiz.date_of_quiz }} {{ quiz.start_time }} &middot; {{ quiz.question_count }} question(s)
+                                  </small>
+                                  <div v-if="quiz.expanded" class="ms-4 mt-1">
+                                    <div v-if="quiz.loadingQuestions" class="text-muted small">Loading questions...</div>
+                                    <ol class="small mb-1" v-if="quiz.questions.length">
+                                      <li v-for="question in quiz.questions" :key="question.id">
+                                        {{ question.question_statement }}
+                                        <span class="text-success">(correct: option {{ question.correct_option }})</span>
+                                      </li>
+                                    </ol>
+                                    <button
+                                      v-if="quiz.questionNext"
+                                      @click="loadQuestions(quiz)"
+                                      class="btn btn-sm btn-link p-0"
+                                      :disabled="quiz.loadingQuestions"
+                                    >
+                                      Load more questions
+                                    </button>
+                                  </div>
+                                </li>
+                              </ul>
+                              <button
+                                v-if="chapter.quizNext"
+                                @click="loadQuizzes(chapter)"
+                                class="btn btn-sm btn-link p-0"
+                                :disabled="chapter.loadingQuizzes"
                               >
-                                Delete Chapter
+                                Load more quizzes
                               </button>
-                            </div>
-                          </td>
+                            </td>
+                          </tr>
+                        </template>
+                        <tr v-if="subject.loadingChapters">
+                          <td colspan="4" class="text-center text-muted">Loading chapters...</td>
                         </tr>
-                        <tr v-if="!subject.chapters || !subject.chapters.length">
+                        <tr v-else-if="!subject.chapters.length">
                           <td colspan="4" class="text-center text-muted">No chapters yet</td>
                         </tr>
                       </tbody>
                     </table>
                   </div>
+                  <button
+                    v-if="subject.chapterNext"
+                    @click="loadChapters(subject)"
+                    class="btn btn-sm btn-outline-primary"
+                    :disabled="subject.loadingChapters"
+                  >
+                    Load more chapters
+                  </button>
                 </div>
                 <div class="card-footer bg-transparent">
                   <button 
@@ -504,6 +703,11 @@ export default {
               </div>
             </div>
           </div>
+          <div class="text-center" v-if="subjectsNext">
+            <button @click="loadMoreSubjects" class="btn btn-outline-primary" :disabled="loadingMoreSubjects">
+              <i class="fas fa-chevron-down me-1"></i> {{ loadingMoreSubjects ? 'Loading...' : 'Load more subjects' }}
+            </button>
+          </div>
         </div>
       </div>
     </div>
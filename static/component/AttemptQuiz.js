@@ -12,6 +12,8 @@ export default {
       timer: null,
       loading: false,
       error: null,
+      // sent as Idempotency-Key so a retried submission is only stored once
+      attemptKey: `${Date.now()}-${Math.random().toString(36).slice(2)}`,
     };
   },
   computed: {
@@ -116,6 +118,7 @@ export default {
           headers: {
             "Content-Type": "application/json",
             "Authorization": `Bearer ${localStorage.getItem("token")}`,
+            "Idempotency-Key": this.attemptKey,
           },
           body: JSON.stringify(payload),
         });
@@ -1,8 +1,15 @@
+import { fetchAllPages, fetchWithETag, listUrl } from "../api.js";
+
 export default {
   name: "ChapterComponent",
   data() {
     return {
       chapters: [],
+      // keyset paging: the cursor of the next page, null on the last one
+      nextCursor: null,
+      total: null,
+      filterSubjectId: "",
+      loadingMore: false,
       subjects: [],
       newChapter: {
         name: "",
@@ -22,34 +29,38 @@ export default {
     this.loadSubjects();
   },
   methods: {
-    async loadChapters() {
+    async loadChapters(more = false) {
+      this.loadingMore = more;
       try {
-        const response = await fetch("/api/admin/chapters", {
+        const url = listUrl("/api/admin/chapters", {
+          subject_id: this.filterSubjectId,
+          after: more ? this.nextCursor : null,
+          count: more ? null : 1
+        });
+        const response = await fetchWithETag(url, {
           headers: { "Content-Type": "application/json" }
         });
         const data = await response.json();
         if (response.ok && data.chapters) {
-          this.chapters = data.chapters;
+          this.chapters = more ? this.chapters.concat(data.chapters) : data.chapters;
+          this.nextCursor = data.next;
+          if (!more) this.total = data.total;
         } else {
           alert(data.message || "Failed to load chapters.");
         }
       } catch (error) {
         console.error("Error loading chapters:", error);
+      } finally {
+        this.loadingMore = false;
       }
     },
     async loadSubjects() {
+      // every subject, for the selects: only their ids and names
       try {
-        const response = await fetch("/api/admin/subjects", {
-          headers: { "Content-Type": "application/json" }
-        });
-        const data = await response.json();
-        if (response.ok && data.subjects) {
-          this.subjects = data.subjects;
-        } else {
-          alert(data.message || "Failed to load subjects.");
-        }
+        this.subjects = await fetchAllPages("/api/admin/subjects", "subjects", { fields: "id,name" });
       } catch (error) {
         console.error("Error loading subjects:", error);
+        alert(error.message);
       }
     },
     async addChapter() {
@@ -65,7 +76,9 @@ export default {
         });
         const data = await response.json();
         if (response.ok) {
-          this.chapters.push(data);
+          // with more pages to load, the new chapter comes with the last one
+          if (!this.nextCursor) this.chapters.push(data);
+          if (this.total !== null) this.total += 1;
           this.newChapter = { name: "", description: "", subject_id: "" };
         } else {
           alert(data.message || "Failed to add chapter.");
@@ -117,6 +130,7 @@ export default {
           const data = await response.json();
           if (response.ok) {
             this.chapters = this.chapters.filter(c => c.id !== chapter.id);
+            if (this.total) this.total -= 1;
           } else {
             alert(data.message || "Failed to delete chapter.");
           }
@@ -252,7 +266,15 @@ export default {
                   </div>
 
                   <div class="col-12 col-md-8 ps-md-4">
-                    <h4 class="text-muted mb-4">Existing Chapters</h4>
+                    <div class="d-flex justify-content-between align-items-center mb-4">
+                      <h4 class="text-muted mb-0">Existing Chapters</h4>
+                      <select v-model="filterSubjectId" class="form-select form-select-sm w-auto" @change="loadChapters()">
+                        <option value="">All subjects</option>
+                        <option v-for="subject in subjects" :key="subject.id" :value="subject.id">
+                          {{ subject.name }}
+                        </option>
+                      </select>
+                    </div>
                     <div class="list-group">
                       <div 
                         v-for="chapter in chapters" 
@@ -345,6 +367,14 @@ export default {
                         No chapters available
                       </div>
                     </div>
+                    <div class="d-flex justify-content-between align-items-center">
+                      <small class="text-muted">
+                        Showing {{ chapters.length }}<span v-if="total !== null"> of {{ total }}</span>
+                      </small>
+                      <button v-if="nextCursor" class="btn btn-outline-primary btn-sm" :disabled="loadingMore" @click="loadChapters(true)">
+                        <i class="fas fa-chevron-down me-1"></i> {{ loadingMore ? 'Loading...' : 'Load more' }}
+                      </button>
+                    </div>
                   </div>
                 </div>
               </div>
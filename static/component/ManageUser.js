@@ -1,8 +1,15 @@
+import { listUrl } from "../api.js";
+
 export default {
   name: "ManageUser",
   data() {
     return {
       users: [],
+      // keyset paging: the cursor of the next page, null on the last one
+      nextCursor: null,
+      total: null,
+      filters: { active: "", role: "" },
+      loadingMore: false,
       editingUser: null,
       updatedUser: {
         email: "",
@@ -17,19 +24,29 @@ export default {
     this.loadUsers();
   },
   methods: {
-    async loadUsers() {
+    async loadUsers(more = false) {
+      this.loadingMore = more;
       try {
-        const response = await fetch("/api/admin/users", {
+        const url = listUrl("/api/admin/users", {
+          ...this.filters,
+          after: more ? this.nextCursor : null,
+          count: more ? null : 1
+        });
+        const response = await fetch(url, {
           headers: { "Content-Type": "application/json" }
         });
         const data = await response.json();
         if (response.ok && data.users) {
-          this.users = data.users;
+          this.users = more ? this.users.concat(data.users) : data.users;
+          this.nextCursor = data.next;
+          if (!more) this.total = data.total;
         } else {
           alert(data.message || "Failed to load users.");
         }
       } catch (error) {
         console.error("Error loading users:", error);
+      } finally {
+        this.loadingMore = false;
       }
     },
     startEditing(user) {
@@ -83,6 +100,7 @@ export default {
         const data = await response.json();
         if (response.ok) {
           this.users = this.users.filter(u => u.id !== user.id);
+          if (this.total) this.total -= 1;
         } else {
           alert(data.message || "Failed to delete user.");
         }
@@ -157,6 +175,24 @@ export default {
         <div class="row justify-content-center">
           <div class="col-12 col-lg-10">
             <div class="card shadow-sm border-0">
+              <div class="card-header bg-light">
+                <div class="row g-2 align-items-center">
+                  <div class="col-auto">
+                    <select v-model="filters.active" class="form-select form-select-sm" @change="loadUsers()">
+                      <option value="">All statuses</option>
+                      <option value="true">Active</option>
+                      <option value="false">Inactive</option>
+                    </select>
+                  </div>
+                  <div class="col-auto">
+                    <select v-model="filters.role" class="form-select form-select-sm" @change="loadUsers()">
+                      <option value="">All roles</option>
+                      <option value="user">Users</option>
+                      <option value="admin">Admins</option>
+                    </select>
+                  </div>
+                </div>
+              </div>
               <div class="card-body p-0">
                 <div class="table-responsive">
                   <table class="table table-hover align-middle mb-0">
@@ -201,6 +237,14 @@ export default {
                   </table>
                 </div>
               </div>
+              <div class="card-footer bg-light d-flex justify-content-between align-items-center">
+                <small class="text-muted">
+                  Showing {{ users.length }}<span v-if="total !== null"> of {{ total }}</span>
+                </small>
+                <button v-if="nextCursor" class="btn btn-outline-primary btn-sm" :disabled="loadingMore" @click="loadUsers(true)">
+                  <i class="fas fa-chevron-down me-1"></i> {{ loadingMore ? 'Loading...' : 'Load more' }}
+                </button>
+              </div>
             </div>
           </div>
         </div>
@@ -1,8 +1,15 @@
+import { listUrl } from "../api.js";
+
 export default {
   name: "QuestionComponent",
   data() {
     return {
       questions: [],
+      // keyset paging: the cursor of the next page, null on the last one
+      nextCursor: null,
+      total: null,
+      filterQuizId: "",
+      loadingMore: false,
       newQuestion: {
         quiz_id: "",
         question_statement: "",
@@ -22,27 +29,46 @@ export default {
         option4: "",
         correct_option: 1,
       },
+      importFile: null,
+      importQuizId: "",
+      importSkipInvalid: false,
+      importReport: null,
+      importing: false,
     };
   },
   created() {
     this.loadQuestions();
   },
   methods: {
-    async loadQuestions() {
+    async loadQuestions(more = false) {
+      this.loadingMore = more;
       try {
-        const response = await fetch("/api/admin/questions", {
+        const url = listUrl("/api/admin/questions", {
+          quiz_id: this.filterQuizId,
+          after: more ? this.nextCursor : null,
+          count: more ? null : 1,
+        });
+        const response = await fetch(url, {
           headers: { "Content-Type": "application/json" },
         });
         const data = await response.json();
         if (response.ok && data.questions) {
-          this.questions = data.questions;
+          this.questions = more ? this.questions.concat(data.questions) : data.questions;
+          this.nextCursor = data.next;
+          if (!more) this.total = data.total;
         } else {
           alert(data.message || "Failed to load questions.");
         }
       } catch (error) {
         console.error("Error loading questions:", error);
+      } finally {
+        this.loadingMore = false;
       }
     },
+    clearFilter() {
+      this.filterQuizId = "";
+      this.loadQuestions();
+    },
     async addQuestion() {
       if (
         !this.newQuestion.quiz_id ||
@@ -60,7 +86,9 @@ export default {
         });
         const data = await response.json();
         if (response.ok) {
-          this.questions.push(data);
+          // with more pages to load, the new question comes with the last one
+          if (!this.nextCursor) this.questions.push(data);
+          if (this.total !== null) this.total += 1;
           this.newQuestion = {
             quiz_id: "",
             question_statement: "",
@@ -77,6 +105,38 @@ export default {
         console.error("Error adding question:", error);
       }
     },
+    selectImportFile(event) {
+      this.importFile = event.target.files[0] || null;
+    },
+    async importQuestions() {
+      if (!this.importFile) {
+        alert("Choose a CSV, XLSX or JSON file first.");
+        return;
+      }
+      const form = new FormData();
+      form.append("file", this.importFile);
+      if (this.importQuizId) form.append("quiz_id", this.importQuizId);
+      if (this.importSkipInvalid) form.append("skip_invalid", "true");
+      this.importing = true;
+      try {
+        // one request and one transaction for the whole file
+        const response = await fetch("/api/admin/questions/import", {
+          method: "POST",
+          body: form,
+        });
+        const data = await response.json();
+        this.importReport = data;
+        if (response.ok) {
+          this.loadQuestions();
+        } else if (!data.errors) {
+          alert(data.message || "Failed to import questions.");
+        }
+      } catch (error) {
+        console.error("Error importing questions:", error);
+      } finally {
+        this.importing = false;
+      }
+    },
     startEditing(question) {
       this.editingQuestion = question;
       this.updatedQuestion = {
@@ -132,6 +192,7 @@ export default {
           const data = await response.json();
           if (response.ok) {
             this.questions = this.questions.filter((q) => q.id !== question.id);
+            if (this.total) this.total -= 1;
           } else {
             alert(data.message || "Failed to delete question.");
           }
@@ -264,12 +325,75 @@ export default {
               </div>
             </div>
 
+            <!-- Card for Bulk Import -->
+            <div class="card shadow-sm mb-4 border-0">
+              <div class="card-header bg-info text-white">
+                <h4 class="mb-0">Import Questions</h4>
+              </div>
+              <div class="card-body">
+                <form @submit.prevent="importQuestions" class="p-2 bg-light rounded">
+                  <p class="text-muted small mb-3">
+                    CSV or XLSX with the columns quiz_id, question_statement, option1, option2, option3, option4, correct_option
+                    (or a JSON list of objects with these keys).
+                  </p>
+                  <div class="row">
+                    <div class="col-md-6 mb-3">
+                      <label for="importFile" class="form-label fw-bold">File</label>
+                      <input type="file" id="importFile" class="form-control" accept=".csv,.xlsx,.json" @change="selectImportFile" required />
+                    </div>
+                    <div class="col-md-6 mb-3">
+                      <label for="importQuizId" class="form-label fw-bold">Quiz ID (for rows without one)</label>
+                      <input type="text" v-model="importQuizId" id="importQuizId" class="form-control" placeholder="Optional" />
+                    </div>
+                  </div>
+                  <div class="form-check mb-3">
+                    <input type="checkbox" v-model="importSkipInvalid" id="importSkipInvalid" class="form-check-input" />
+                    <label for="importSkipInvalid" class="form-check-label">Import the valid rows even if some rows are invalid</label>
+                  </div>
+                  <button type="submit" class="btn btn-info w-100 text-white" :disabled="importing">
+                    <i class="fas fa-file-upload me-1"></i> {{ importing ? 'Importing...' : 'Import' }}
+                  </button>
+                </form>
+                <div v-if="importReport" class="mt-3">
+                  <div :class="['alert', importReport.invalid ? 'alert-warning' : 'alert-success']">
+                    {{ importReport.message }}
+                    <span v-if="importReport.rows !== undefined">({{ importReport.rows }} row(s) read)</span>
+                  </div>
+                  <table v-if="importReport.errors && importReport.errors.length" class="table table-sm table-bordered">
+                    <thead class="table-light">
+                      <tr>
+                        <th>Row</th>
+                        <th>Problems</th>
+                      </tr>
+                    </thead>
+                    <tbody>
+                      <tr v-for="error in importReport.errors" :key="error.row">
+                        <td>{{ error.row }}</td>
+                        <td>{{ error.errors.join("; ") }}</td>
+                      </tr>
+                    </tbody>
+                  </table>
+                </div>
+              </div>
+            </div>
+
             <!-- Table for Questions List -->
             <div class="card shadow-sm border-0">
               <div class="card-header bg-success text-white">
                 <h4 class="mb-0">Existing Questions</h4>
               </div>
               <div class="card-body">
+                <form @submit.prevent="loadQuestions()" class="row g-2 mb-3">
+                  <div class="col-auto">
+                    <input type="number" v-model="filterQuizId" class="form-control form-control-sm" min="1" placeholder="Filter by quiz ID" />
+                  </div>
+                  <div class="col-auto">
+                    <button type="submit" class="btn btn-success btn-sm">
+                      <i class="fas fa-filter me-1"></i> Filter
+                    </button>
+                    <button type="button" class="btn btn-outline-secondary btn-sm" @click="clearFilter">Clear</button>
+                  </div>
+                </form>
                 <div class="table-responsive">
                   <table class="table table-hover table-bordered">
                     <thead class="table-light">
@@ -312,6 +436,14 @@ export default {
                     </tbody>
                   </table>
                 </div>
+                <div class="d-flex justify-content-between align-items-center">
+                  <small class="text-muted">
+                    Showing {{ questions.length }}<span v-if="total !== null"> of {{ total }}</span>
+                  </small>
+                  <button v-if="nextCursor" class="btn btn-outline-primary btn-sm" :disabled="loadingMore" @click="loadQuestions(true)">
+                    <i class="fas fa-chevron-down me-1"></i> {{ loadingMore ? 'Loading...' : 'Load more' }}
+                  </button>
+                </div>
               </div>
             </div>
 
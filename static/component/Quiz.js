@@ -1,8 +1,15 @@
+import { fetchAllPages, fetchWithETag, listUrl } from "../api.js";
+
 export default {
   name: "QuizComponent",
   data() {
     return {
       quizzes: [],
+      // keyset paging: the cursor of the next page, null on the last one
+      nextCursor: null,
+      total: null,
+      filterChapterId: "",
+      loadingMore: false,
       chapters: [],
       newQuiz: {
         chapter_id: "",
@@ -26,34 +33,38 @@ export default {
     this.loadChapters();
   },
   methods: {
-    async loadQuizzes() {
+    async loadQuizzes(more = false) {
+      this.loadingMore = more;
       try {
-        const response = await fetch("/api/admin/quizzes", {
+        const url = listUrl("/api/admin/quizzes", {
+          chapter_id: this.filterChapterId,
+          after: more ? this.nextCursor : null,
+          count: more ? null : 1
+        });
+        const response = await fetchWithETag(url, {
           headers: { "Content-Type": "application/json" }
         });
         const data = await response.json();
         if (response.ok && data.quizzes) {
-          this.quizzes = data.quizzes;
+          this.quizzes = more ? this.quizzes.concat(data.quizzes) : data.quizzes;
+          this.nextCursor = data.next;
+          if (!more) this.total = data.total;
         } else {
           alert(data.message || "Failed to load quizzes.");
         }
       } catch (error) {
         console.error("Error loading quizzes:", error);
+      } finally {
+        this.loadingMore = false;
       }
     },
     async loadChapters() {
+      // every chapter, for the selects: only their ids and names
       try {
-        const response = await fetch("/api/admin/chapters", {
-          headers: { "Content-Type": "application/json" }
-        });
-        const data = await response.json();
-        if (response.ok && data.chapters) {
-          this.chapters = data.chapters;
-        } else {
-          alert(data.message || "Failed to load chapters.");
-        }
+        this.chapters = await fetchAllPages("/api/admin/chapters", "chapters", { fields: "id,name" });
       } catch (error) {
         console.error("Error loading chapters:", error);
+        alert(error.message);
       }
     },
     async addQuiz() {
@@ -69,7 +80,9 @@ export default {
         });
         const data = await response.json();
         if (response.ok) {
-          this.quizzes.push(data);
+          // with more pages to load, the new quiz comes with the last one
+          if (!this.nextCursor) this.quizzes.push(data);
+          if (this.total !== null) this.total += 1;
           this.newQuiz = { chapter_id: "", date_of_quiz: "", start_time: "", time_duration: "", remarks: "" };
         } else {
           alert(data.message || "Failed to add quiz.");
@@ -123,6 +136,7 @@ export default {
           const data = await response.json();
           if (response.ok) {
             this.quizzes = this.quizzes.filter(q => q.id !== quiz.id);
+            if (this.total) this.total -= 1;
           } else {
             alert(data.message || "Failed to delete quiz.");
           }
@@ -239,7 +253,15 @@ export default {
 
                   <!-- List of Quizzes -->
                   <div class="col-12 col-md-8 ps-md-4">
-                    <h4 class="text-muted mb-4">Existing Quizzes</h4>
+                    <div class="d-flex justify-content-between align-items-center mb-4">
+                      <h4 class="text-muted mb-0">Existing Quizzes</h4>
+                      <select v-model="filterChapterId" class="form-select form-select-sm w-auto" @change="loadQuizzes()">
+                        <option value="">All chapters</option>
+                        <option v-for="chapter in chapters" :key="chapter.id" :value="chapter.id">
+                          {{ chapter.name }}
+                        </option>
+                      </select>
+                    </div>
                     <div class="list-group">
                       <div v-for="quiz in quizzes" :key="quiz.id" class="list-group-item list-group-item-action p-3 mb-2 rounded shadow-sm">
                         <div v-if="editingQuiz && editingQuiz.id === quiz.id">
@@ -300,6 +322,14 @@ export default {
                         No quizzes available
                       </div>
                     </div>
+                    <div class="d-flex justify-content-between align-items-center">
+                      <small class="text-muted">
+                        Showing {{ quizzes.length }}<span v-if="total !== null"> of {{ total }}</span>
+                      </small>
+                      <button v-if="nextCursor" class="btn btn-outline-primary btn-sm" :disabled="loadingMore" @click="loadQuizzes(true)">
+                        <i class="fas fa-chevron-down me-1"></i> {{ loadingMore ? 'Loading...' : 'Load more' }}
+                      </button>
+                    </div>
                   </div>
                 </div>
               </div>
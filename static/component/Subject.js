@@ -1,3 +1,5 @@
+import { fetchAllPages } from "../api.js";
+
 export default {
     name: "SubjectComponent",
     data() {
@@ -19,18 +21,12 @@ export default {
     },
     methods: {
       async loadSubjects() {
+        // subjects are few: every page of them
         try {
-          const response = await fetch("/api/admin/subjects", {
-            headers: { "Content-Type": "application/json" }
-          });
-          const data = await response.json();
-          if (response.ok && data.subjects) {
-            this.subjects = data.subjects;
-          } else {
-            alert(data.message || "Failed to load subjects.");
-          }
+          this.subjects = await fetchAllPages("/api/admin/subjects", "subjects");
         } catch (error) {
           console.error("Error loading subjects:", error);
+          alert(error.message);
         }
       },
       async addSubject() {
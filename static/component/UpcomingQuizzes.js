@@ -1,3 +1,5 @@
+import { fetchWithETag } from "../api.js";
+
 export default {
   name: "UpcomingQuizzes",
   data() {
@@ -18,7 +20,7 @@ export default {
   methods: {
     async loadUpcomingQuizzes() {
       try {
-        const response = await fetch("/api/user/upcoming_quizzes", {
+        const response = await fetchWithETag("/api/user/upcoming_quizzes", {
           headers: { "Content-Type": "application/json" }
         });
         const data = await response.json();
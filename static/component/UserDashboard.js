@@ -1,3 +1,9 @@
+import { fetchWithETag } from "../api.js";
+
+// quiz search results per request, and the most the API returns at once
+const SEARCH_LIMIT = 50;
+const MAX_SEARCH_LIMIT = 500;
+
 export default {
   name: "UserDashboard",
   data() {
@@ -7,6 +13,10 @@ export default {
       subjectResults: [],
       chapterResults: [],
       quizResults: [],
+      searchTotal: 0,
+      searchTruncated: false,
+      searchLimit: SEARCH_LIMIT,
+      loadingMore: false,
       q: "",
       isExporting: false
     };
@@ -17,11 +27,11 @@ export default {
   methods: {
     async loadDashboard() {
       let url = this.q.trim() 
-        ? "/api/user/search?q=" + encodeURIComponent(this.q.trim())
+        ? "/api/user/search?q=" + encodeURIComponent(this.q.trim()) + "&limit=" + this.searchLimit
         : "/api/user/dashboard";
       console.log("Loading dashboard data from:", url);
       try {
-        const response = await fetch(url, {
+        const response = await fetchWithETag(url, {
           headers: { "Content-Type": "application/json" }
         });
         const data = await response.json();
@@ -30,6 +40,8 @@ export default {
             this.subjectResults = data.subject_results || [];
             this.chapterResults = data.chapter_results || [];
             this.quizResults = data.quiz_results || [];
+            this.searchTotal = data.total || 0;
+            this.searchTruncated = !!data.truncated;
             this.upcomingQuizzes = [];
             this.allQuizzes = [];
           } else {
@@ -38,6 +50,8 @@ export default {
             this.subjectResults = [];
             this.chapterResults = [];
             this.quizResults = [];
+            this.searchTotal = 0;
+            this.searchTruncated = false;
           }
           console.log("Dashboard data loaded:", data);
         } else {
@@ -75,8 +89,18 @@ export default {
     },
     search() {
       console.log("Search query:", this.q);
+      this.searchLimit = SEARCH_LIMIT;
       this.loadDashboard();
     },
+    async showMoreResults() {
+      this.loadingMore = true;
+      this.searchLimit = Math.min(this.searchLimit + SEARCH_LIMIT, MAX_SEARCH_LIMIT);
+      try {
+        await this.loadDashboard();
+      } finally {
+        this.loadingMore = false;
+      }
+    },
     attemptQuiz(quizId) {
       this.$router.push(`/user/attempt_quiz/${quizId}/attempt`);
     },
@@ -85,6 +109,12 @@ export default {
     }
   },
   computed: {
+    canShowMore() {
+      return this.searchLimit < MAX_SEARCH_LIMIT;
+    },
+    shownResults() {
+      return this.subjectResults.length + this.chapterResults.length + this.quizResults.length;
+    },
     currentUserFullName() {
       return localStorage.getItem("full_name") || "User";
     }
@@ -167,6 +197,17 @@ export default {
             <div v-if="q.trim()">
               <h4 class="mb-3">Search Results for "{{ q }}"</h4>
 
+              <!-- Cut-off notice: only the best matches were returned -->
+              <div v-if="searchTruncated" class="alert alert-info d-flex justify-content-between align-items-center" role="alert">
+                <span>
+                  Showing the best {{ shownResults }} of {{ searchTotal }} matches.
+                  <span v-if="!canShowMore">Refine your search to see the others.</span>
+                </span>
+                <button v-if="canShowMore" class="btn btn-outline-primary btn-sm" :disabled="loadingMore" @click="showMoreResults">
+                  <i class="fas fa-chevron-down me-1"></i> {{ loadingMore ? 'Loading...' : 'Show more' }}
+                </button>
+              </div>
+
               <!-- Results by Subjects -->
               <div class="card shadow mb-4 border-0" v-if="subjectResults.length">
                 <div class="card-header py-3 bg-primary text-white">
@@ -1,8 +1,14 @@
+import { listUrl } from "../api.js";
+
 export default {
   name: "UserScore",
   data() {
     return {
       scores: [],
+      // keyset paging: the cursor of the next page, null on the last one
+      nextCursor: null,
+      total: null,
+      loadingMore: false,
       loading: true,
       error: null,
       isExporting: false
@@ -19,16 +25,27 @@ export default {
     }
   },
   methods: {
-    async loadScores() {
-      this.loading = true;
+    async loadScores(more = false) {
+      // "load more" keeps the table on screen, a fresh load shows the spinner
+      if (more) {
+        this.loadingMore = true;
+      } else {
+        this.loading = true;
+      }
       this.error = null;
       try {
-        const response = await fetch("/api/user/score", {
+        const url = listUrl("/api/user/score", {
+          after: more ? this.nextCursor : null,
+          count: more ? null : 1
+        });
+        const response = await fetch(url, {
           headers: { "Content-Type": "application/json" }
         });
         const data = await response.json();
         if (response.ok) {
-          this.scores = data.scores || [];
+          this.scores = more ? this.scores.concat(data.scores || []) : (data.scores || []);
+          this.nextCursor = data.next;
+          if (!more) this.total = data.total;
         } else {
           this.error = data.message || "Failed to load scores.";
           this.showToast("Error", this.error, "danger");
@@ -39,6 +56,7 @@ export default {
         this.showToast("Error", this.error, "danger");
       } finally {
         this.loading = false;
+        this.loadingMore = false;
       }
     },
     async exportQuizData() {
@@ -154,7 +172,7 @@ export default {
                     data-bs-placement="top" 
                     title="Your quiz attempt scores"
                   >
-                    <i class="fas fa-star me-1"></i> Quiz Scores ({{ scores.length }})
+                    <i class="fas fa-star me-1"></i> Quiz Scores ({{ total !== null ? total : scores.length }})
                   </h5>
                 </div>
                 <div class="card-body">
@@ -193,6 +211,11 @@ export default {
                         </tbody>
                       </table>
                     </div>
+                    <div v-if="nextCursor" class="text-center">
+                      <button class="btn btn-outline-primary btn-sm" :disabled="loadingMore" @click="loadScores(true)">
+                        <i class="fas fa-chevron-down me-1"></i> {{ loadingMore ? 'Loading...' : 'Load more' }}
+                      </button>
+                    </div>
                   </div>
                   <div v-else class="alert alert-info" role="alert">
                     No scores available.
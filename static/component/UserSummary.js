@@ -6,6 +6,7 @@ export default {
       subjectData: [],
       pieLabels: [],
       pieData: [],
+      rank: null,
       loading: true,
       error: null
     };
@@ -60,6 +61,20 @@ export default {
       } finally {
         this.loading = false;
       }
+      this.loadRank();
+    },
+    async loadRank() {
+      // rank on the overall leaderboard; the charts still show if this fails
+      try {
+        const response = await fetch("/api/user/rank?neighbors=2&top=5", {
+          headers: { "Content-Type": "application/json" }
+        });
+        if (response.ok) {
+          this.rank = await response.json();
+        }
+      } catch (err) {
+        console.error("Error loading rank:", err);
+      }
     },
     showToast(title, message, variant = 'success') {
       alert(`${title}: ${message}`);
@@ -289,6 +304,50 @@ export default {
                     </div>
                   </div>
                 </div>
+                <div v-if="rank" class="col-12 mb-4">
+                  <div class="card shadow border-0">
+                    <div class="card-header py-3 bg-success text-white">
+                      <h5 
+                        class="m-0 fw-bold" 
+                        data-bs-toggle="tooltip" 
+                        data-bs-placement="top" 
+                        title="Sum of your best score on every quiz, compared with all users"
+                      >
+                        Leaderboard
+                        <span v-if="rank.rank" class="ms-2">- you are #{{ rank.rank }} of {{ rank.total }}</span>
+                      </h5>
+                    </div>
+                    <div class="card-body">
+                      <p v-if="!rank.rank" class="text-muted">Attempt a quiz to get on the leaderboard.</p>
+                      <div class="row">
+                        <div class="col-md-6">
+                          <h6 class="fw-bold">Top Users</h6>
+                          <table class="table table-sm">
+                            <tbody>
+                              <tr v-for="entry in rank.top" :key="'top-' + entry.rank" :class="{ 'table-success': entry.me }">
+                                <td>#{{ entry.rank }}</td>
+                                <td>{{ entry.me ? "You" : entry.full_name }}</td>
+                                <td class="text-end">{{ entry.score }}</td>
+                              </tr>
+                            </tbody>
+                          </table>
+                        </div>
+                        <div v-if="rank.neighbors.length" class="col-md-6">
+                          <h6 class="fw-bold">Around You</h6>
+                          <table class="table table-sm">
+                            <tbody>
+                              <tr v-for="entry in rank.neighbors" :key="'near-' + entry.rank" :class="{ 'table-success': entry.me }">
+                                <td>#{{ entry.rank }}</td>
+                                <td>{{ entry.me ? "You" : entry.full_name }}</td>
+                                <td class="text-end">{{ entry.score }}</td>
+                              </tr>
+                            </tbody>
+                          </table>
+                        </div>
+                      </div>
+                    </div>
+                  </div>
+                </div>
               </div>
             </div>
           </div>
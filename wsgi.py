@@ -0,0 +1,5 @@
+# Production entry point: gunicorn -c gunicorn.conf.py wsgi:app
+# (the settings, worker model included, are in gunicorn.conf.py)
+from app import create_app
+
+app = create_app()